@@ -0,0 +1,15 @@
+import argparse
+from slobot.encoder_benchmark import EncoderBenchmark
+from slobot.encoder_profile import EncoderProfile, ENCODER_PROFILES
+
+parser = argparse.ArgumentParser(description="Measure the encode fps and bitrate of encoder profiles at QVGA, VGA and XGA")
+parser.add_argument("--profile", type=str, action="append", default=None, help="Encoder profile, a named profile or settings like preset=ultrafast,crf=28. Repeat for each profile, all named profiles by default")
+parser.add_argument("--frame-count", type=int, default=120, help="Number of frames encoded per profile and resolution")
+parser.add_argument("--fps", type=int, default=30, help="Nominal frame rate of a stream")
+args = parser.parse_args()
+
+profiles = {profile: EncoderProfile.parse(profile) for profile in args.profile or ENCODER_PROFILES}
+
+encoder_benchmark = EncoderBenchmark(frame_count=args.frame_count, fps=args.fps)
+for result in encoder_benchmark.run(profiles):
+    print(result)
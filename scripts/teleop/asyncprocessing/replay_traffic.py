@@ -0,0 +1,25 @@
+import argparse
+import json
+from slobot.teleop.asyncprocessing.pipeline_supervisor import PipelineSupervisor, WorkerSpec
+from slobot.teleop.asyncprocessing.shared_memory_block import SharedMemoryBlock
+from slobot.teleop.asyncprocessing.traffic_log import TrafficReplay
+from slobot.teleop.asyncprocessing.workers.async_teleoperator import AsyncTeleoperator
+
+parser = argparse.ArgumentParser(description="Drive a worker from the captured traffic of a recording")
+parser.add_argument("--recording-id", type=str, required=True, help="Recording id of the captured traffic")
+parser.add_argument("--type", type=str, required=True, help="Worker type: leader_read, follower_control, sim_step, mirror_kinematics, webcam_capture or detect_objects")
+parser.add_argument("--args", type=str, default="{}", help="JSON keyword arguments of the worker, like in the topology file")
+parser.add_argument("--fast", action="store_true", default=False, help="Replay as fast as possible instead of real time")
+parser.add_argument("--speed", type=float, default=1.0, help="Speed factor of the real time replay")
+args = parser.parse_args()
+
+spec = WorkerSpec(type=args.type, args=json.loads(args.args))
+spawn_kwargs = PipelineSupervisor.spawn_kwargs(spec)
+
+# the detection worker reads the webcam frames from shared memory
+shm_names = [SharedMemoryBlock.get_name_from_camera_id(spawn_kwargs['camera_id'])] if args.type == 'detect_objects' else []
+
+traffic_replay = TrafficReplay(args.recording_id, shm_names=shm_names, realtime=not args.fast, speed=args.speed)
+async_teleoperator = AsyncTeleoperator(traffic_replay=traffic_replay)
+spawn_method = getattr(async_teleoperator, f"spawn_{args.type}_worker")
+spawn_method(**spawn_kwargs)
@@ -0,0 +1,16 @@
+import argparse
+from slobot.teleop.asyncprocessing.asyncio_runner import AsyncioRunner
+from slobot.teleop.asyncprocessing.pipeline_supervisor import PipelineSupervisor
+from slobot.teleop.asyncprocessing.workers.async_teleoperator import AsyncTeleoperator
+
+parser = argparse.ArgumentParser(description="Run all the workers of a topology file in a single process")
+parser.add_argument("--topology", type=str, required=True, help="Path to the JSON topology file, the cores and priorities are ignored")
+args = parser.parse_args()
+
+asyncio_runner = AsyncioRunner()
+async_teleoperator = AsyncTeleoperator(asyncio_runner=asyncio_runner)
+for spec in PipelineSupervisor.load_topology(args.topology):
+    spawn_method = getattr(async_teleoperator, f"spawn_{spec.type}_worker")
+    spawn_method(**PipelineSupervisor.spawn_kwargs(spec))
+
+asyncio_runner.run()
@@ -4,6 +4,11 @@ from slobot.teleop.asyncprocessing.workers.async_teleoperator import AsyncTeleop
 parser = argparse.ArgumentParser(description="Run cron worker")
 parser.add_argument("--recording-id", type=str, required=True, help="The rerun recording id")
 parser.add_argument("--fps", type=int, default=30, help="Frames per second")
+parser.add_argument("--latency-budget-ms", type=float, default=None, help="End-to-end latency budget, defaults to the period")
+parser.add_argument("--adaptive", action="store_true", default=False, help="Adapt the tick rate and decimate sim and detection workers when they overrun")
+parser.add_argument("--min-fps", type=int, default=None, help="Lowest frames per second in adaptive mode")
+parser.add_argument("--trace-steps", action="store_true", default=False, help="Record the per-step timestamps of the worker to /tmp/slobot/trace")
+parser.add_argument("--capture-traffic", action="store_true", default=False, help="Capture the messages written by the worker to /tmp/slobot/traffic")
 args = parser.parse_args()
 
 async_teleoperator = AsyncTeleoperator()
@@ -7,6 +7,11 @@ parser.add_argument("--camera-id", type=int, required=True, help="Camera ID")
 parser.add_argument("--detection-task", type=str, required=True, help="Detection task (detect or pose)")
 parser.add_argument("--width", type=int, required=True, help="Frame width")
 parser.add_argument("--height", type=int, required=True, help="Frame height")
+parser.add_argument("--detect-every", type=int, default=1, help="Run the detector every N frames, tracking the detections in between")
+parser.add_argument("--motion-threshold", type=float, default=None, help="Also run the detector when the frame differs from the last detected frame by more than this mean absolute difference, between 0 and 1")
+parser.add_argument("--copy-frame", action="store_true", default=False, help="Copy the latest frame out of shared memory instead of leasing it, when the inference outlasts the ring of slots")
+parser.add_argument("--trace-steps", action="store_true", default=False, help="Record the per-step timestamps of the worker to /tmp/slobot/trace")
+parser.add_argument("--capture-traffic", action="store_true", default=False, help="Capture the messages written by the worker to /tmp/slobot/traffic")
 args = parser.parse_args()
 
 # Create dynamic worker and queue names based on camera ID
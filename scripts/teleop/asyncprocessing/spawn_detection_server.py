@@ -0,0 +1,16 @@
+import argparse
+from slobot.teleop.asyncprocessing.workers.async_teleoperator import AsyncTeleoperator
+
+parser = argparse.ArgumentParser(description="Run the batched object detection server for several cameras")
+parser.add_argument("--camera-id", type=int, action="append", dest="camera_ids", required=True, help="Camera ID to detect objects on (can be specified multiple times)")
+parser.add_argument("--detection-task", type=str, required=True, help="Detection task (detect or pose)")
+parser.add_argument("--width", type=int, required=True, help="Frame width")
+parser.add_argument("--height", type=int, required=True, help="Frame height")
+parser.add_argument("--step-tolerance", type=int, default=0, help="Maximum step difference between the frames batched together")
+parser.add_argument("--copy-frame", action="store_true", default=False, help="Copy the latest frame out of shared memory instead of leasing it, when the inference outlasts the ring of slots")
+parser.add_argument("--trace-steps", action="store_true", default=False, help="Record the per-step timestamps of the worker to /tmp/slobot/trace")
+parser.add_argument("--capture-traffic", action="store_true", default=False, help="Capture the messages written by the worker to /tmp/slobot/traffic")
+args = parser.parse_args()
+
+async_teleoperator = AsyncTeleoperator()
+async_teleoperator.spawn_detection_server_worker(**vars(args))
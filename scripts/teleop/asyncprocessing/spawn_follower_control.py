@@ -1,10 +1,16 @@
 import argparse
 from slobot.teleop.asyncprocessing.workers.async_teleoperator import AsyncTeleoperator
+from slobot.teleop.asyncprocessing.fake_devices import FakeFeetech
+from slobot.feetech import Feetech
 
 parser = argparse.ArgumentParser(description="Run follower control worker")
-parser.add_argument("--port", type=str, required=True, help="Follower port")
+parser.add_argument("--port", type=str, default=Feetech.PORT_FOLLOWER, help="Follower port")
 parser.add_argument("--camera-id", type=int, action="append", dest="camera_ids", help="Camera ID to enable (can be specified multiple times)")
 parser.add_argument("--sim", action="store_true", default=False, help="Enable simulation")
+parser.add_argument("--fake", action="store_true", default=False, help="Use a fake follower arm, without USB device")
+parser.add_argument("--bus-latency-ms", type=float, default=FakeFeetech.BUS_LATENCY_MS, help="Bus latency of the fake arm in milliseconds")
+parser.add_argument("--trace-steps", action="store_true", default=False, help="Record the per-step timestamps of the worker to /tmp/slobot/trace")
+parser.add_argument("--capture-traffic", action="store_true", default=False, help="Capture the messages written by the worker to /tmp/slobot/traffic")
 args = parser.parse_args()
 
 async_teleoperator = AsyncTeleoperator()
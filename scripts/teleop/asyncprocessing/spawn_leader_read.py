@@ -1,8 +1,14 @@
 import argparse
 from slobot.teleop.asyncprocessing.workers.async_teleoperator import AsyncTeleoperator
+from slobot.teleop.asyncprocessing.fake_devices import FakeFeetech
+from slobot.feetech import Feetech
 
 parser = argparse.ArgumentParser(description="Run leader read worker")
-parser.add_argument("--port", type=str, required=True, help="Leader port")
+parser.add_argument("--port", type=str, default=Feetech.PORT_LEADER, help="Leader port")
+parser.add_argument("--fake", action="store_true", default=False, help="Use a fake leader arm, without USB device")
+parser.add_argument("--bus-latency-ms", type=float, default=FakeFeetech.BUS_LATENCY_MS, help="Bus latency of the fake arm in milliseconds")
+parser.add_argument("--trace-steps", action="store_true", default=False, help="Record the per-step timestamps of the worker to /tmp/slobot/trace")
+parser.add_argument("--capture-traffic", action="store_true", default=False, help="Capture the messages written by the worker to /tmp/slobot/traffic")
 args = parser.parse_args()
 
 async_teleoperator = AsyncTeleoperator()
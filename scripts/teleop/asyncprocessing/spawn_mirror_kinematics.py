@@ -9,6 +9,8 @@ parser.add_argument("--width", type=int, default=640, help="Width of the sim RGB
 parser.add_argument("--height", type=int, default=480, help="Height of the sim RGB image")
 parser.add_argument("--mjcf-path", type=str, required=True, help="Path to the MJCF file for the other robot")
 parser.add_argument("--end-effector-link", type=str, required=True, help="Name of the end effector link for the other robot")
+parser.add_argument("--trace-steps", action="store_true", default=False, help="Record the per-step timestamps of the worker to /tmp/slobot/trace")
+parser.add_argument("--capture-traffic", action="store_true", default=False, help="Capture the messages written by the worker to /tmp/slobot/traffic")
 args = parser.parse_args()
 
 async_teleoperator = AsyncTeleoperator()
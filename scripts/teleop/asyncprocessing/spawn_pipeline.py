@@ -0,0 +1,10 @@
+import argparse
+from slobot.teleop.asyncprocessing.pipeline_supervisor import PipelineSupervisor
+
+parser = argparse.ArgumentParser(description="Run all the workers of a topology file under a supervisor")
+parser.add_argument("--topology", type=str, required=True, help="Path to the JSON topology file")
+args = parser.parse_args()
+
+specs = PipelineSupervisor.load_topology(args.topology)
+pipeline_supervisor = PipelineSupervisor(specs)
+pipeline_supervisor.run()
@@ -7,6 +7,13 @@ parser.add_argument("--substeps", type=int, default=40, help="Substeps")
 parser.add_argument("--vis-mode", type=str, default="visual", help="Visualization mode")
 parser.add_argument("--width", type=int, default=640, help="Width of the sim RGB image")
 parser.add_argument("--height", type=int, default=480, help="Height of the sim RGB image")
+parser.add_argument("--depth-range", type=float, nargs=2, default=None, metavar=("NEAR", "FAR"), help="Fixed depth range of the depth colormap in meters, the range of each frame by default")
+parser.add_argument("--render-pass", type=str, action="append", default=None, help="Render pass to enable, among rgb, depth, segmentation and normal, with an optional decimation like depth:5. Repeat for each pass, all passes are rendered every step by default")
+parser.add_argument("--encoder-profile", type=str, default=None, help="Encoder profile of the video streams, a named profile among default, realtime, balanced and archive, or settings like preset=ultrafast,crf=28,gop_size=60")
+parser.add_argument("--encoder-queue-size", type=int, default=None, help="Frames waiting to be encoded per video stream, 0 to encode synchronously, 30 by default")
+parser.add_argument("--drop-policy", type=str, default=None, choices=["block", "drop_newest", "drop_oldest"], help="Frame dropped when the encoder queue of a video stream is full, drop_oldest by default")
+parser.add_argument("--trace-steps", action="store_true", default=False, help="Record the per-step timestamps of the worker to /tmp/slobot/trace")
+parser.add_argument("--capture-traffic", action="store_true", default=False, help="Capture the messages written by the worker to /tmp/slobot/traffic")
 args = parser.parse_args()
 
 async_teleoperator = AsyncTeleoperator()
@@ -9,6 +9,16 @@ parser.add_argument("--width", type=int, default=640, help="Width of the webcam
 parser.add_argument("--height", type=int, default=480, help="Height of the webcam image")
 parser.add_argument("--fps", type=int, default=30, help="Frames per second")
 parser.add_argument("--detect-objects", action="store_true", help="Enable detection (writes to shared memory)")
+parser.add_argument("--fake", action="store_true", default=False, help="Emit synthetic frames instead of opening the webcam")
+parser.add_argument("--continuous-grab", action="store_true", default=False, help="Read the webcam in a background thread, ticks taking the most recent frame")
+parser.add_argument("--preview-rate", type=float, default=None, help="Maximum number of preview images per second, a preview of every frame by default")
+parser.add_argument("--preview-downscale", type=int, default=1, help="Factor dividing the width and the height of the preview image")
+parser.add_argument("--reader-hold-ms", type=float, default=None, help="Time in ms the detection worker holds a shared memory slot, which sizes the slot ring, 5 ms by default")
+parser.add_argument("--encoder-profile", type=str, default=None, help="Encoder profile of the video streams, a named profile among default, realtime, balanced and archive, or settings like preset=ultrafast,crf=28,gop_size=60")
+parser.add_argument("--encoder-queue-size", type=int, default=None, help="Frames waiting to be encoded per video stream, 0 to encode synchronously, 30 by default")
+parser.add_argument("--drop-policy", type=str, default=None, choices=["block", "drop_newest", "drop_oldest"], help="Frame dropped when the encoder queue of a video stream is full, drop_oldest by default")
+parser.add_argument("--trace-steps", action="store_true", default=False, help="Record the per-step timestamps of the worker to /tmp/slobot/trace")
+parser.add_argument("--capture-traffic", action="store_true", default=False, help="Capture the messages written by the worker to /tmp/slobot/traffic")
 args = parser.parse_args()
 
 # Create dynamic worker and queue names based on camera ID
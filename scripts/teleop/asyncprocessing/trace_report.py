@@ -0,0 +1,13 @@
+import argparse
+from slobot.teleop.asyncprocessing.step_tracer import StepTracer, StepTraceReport
+
+parser = argparse.ArgumentParser(description="Report the per-hop latencies and critical paths of a traced recording")
+parser.add_argument("--recording-id", type=str, required=True, help="The rerun recording id")
+parser.add_argument("--chrome-trace", type=str, default=None, help="Optional path to export the Chrome trace JSON")
+args = parser.parse_args()
+
+step_trace_report = StepTraceReport(StepTracer.trace_dir(args.recording_id))
+print(step_trace_report.report())
+
+if args.chrome_trace is not None:
+    step_trace_report.export_chrome_trace(args.chrome_trace)
@@ -0,0 +1,80 @@
+from typing import Optional
+
+import numpy as np
+import matplotlib.pyplot as plt
+
+
+class DepthColorizer:
+    """Colorizes depth maps with the plasma colormap on a logarithmic scale, through a lookup table.
+
+    The depth range is quantized into LUT_SIZE bins, and each bin is mapped to the color of its logarithmic depth,
+    so a frame only costs a subtraction, a multiplication and a gather, instead of a log and a colormap evaluation per pixel.
+    With a fixed depth range, the table is computed once and the per frame min/max is skipped,
+    otherwise the table is recomputed for the range of each frame, which only costs LUT_SIZE logs.
+    The scratch buffers are reused across frames of the same shape, so a colorizer must not be shared between threads.
+    """
+
+    # Number of depth bins of the lookup table
+    LUT_SIZE = 4096
+
+    # Colors of the plasma colormap, as uint8 RGB
+    PLASMA = (plt.cm.plasma(np.linspace(0, 1, plt.cm.plasma.N))[:, :3] * 255).astype(np.uint8)
+
+    def __init__(self, depth_range: Optional[tuple[float, float]] = None):
+        """Initialize the colorizer.
+
+        Args:
+            depth_range: Fixed (near, far) depth range, the depths outside of it being clamped. If None, the range of each frame is used.
+        """
+        self.depth_range = depth_range
+        self.lut: Optional[np.ndarray] = None
+        self.scaled_depth: Optional[np.ndarray] = None
+        self.indexes: Optional[np.ndarray] = None
+
+        if depth_range is not None:
+            near, far = depth_range
+            self.lut = self.logarithmic_lut(far - near)
+
+    @staticmethod
+    def logarithmic_lut(depth_span: float) -> np.ndarray:
+        """Colors of the LUT_SIZE depth bins spanning the depth range, on a logarithmic scale."""
+        if depth_span <= 0:
+            return np.repeat(DepthColorizer.PLASMA[:1], DepthColorizer.LUT_SIZE, axis=0)
+
+        bin_depths = np.linspace(0, depth_span, DepthColorizer.LUT_SIZE)
+        normalized_log_depths = np.log1p(bin_depths) / np.log1p(depth_span)
+        color_indexes = np.minimum((normalized_log_depths * len(DepthColorizer.PLASMA)).astype(np.intp), len(DepthColorizer.PLASMA) - 1)
+        return DepthColorizer.PLASMA[color_indexes]
+
+    def colorize(self, depth: np.ndarray, out: Optional[np.ndarray] = None) -> np.ndarray:
+        """Colorize a depth map.
+
+        Args:
+            depth: Depth map of any shape, like (H, W) or (n_envs, H, W)
+            out: uint8 buffer of shape depth.shape + (3,) to write the colors into, a new one is allocated if None
+
+        Returns:
+            The RGB colors of the depth map
+        """
+        if self.depth_range is not None:
+            near, far = self.depth_range
+            lut = self.lut
+        else:
+            near, far = float(np.min(depth)), float(np.max(depth))
+            lut = self.logarithmic_lut(far - near)
+
+        if self.scaled_depth is None or self.scaled_depth.shape != depth.shape:
+            self.scaled_depth = np.empty(depth.shape, dtype=np.float32)
+            self.indexes = np.empty(depth.shape, dtype=np.intp)
+
+        if out is None:
+            out = np.empty(depth.shape + (3,), dtype=np.uint8)
+
+        # quantize the depths into bins, then gather the bin colors, out of range bins being clamped
+        scale = (self.LUT_SIZE - 1) / (far - near) if far > near else 0.0
+        np.subtract(depth, near, out=self.scaled_depth)
+        np.multiply(self.scaled_depth, scale, out=self.scaled_depth)
+        np.rint(self.scaled_depth, out=self.scaled_depth)
+        np.copyto(self.indexes, self.scaled_depth, casting='unsafe')
+        np.take(lut, self.indexes, axis=0, out=out, mode='clip')
+        return out
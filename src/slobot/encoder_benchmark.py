@@ -0,0 +1,90 @@
+import time
+from dataclasses import dataclass
+from fractions import Fraction
+
+import av
+import numpy as np
+
+from slobot.configuration import Configuration
+from slobot.encoder_profile import EncoderProfile
+
+
+@dataclass
+class EncoderBenchmarkResult:
+    profile: str
+    res: tuple[int, int]
+    fps: float           # encoded frames per second
+    bitrate_kbps: float  # at the nominal frame rate
+    realtime_streams: int
+
+    def __str__(self):
+        width, height = self.res
+        return f"{self.profile:<40} {width:>5}x{height:<5} {self.fps:>8.1f} fps {self.bitrate_kbps:>9.0f} kbps {self.realtime_streams:>4} streams"
+
+
+class EncoderBenchmark:
+    """Measures the encode throughput and the bitrate of libx264 encoder profiles on the CPU.
+
+    Frames are synthetic: a moving gradient with some noise, standing in for the camera and simulation renders.
+    The number of real-time streams is how many streams at the nominal frame rate the measured throughput sustains, the streams sharing the CPU.
+    """
+
+    LOGGER = Configuration.logger(__name__)
+
+    RESOLUTIONS = [Configuration.QVGA, Configuration.VGA, Configuration.XGA]
+
+    def __init__(self, frame_count: int = 120, fps: int = 30, seed: int = 0):
+        """Initialize the benchmark.
+
+        Args:
+            frame_count: Number of frames encoded per profile and resolution
+            fps: Nominal frame rate of a stream
+            seed: Seed of the frame noise
+        """
+        self.frame_count = frame_count
+        self.fps = fps
+        self.rng = np.random.default_rng(seed)
+
+    def run(self, profiles: dict[str, EncoderProfile], resolutions: list[tuple[int, int]] = None) -> list[EncoderBenchmarkResult]:
+        """Benchmark each profile, keyed by its name, at each resolution."""
+        results = []
+        for res in resolutions or self.RESOLUTIONS:
+            frames = self.frames(res)
+            for profile_name, profile in profiles.items():
+                self.LOGGER.debug(f"Benchmarking profile {profile} at {res}")
+                results.append(self.benchmark(profile_name, profile, res, frames))
+        return results
+
+    def benchmark(self, profile_name: str, profile: EncoderProfile, res: tuple[int, int], frames: list[av.VideoFrame]) -> EncoderBenchmarkResult:
+        encoder = av.CodecContext.create("libx264", "w")
+        encoder.width, encoder.height = res
+        encoder.time_base = Fraction(1, self.fps)
+        encoder.framerate = self.fps
+        profile.apply(encoder)
+        encoder.max_b_frames = 0
+
+        encoded_bytes = 0
+        start_time = time.perf_counter()
+        for pts, frame in enumerate(frames):
+            frame.pts = pts
+            encoded_bytes += sum(packet.size for packet in encoder.encode(frame))
+        encoded_bytes += sum(packet.size for packet in encoder.encode(None))
+        duration = time.perf_counter() - start_time
+
+        fps = len(frames) / duration
+        bitrate_kbps = encoded_bytes * 8 / (len(frames) / self.fps) / 1000
+        return EncoderBenchmarkResult(profile_name, res, fps, bitrate_kbps, int(fps // self.fps))
+
+    def frames(self, res: tuple[int, int]) -> list[av.VideoFrame]:
+        width, height = res
+        x = np.arange(width, dtype=np.float32)[None, :]
+        y = np.arange(height, dtype=np.float32)[:, None]
+
+        frames = []
+        for i in range(self.frame_count):
+            # a gradient moving by a few pixels per frame, with some sensor like noise
+            gradient = (x + y + 4 * i) % 256
+            rgb = np.stack([gradient, (gradient + 85) % 256, (255 - gradient)], axis=-1)
+            rgb += self.rng.normal(0, 4, size=rgb.shape).astype(np.float32)
+            frames.append(av.VideoFrame.from_ndarray(np.clip(rgb, 0, 255).astype(np.uint8), format="rgb24"))
+        return frames
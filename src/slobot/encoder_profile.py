@@ -0,0 +1,66 @@
+from dataclasses import dataclass, fields
+from typing import Optional
+
+
+@dataclass
+class EncoderProfile:
+    """Settings of a libx264 video encoder, None keeping the codec default.
+
+    A profile is parsed from a named profile, like "realtime", or from comma separated settings, like "preset=ultrafast,crf=28,gop_size=60".
+    """
+
+    preset: Optional[str] = None     # ultrafast to veryslow, faster presets trade compression for encode speed
+    tune: Optional[str] = None       # like zerolatency, which disables the frame lookahead
+    crf: Optional[int] = None        # constant rate factor, from 0 (lossless) to 51, 23 by default
+    threads: Optional[int] = None    # encoder threads, 0 for one per core
+    gop_size: Optional[int] = None   # maximum number of frames between keyframes
+    pix_fmt: str = "yuv420p"
+
+    def options(self) -> dict[str, str]:
+        options = {}
+        if self.preset is not None:
+            options["preset"] = self.preset
+        if self.tune is not None:
+            options["tune"] = self.tune
+        if self.crf is not None:
+            options["crf"] = str(self.crf)
+        return options
+
+    def apply(self, codec_context, base_options: Optional[dict[str, str]] = None):
+        """Configure a codec context before its first frame, the profile overriding the base options."""
+        codec_context.pix_fmt = self.pix_fmt
+        if self.threads is not None:
+            codec_context.thread_count = self.threads
+        if self.gop_size is not None:
+            codec_context.gop_size = self.gop_size
+        codec_context.options = {**(base_options or {}), **self.options()}
+
+    @staticmethod
+    def parse(spec: str) -> "EncoderProfile":
+        if spec in ENCODER_PROFILES:
+            return ENCODER_PROFILES[spec]
+
+        field_names = [field.name for field in fields(EncoderProfile)]
+        settings = {}
+        for setting in spec.split(","):
+            name, _, value = setting.partition("=")
+            if name not in field_names:
+                raise ValueError(f"Unknown encoder setting {name}, expected a named profile among {list(ENCODER_PROFILES)} or settings among {field_names}")
+            settings[name] = int(value) if name in ("crf", "threads", "gop_size") else value
+        return EncoderProfile(**settings)
+
+    def __str__(self):
+        return ",".join(
+            f"{field.name}={getattr(self, field.name)}"
+            for field in fields(self)
+            if getattr(self, field.name) is not None
+        )
+
+
+# Named profiles, from the fastest to the most compressed
+ENCODER_PROFILES = {
+    "default": EncoderProfile(),
+    "realtime": EncoderProfile(preset="ultrafast", tune="zerolatency", crf=28, gop_size=60),
+    "balanced": EncoderProfile(preset="veryfast", tune="zerolatency", crf=23, gop_size=60),
+    "archive": EncoderProfile(preset="medium", crf=20, gop_size=250),
+}
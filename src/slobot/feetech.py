@@ -218,10 +218,10 @@ class Feetech():
 
     def create_feetech_frame(self, target_pos) -> FeetechFrame:
         timestamp = time.time()
-        qpos = self.pos_to_qpos(self.get_pos())
-        target_qpos = self.pos_to_qpos(target_pos)
-        velocity = self.get_dofs_velocity()
-        force = self.get_dofs_control_force()
+        qpos = np.array(self.pos_to_qpos(self.get_pos()), dtype=np.float32)
+        target_qpos = np.array(self.pos_to_qpos(target_pos), dtype=np.float32)
+        velocity = np.array(self.get_dofs_velocity(), dtype=np.float32)
+        force = np.array(self.get_dofs_control_force(), dtype=np.float32)
         return FeetechFrame(timestamp, target_qpos, qpos, velocity, force)
 
     def sim_positions(self, positions):
@@ -1,9 +1,12 @@
 from dataclasses import dataclass
 
-@dataclass
+import numpy as np
+
+@dataclass(slots=True)
 class FeetechFrame:
+    """State of the real arm, the joint fields being 1-D arrays of the joint values."""
     timestamp: float = None
-    control_pos: list[float] = None
-    qpos: list[float] = None
-    velocity: list[float] = None
-    control_force: list[float] = None
\ No newline at end of file
+    control_pos: np.ndarray = None
+    qpos: np.ndarray = None
+    velocity: np.ndarray = None
+    control_force: np.ndarray = None
@@ -1,3 +1,4 @@
+import numpy as np
 import torch
 
 import genesis as gs
@@ -37,6 +38,10 @@ class Genesis():
 
         lookat = kwargs.get('lookat', (0, 0, 0))
 
+        # side camera pose in the frame of environment 0
+        self.camera_pos = np.array(camera_pos, dtype=np.float64)
+        self.lookat = np.array(lookat, dtype=np.float64)
+
         lights = [
             { "type": "directional", "dir": (-1, 1, -1), "color": (1.0, 1.0, 1.0), "intensity": 5.0 },
         ]
@@ -125,7 +130,7 @@ class Genesis():
 
         should_start = kwargs.get('should_start', True)
         if should_start:
-            self.build()
+            self.build(n_envs=kwargs.get('n_envs', 1))
 
     def build(self, n_envs=1):
         self.scene.build(n_envs=n_envs, env_spacing=(0.5, 0.5))
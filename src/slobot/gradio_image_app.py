@@ -1,9 +1,11 @@
 import gradio as gr
 from slobot.image_streams import ImageStreams
+from slobot.image_encoder_pool import ImageFormat
 
 class GradioImageApp():
     def __init__(self):
-        self.image_streams = ImageStreams()
+        # hand the arrays to the Image components as is, instead of writing image files
+        self.image_streams = ImageStreams(image_format=ImageFormat.RAW, in_memory=True)
 
     def launch(self):
         with gr.Blocks() as demo:
@@ -33,4 +33,5 @@ class GradioQposApp():
         for simulation_frame_paths in self.image_streams.simulation_frame_paths(res, fps, rgb=False, depth=False, segmentation=False, normal=False):
             #time.sleep(sleep_period)
             GradioQposApp.LOGGER.debug(f"Sending qpos {simulation_frame_paths.simulation_frame.qpos}")
-            yield simulation_frame_paths.simulation_frame.qpos
+            # one value per Number component
+            yield simulation_frame_paths.simulation_frame.qpos.tolist()
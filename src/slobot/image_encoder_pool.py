@@ -0,0 +1,94 @@
+import io
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from enum import Enum
+from typing import Optional
+
+import numpy as np
+from PIL import Image
+
+from slobot.configuration import Configuration
+
+
+class ImageFormat(Enum):
+    RAW = "npy"    # the pixels as is, no compression
+    JPEG = "jpeg"  # fast lossy compression
+    WEBP = "webp"  # smaller than JPEG, slower to encode
+
+
+class ImageEncoderPool:
+    """Encodes the images of the simulation frames in background threads, so that the simulation thread does not wait for the encoder.
+
+    The images are either saved to files, or kept in memory: as encoded bytes, or as arrays in the RAW format.
+    Results are returned as futures, which the caller consumes in submission order.
+    At most max_pending_frames frames wait to be encoded, beyond that the caller waits for the oldest one.
+    """
+
+    LOGGER = Configuration.logger(__name__)
+
+    def __init__(
+        self,
+        image_format: ImageFormat = ImageFormat.WEBP,
+        quality: int = 80,
+        in_memory: bool = False,
+        max_workers: int = 4,
+        max_pending_frames: int = 8,
+    ):
+        """Initialize the pool.
+
+        Args:
+            image_format: Format of the encoded images
+            quality: Quality of the JPEG and WebP images, from 0 to 100
+            in_memory: Keep the encoded images in memory instead of saving them to files
+            max_workers: Number of encoder threads
+            max_pending_frames: Maximum number of frames waiting to be encoded
+        """
+        self.image_format = image_format
+        self.quality = quality
+        self.in_memory = in_memory
+        self.max_pending_frames = max_pending_frames
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="image_encoder")
+        self.pending_futures = deque()
+
+    def submit(self, images: list[np.ndarray], filenames: Optional[list[str]] = None) -> Future:
+        """Encode the images of a frame.
+
+        Args:
+            images: The RGB images of the frame
+            filenames: Filename of each image, without extension, ignored in memory
+
+        Returns:
+            A future of the list of file paths, or of the encoded images in memory
+        """
+        future = self.executor.submit(self.encode_images, images, filenames)
+
+        self.pending_futures.append(future)
+        while self.pending_futures and (len(self.pending_futures) > self.max_pending_frames or self.pending_futures[0].done()):
+            self.pending_futures.popleft().result()
+
+        return future
+
+    def encode_images(self, images: list[np.ndarray], filenames: Optional[list[str]]) -> list:
+        if self.in_memory:
+            return [self.encode_bytes(image) for image in images]
+
+        return [self.save(image, filename) for image, filename in zip(images, filenames)]
+
+    def encode_bytes(self, image: np.ndarray):
+        if self.image_format == ImageFormat.RAW:
+            return image
+
+        buffer = io.BytesIO()
+        Image.fromarray(image).save(buffer, format=self.image_format.value, quality=self.quality)
+        return buffer.getvalue()
+
+    def save(self, image: np.ndarray, filename: str) -> str:
+        path = f"{filename}.{self.image_format.value}"
+        if self.image_format == ImageFormat.RAW:
+            np.save(path, image)
+        else:
+            Image.fromarray(image).save(path, quality=self.quality)
+        return path
+
+    def shutdown(self):
+        self.executor.shutdown(wait=True)
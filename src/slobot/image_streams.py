@@ -2,32 +2,43 @@ import time
 import os
 import threading
 import queue
-
-from PIL import Image
+from concurrent.futures import Future
 
 from slobot.configuration import Configuration
 from slobot.so_arm_100 import SoArm100
 from slobot.video_streams import VideoStreams
 from slobot.simulation_frame import SimulationFrame
 from slobot.simulation_frame_paths import SimulationFramePaths
+from slobot.depth_colorizer import DepthColorizer
+from slobot.image_encoder_pool import ImageEncoderPool, ImageFormat
 
 # Generate a stream of images from the simulation
 class ImageStreams:
 
-    def __init__(self):
+    def __init__(self, image_format=ImageFormat.WEBP, quality=80, in_memory=False):
+        """
+        The images are encoded in background threads, in the given format and quality.
+        In memory, the paths of the yielded SimulationFramePaths are replaced by the encoded bytes, or by the arrays in the RAW format.
+        """
         os.makedirs(Configuration.WORK_DIR, exist_ok=True)
         self.queue = queue.Queue()
+        self.depth_colorizer = DepthColorizer()
+        self.image_format = image_format
+        self.quality = quality
+        self.in_memory = in_memory
 
     def simulation_frame_paths(self, res, fps, rgb=True, depth=False, segmentation=False, normal=False):
         thread = threading.Thread(target=self.run_simulation, args=(res, fps, rgb, depth, segmentation, normal))
         thread.start()
 
         while True:
-            simulation_frame_paths = self.queue.get()
-            if simulation_frame_paths is None:
+            item = self.queue.get()
+            if item is None:
                 break
 
-            yield simulation_frame_paths
+            # the frames are queued in order, wait for the encoding of the next one
+            simulation_frame, future = item
+            yield SimulationFramePaths(simulation_frame=simulation_frame, paths=future.result())
 
         thread.join()
 
@@ -38,6 +49,7 @@ class ImageStreams:
         arm.elemental_rotations()
         arm.genesis.stop()
 
+        self.image_encoder_pool.shutdown()
         self.queue.put(None) # add poison pill
 
     def start(
@@ -55,35 +67,33 @@ class ImageStreams:
 
         self.frame_enabled = [rgb, depth, segmentation, normal]
 
+        self.image_encoder_pool = ImageEncoderPool(image_format=self.image_format, quality=self.quality, in_memory=self.in_memory)
+
     def handle_step(self, simulation_frame: SimulationFrame):
-        if simulation_frame.depth is not None:
+        if simulation_frame.side_camera_frame.depth is not None:
            # colorize depth
-           simulation_frame.depth = VideoStreams.logarithmic_depth_to_rgb(simulation_frame.depth)
+           simulation_frame.side_camera_frame.depth = self.depth_colorizer.colorize(simulation_frame.side_camera_frame.depth)
 
-        simulation_frame_paths = self.transcode_frame(simulation_frame)
-        self.queue.put(simulation_frame_paths)
+        future = self.transcode_frame(simulation_frame)
+        self.queue.put((simulation_frame, future))
 
-    def transcode_frame(self, simulation_frame: SimulationFrame) -> SimulationFramePaths:
+    def transcode_frame(self, simulation_frame: SimulationFrame) -> Future:
         date_time = time.strftime('%Y%m%d_%H%M%S')
 
-        simulation_frame_images = []
+        images = []
+        filenames = []
         for frame_id in range(len(VideoStreams.FRAME_TYPES)):
             if not self.frame_enabled[frame_id]:
                 continue
 
-            filename = self._filename(VideoStreams.FRAME_TYPES[frame_id], date_time, self.segment_id)
-            self.create_image_paths(simulation_frame.frame(frame_id), filename)
-            simulation_frame_images.append(filename)
+            images.append(simulation_frame.frame(frame_id))
+            filenames.append(self._filename(VideoStreams.FRAME_TYPES[frame_id], date_time, self.segment_id))
 
         self.segment_id += 1
 
-        return SimulationFramePaths(simulation_frame=simulation_frame, paths=simulation_frame_images)
-
-    def create_image_paths(self, typed_array, filename):
-        image = Image.fromarray(typed_array, mode='RGB')
-        image.save(filename)
-        return filename
+        return self.image_encoder_pool.submit(images, filenames)
 
     def _filename(self, frame_type, date_time, segment_id):
-        return f"{Configuration.WORK_DIR}/{frame_type}_{date_time}_{segment_id}.webp"
+        # the extension is added by the encoder, according to the image format
+        return f"{Configuration.WORK_DIR}/{frame_type}_{date_time}_{segment_id}"
 
@@ -2,12 +2,17 @@ from rerun.datatypes.color_model import ColorModel
 from slobot.feetech_frame import FeetechFrame
 from slobot.simulation_frame import SimulationFrame, CameraFrame
 from slobot.configuration import Configuration
+from slobot.metrics.video_encoder import DropPolicy, VideoEncoder
+from slobot.metrics.scalar_buffer import ScalarBuffer
+from slobot.encoder_profile import EncoderProfile
 
 import rerun as rr
 import os
 import av
+import numpy as np
 
 from enum import Enum
+from typing import Optional
 
 class OperationMode(Enum):
     SAVE = "save"
@@ -27,14 +32,34 @@ class RerunMetrics:
     SIM_SIDE_VIDEO_METRIC = "/sim/side/video"
     SIM_LINK_VIDEO_METRIC = "/sim/link/video"
 
+    # Frames waiting to be encoded per video stream, 0 to encode in the caller's thread
+    ENCODER_QUEUE_SIZE = 30
+
+    # Scalars buffered per entity path before they are sent in columns, 1 to send them right away
+    SCALAR_BATCH_STEPS = 60
+
+    # Maximum time in seconds a scalar stays buffered
+    SCALAR_FLUSH_INTERVAL = 1.0
+
     def __init__(self, **kwargs):
         self.operation_mode = kwargs['operation_mode']
         self.worker_name = kwargs.get('worker_name', 'worker')
-
-        self.steps = []  # sequence of step ids that had a frame added to the video stream
+        encoder_queue_size = kwargs.get('encoder_queue_size')
+        self.encoder_queue_size = RerunMetrics.ENCODER_QUEUE_SIZE if encoder_queue_size is None else encoder_queue_size
+        self.drop_policy = kwargs.get('drop_policy') or DropPolicy.DROP_OLDEST
+        self.encoder_profile = kwargs.get('encoder_profile') or EncoderProfile()
 
         self.container = av.open("/dev/null", "w", format="h264")
-        self.streams = {}
+        self.encoders: dict[str, VideoEncoder] = {}
+        self.stream_fps: dict[str, int] = {}
+        self.stream_profiles: dict[str, EncoderProfile] = {}
+        self.metric_joint_paths: dict[str, list[str]] = {}
+
+        self.scalars = ScalarBuffer(
+            self.send_scalars,
+            kwargs.get('scalar_batch_steps', RerunMetrics.SCALAR_BATCH_STEPS),
+            kwargs.get('scalar_flush_interval', RerunMetrics.SCALAR_FLUSH_INTERVAL),
+        )
 
     def recording_path(self, recording_id: str) -> str:
         return f"{Configuration.WORK_DIR}/recordings/{recording_id}.rrd"
@@ -42,6 +67,10 @@ class RerunMetrics:
     def init_rerun(self, recording_id: str):
         self.LOGGER.info(f"Initializing recording ID {recording_id} for application {RerunMetrics.APPLICATION_ID} and worker {self.worker_name}")
 
+        # the queued frames and the buffered scalars belong to the previous recording
+        self.flush_streams()
+        self.scalars.flush()
+
         rr.init(RerunMetrics.APPLICATION_ID, recording_id=recording_id)
 
         match self.operation_mode:
@@ -59,31 +88,46 @@ class RerunMetrics:
         self.add_joint_metric_labels()
 
         self.step = 0
-        self.steps.clear()
 
     def end_recording(self):
         """Flush and close the current recording stream so the RRD file has a valid footer."""
+        self.scalars.flush()
         if self.operation_mode == OperationMode.SAVE:
             rr.disconnect()
 
-    def create_stream(self, fps: int):
+    def create_stream(self, fps: int, encoder_profile: EncoderProfile):
         stream = self.container.add_stream("libx264", rate=fps)
+        encoder_profile.apply(stream.codec_context)
         stream.max_b_frames = 0 # current limitation of rerun.io
         return stream
 
     def flush_streams(self):
-        for metric_name in self.streams:
-            self.encode_frame(metric_name, None)
+        for encoder in self.encoders.values():
+            encoder.finish()
 
     def close_container(self):
         self.flush_streams()
+        self.scalars.flush()
 
         # Close the container
         self.container.close()
 
-    def add_video_stream(self, metric_name: str, fps: int):
+    def add_video_stream(self, metric_name: str, fps: Optional[int] = None, encoder_profile: Optional[EncoderProfile] = None):
+        """Start a new video stream, finishing the previous stream of the same metric.
+
+        The fps and the encoder profile default to the previous stream's, the encoder profile to the one of the metrics for a new stream.
+        """
+        if metric_name in self.encoders:
+            self.encoders[metric_name].finish()
+        if fps is None:
+            fps = self.stream_fps[metric_name]
+        self.stream_fps[metric_name] = fps
+        if encoder_profile is None:
+            encoder_profile = self.stream_profiles.get(metric_name, self.encoder_profile)
+        self.stream_profiles[metric_name] = encoder_profile
+
         rr.log(metric_name, rr.VideoStream(codec="h264"), static=True)
-        self.streams[metric_name] = self.create_stream(fps)
+        self.encoders[metric_name] = VideoEncoder(metric_name, self.create_stream(fps, encoder_profile), self, self.encoder_queue_size, self.drop_policy)
 
     def add_joint_metric_labels(self):
         self.add_child_metric_label(f"/latency", self.worker_name, f"{self.worker_name} latency (ms)")
@@ -117,26 +161,33 @@ class RerunMetrics:
         self.step += 1
 
     def log_sim_qpos(self, simulation_frame: SimulationFrame):
-        for i, joint_name in enumerate(Configuration.JOINT_NAMES):
-            self.add_metric("/sim/qpos", joint_name, simulation_frame.qpos[i])
-            if simulation_frame.control_pos is not None:
-                self.add_metric(RerunMetrics.CONTROL_POS_METRIC, joint_name, simulation_frame.control_pos[i])
-            if simulation_frame.velocity is not None:
-                self.add_metric("/sim/velocity", joint_name, simulation_frame.velocity[i])
-            if simulation_frame.control_force is not None:
-                self.add_metric("/sim/control_force", joint_name, simulation_frame.control_force[i])
+        self.add_joint_metric("/sim/qpos", simulation_frame.qpos)
+        if simulation_frame.control_pos is not None:
+            self.add_joint_metric(RerunMetrics.CONTROL_POS_METRIC, simulation_frame.control_pos)
+        if simulation_frame.velocity is not None:
+            self.add_joint_metric("/sim/velocity", simulation_frame.velocity)
+        if simulation_frame.control_force is not None:
+            self.add_joint_metric("/sim/control_force", simulation_frame.control_force)
 
     def log_real_qpos(self, feetech_frame: FeetechFrame):
-        for i, joint_name in enumerate(Configuration.JOINT_NAMES):
-            self.add_metric(RerunMetrics.CONTROL_POS_METRIC, joint_name, feetech_frame.control_pos[i])
-            self.add_metric(RerunMetrics.REAL_QPOS_METRIC, joint_name, feetech_frame.qpos[i])
-            if feetech_frame.velocity is not None:
-                self.add_metric("/follower/velocity", joint_name, feetech_frame.velocity[i])
-            if feetech_frame.control_force is not None:
-                self.add_metric("/follower/control_force", joint_name, feetech_frame.control_force[i])
-
-    def add_metric(self, metric_name, joint_name, metric_value):
-        rr.log(f"{metric_name}/{joint_name}", rr.Scalars(metric_value))
+        self.add_joint_metric(RerunMetrics.CONTROL_POS_METRIC, feetech_frame.control_pos)
+        self.add_joint_metric(RerunMetrics.REAL_QPOS_METRIC, feetech_frame.qpos)
+        if feetech_frame.velocity is not None:
+            self.add_joint_metric("/follower/velocity", feetech_frame.velocity)
+        if feetech_frame.control_force is not None:
+            self.add_joint_metric("/follower/control_force", feetech_frame.control_force)
+
+    def add_joint_metric(self, metric_name: str, joint_values: list[int] | list[float] | np.ndarray):
+        # one call for the whole array, the joint columns are sent with rr.send_columns once batched
+        self.scalars.add_array(self.step, self.joint_paths(metric_name), joint_values)
+
+    def joint_paths(self, metric_name: str) -> list[str]:
+        """The entity paths of the joints of a metric, one scalar column per joint."""
+        joint_paths = self.metric_joint_paths.get(metric_name)
+        if joint_paths is None:
+            joint_paths = [f"{metric_name}/{joint_name}" for joint_name in Configuration.JOINT_NAMES]
+            self.metric_joint_paths[metric_name] = joint_paths
+        return joint_paths
 
     def add_child_metric_label(self, prefix_name, child_name, label):
         self.add_metric_label(f"{prefix_name}/{child_name}", label)
@@ -147,33 +198,64 @@ class RerunMetrics:
     def set_time(self, step: int):
         rr.set_time(RerunMetrics.TIME_METRIC, sequence=step)
 
+    def send_scalars(self, entity_path: str, steps: list[int], values: list[float]):
+        rr.send_columns(
+            entity_path,
+            indexes=[rr.TimeColumn(RerunMetrics.TIME_METRIC, sequence=steps)],
+            columns=rr.Scalars.columns(scalars=values),
+        )
+
+    def flush_scalars(self):
+        self.scalars.flush()
+
     def log_latency(self, step: int, worker_name: str, latency_ms: float):
-        self.set_time(step)
-        rr.log(f"/latency/{worker_name}", rr.Scalars(latency_ms))
+        self.scalars.add(step, f"/latency/{worker_name}", latency_ms)
 
-    def log_qpos(self, step: int, worker_name: str, qpos: list[int] | list[float]):
-        self.set_time(step)
-        for i, joint_name in enumerate(Configuration.JOINT_NAMES):
-            self.add_metric(f"/{worker_name}/qpos", joint_name, qpos[i])
+    def log_queue_delay(self, step: int, worker_name: str, queue_delay_ms: float):
+        self.scalars.add(step, f"/queue_delay/{worker_name}", queue_delay_ms)
+
+    def log_tick_jitter(self, step: int, worker_name: str, jitter_ms: float, missed_ticks: int):
+        self.scalars.add(step, f"/{worker_name}/jitter", jitter_ms)
+        self.scalars.add(step, f"/{worker_name}/missed_ticks", missed_ticks)
+
+    def log_rate(self, step: int, worker_name: str, fps: int, decimations: dict[str, int]):
+        self.scalars.add(step, f"/{worker_name}/fps", fps)
+        for decimated_worker_name, decimation in decimations.items():
+            self.scalars.add(step, f"/decimation/{decimated_worker_name}", decimation)
+
+    def log_frame_age(self, step: int, worker_name: str, frame_age_ms: float):
+        self.scalars.add(step, f"/{worker_name}/frame_age", frame_age_ms)
+
+    def log_tracking(self, step: int, worker_name: str, detected: bool, latency_saved_ms: float, drift: Optional[float]):
+        self.scalars.add(step, f"/{worker_name}/detected", int(detected))
+        self.scalars.add(step, f"/{worker_name}/latency_saved", latency_saved_ms)
+        if drift is not None:
+            self.scalars.add(step, f"/{worker_name}/drift", drift)
 
-    def log_control_force(self, step: int, worker_name: str, control_force: list[int] | list[float]):
+    def log_render_time(self, step: int, worker_name: str, render_pass: str, render_time_ms: float):
+        self.scalars.add(step, f"/{worker_name}/render_time/{render_pass}", render_time_ms)
+
+    def log_histogram(self, step: int, metric_name: str, bin_starts, counts):
         self.set_time(step)
-        for i, joint_name in enumerate(Configuration.JOINT_NAMES):
-            self.add_metric(f"/{worker_name}/control_force", joint_name, control_force[i])
+        rr.log(metric_name, rr.BarChart(counts, abscissa=bin_starts))
+
+    def log_qpos(self, step: int, worker_name: str, qpos: list[int] | list[float] | np.ndarray):
+        self.scalars.add_array(step, self.joint_paths(f"/{worker_name}/qpos"), qpos)
+
+    def log_control_force(self, step: int, worker_name: str, control_force: list[int] | list[float] | np.ndarray):
+        self.scalars.add_array(step, self.joint_paths(f"/{worker_name}/control_force"), control_force)
 
     def log_frame(self, step: int, video_metric: str, frame: av.VideoFrame):
-        # check if self.steps last element is step, only add step once
-        if len(self.steps) == 0 or self.steps[-1] < step:
-            self.steps.append(step)
-
-        self.encode_frame(video_metric, frame)
-
-    def encode_frame(self, video_metric: str, frame: av.VideoFrame):
-        stream: av.VideoStream = self.streams[video_metric]
-        for p in stream.encode(frame):
-            packet: av.Packet = p
-            self.set_time(self.steps[packet.pts]) # frames may be emitted out of order and some steps may not have a corresponding frame
-            rr.log(video_metric, rr.VideoStream.from_fields(sample=bytes(packet)))
+        self.encoders[video_metric].submit(step, frame)
+
+    def log_packet(self, step: int, video_metric: str, packet: av.Packet):
+        # called from the encoder thread, the time is set on a thread local timeline
+        self.set_time(step)
+        rr.log(video_metric, rr.VideoStream.from_fields(sample=bytes(packet)))
+
+    def log_encode_latency(self, step: int, video_metric: str, latency_ms: float, dropped_frames: int):
+        self.scalars.add(step, f"/encode_latency{video_metric}", latency_ms)
+        self.scalars.add(step, f"/encode_dropped{video_metric}", dropped_frames)
 
     def log_raw_frame(self, step: int, metric_name: str, frame):
         """Log a raw bitmap frame to rerun.io.
@@ -0,0 +1,69 @@
+import threading
+import time
+from typing import Callable, Sequence
+
+
+class ScalarBuffer:
+    """Accumulates scalar metrics per entity path, and sends them in columns, one call per entity path and batch.
+
+    Logging a scalar only appends it to its column, instead of a rr.log call per joint per step.
+    The columns are sent once an entity path buffered batch_steps values, or once flush_interval seconds elapsed since the last send.
+    Thread safe, as the video encoder threads log their latencies too.
+    """
+
+    def __init__(self, send: Callable[[str, list[int], list[float]], None], batch_steps: int, flush_interval: float):
+        """Initialize the buffer.
+
+        Args:
+            send: Sends the (entity_path, steps, values) columns of an entity path
+            batch_steps: Number of values buffered per entity path before sending
+            flush_interval: Maximum time in seconds a value stays buffered, as long as values keep being added
+        """
+        self.send = send
+        self.batch_steps = batch_steps
+        self.flush_interval = flush_interval
+        self.columns: dict[str, tuple[list[int], list[float]]] = {}
+        self.lock = threading.Lock()
+        self.last_flush_time = time.monotonic()
+
+    def add(self, step: int, entity_path: str, value: float):
+        self.add_array(step, (entity_path,), (value,))
+
+    def add_array(self, step: int, entity_paths: Sequence[str], values: Sequence[float]):
+        """Buffer the values of an array at a step, like the joint values, one entity path per element, under a single lock."""
+        with self.lock:
+            full = False
+            for entity_path, value in zip(entity_paths, values):
+                column = self.columns.get(entity_path)
+                if column is None:
+                    column = ([], [])
+                    self.columns[entity_path] = column
+
+                steps, column_values = column
+                steps.append(step)
+                column_values.append(value)
+                full = full or len(steps) >= self.batch_steps
+
+            if not full and time.monotonic() - self.last_flush_time < self.flush_interval:
+                return
+
+            columns = self.swap_columns()
+
+        self.send_columns(columns)
+
+    def flush(self):
+        """Send every buffered value."""
+        with self.lock:
+            columns = self.swap_columns()
+
+        self.send_columns(columns)
+
+    def swap_columns(self) -> dict[str, tuple[list[int], list[float]]]:
+        columns = self.columns
+        self.columns = {}
+        self.last_flush_time = time.monotonic()
+        return columns
+
+    def send_columns(self, columns: dict[str, tuple[list[int], list[float]]]):
+        for entity_path, (steps, values) in columns.items():
+            self.send(entity_path, steps, values)
@@ -0,0 +1,134 @@
+import queue
+import threading
+import time
+from enum import Enum
+from typing import Optional
+
+import av
+
+from slobot.configuration import Configuration
+
+
+class DropPolicy(Enum):
+    BLOCK = "block"              # wait for the encoder to catch up, delaying the caller
+    DROP_NEWEST = "drop_newest"  # drop the submitted frame
+    DROP_OLDEST = "drop_oldest"  # drop the oldest queued frame, to keep the video close to real time
+
+
+class VideoEncoder:
+    """Encodes the frames of a video stream, logging the H.264 packets to Rerun.io.
+
+    With a queue size, frames are encoded in a background thread, so that libx264 never delays the caller's next step.
+    When the encoder falls behind and the queue is full, the drop policy decides which frame is dropped, if any.
+    Without a queue, frames are encoded synchronously by the caller.
+    The latency of each encoded frame and the number of dropped frames are logged along with the packets.
+    """
+
+    LOGGER = Configuration.logger(__name__)
+
+    def __init__(self, metric_name: str, stream: av.VideoStream, metrics, queue_size: int, drop_policy: DropPolicy):
+        """Initialize the encoder.
+
+        Args:
+            metric_name: The video metric to log the packets to
+            stream: The libx264 stream
+            metrics: The RerunMetrics logging the packets and the encode latencies
+            queue_size: Maximum number of frames waiting to be encoded, 0 to encode synchronously
+            drop_policy: What to do with a frame submitted while the queue is full
+        """
+        self.metric_name = metric_name
+        self.stream = stream
+        self.metrics = metrics
+        self.drop_policy = drop_policy
+        self.steps = []  # step of each encoded frame, indexed by the packet pts
+        self.dropped_frames = 0
+        self.late_frames = 0  # frames submitted after finish, dropped
+        self.error: Optional[Exception] = None
+        self.finished = False
+
+        self.queue: Optional[queue.Queue] = None
+        self.thread: Optional[threading.Thread] = None
+        if queue_size > 0:
+            self.queue = queue.Queue(maxsize=queue_size)
+            self.thread = threading.Thread(target=self.encode_loop, name=f"encoder{metric_name}", daemon=True)
+            self.thread.start()
+
+    def submit(self, step: int, frame: av.VideoFrame):
+        """Encode a frame, or queue it for the encoder thread."""
+        if self.error is not None:
+            raise self.error
+
+        if self.finished:
+            # the stream was flushed, a frame encoded after the end of the stream would be lost or restart it
+            if self.late_frames == 0:
+                self.LOGGER.warning(f"Dropped frame of step {step} submitted to the finished encoder of {self.metric_name}")
+            self.late_frames += 1
+            return
+
+        if self.thread is None:
+            self.encode(step, frame)
+            return
+
+        match self.drop_policy:
+            case DropPolicy.BLOCK:
+                self.queue.put((step, frame))
+            case DropPolicy.DROP_NEWEST:
+                try:
+                    self.queue.put_nowait((step, frame))
+                except queue.Full:
+                    self.dropped_frames += 1
+            case DropPolicy.DROP_OLDEST:
+                while True:
+                    try:
+                        self.queue.put_nowait((step, frame))
+                        break
+                    except queue.Full:
+                        try:
+                            self.queue.get_nowait()
+                            self.dropped_frames += 1
+                        except queue.Empty:
+                            pass  # the encoder thread just took it
+
+    def encode_loop(self):
+        try:
+            while True:
+                item = self.queue.get()
+                if item is None:
+                    return
+                step, frame = item
+                self.encode(step, frame)
+        except Exception as e:
+            self.LOGGER.error(f"Encoder of {self.metric_name} error: {e}")
+            self.error = e
+
+    def encode(self, step: int, frame: av.VideoFrame):
+        start_time = time.perf_counter()
+        self.steps.append(step)
+        self.log_packets(self.stream.encode(frame))
+        latency_ms = (time.perf_counter() - start_time) * 1000
+        self.metrics.log_encode_latency(step, self.metric_name, latency_ms, self.dropped_frames)
+
+    def log_packets(self, packets: list[av.Packet]):
+        for packet in packets:
+            # frames may be emitted out of order and some steps may not have a corresponding frame
+            self.metrics.log_packet(self.steps[packet.pts], self.metric_name, packet)
+
+    def finish(self):
+        """Encode the queued frames, stop the encoder thread, then flush the packets buffered by libx264."""
+        if self.finished:
+            return
+        self.finished = True
+
+        if self.thread is not None:
+            # the end marker is never dropped
+            self.queue.put(None)
+            self.thread.join()
+            self.thread = None
+
+        if self.error is not None:
+            raise self.error
+
+        self.log_packets(self.stream.encode(None))
+
+        if self.dropped_frames > 0:
+            self.LOGGER.warning(f"Dropped {self.dropped_frames} frames of {self.metric_name}, the encoder could not keep up")
@@ -1,3 +1,4 @@
+import numpy as np
 import torch
 import genesis.utils.geom as gu
 
@@ -6,7 +7,7 @@ from functools import cached_property
 
 from slobot.genesis import Genesis
 from slobot.configuration import Configuration
-from slobot.simulation_frame import SimulationFrame, CameraFrame
+from slobot.simulation_frame import SimulationFrame, SimulationFrameBatch, CameraFrame
 from slobot.feetech_frame import FeetechFrame
 from slobot.feetech import Feetech
 
@@ -33,6 +34,9 @@ class RoboticArm():
         self.segmentation = kwargs.get('segmentation', False)
         self.normal = kwargs.get('normal', False)
 
+        # pass batch_frames=True for the step handler to receive a SimulationFrameBatch of every environment
+        self.batch_frames = kwargs.get('batch_frames', False)
+
     @cached_property
     def joint_names(self):
         return [
@@ -81,17 +85,18 @@ class RoboticArm():
         if self.step_handler is None:
             return
 
-        simulation_frame = self.create_simulation_frame()
+        simulation_frame = self.create_simulation_frame_batch() if self.batch_frames else self.create_simulation_frame()
         self.step_handler.handle_step(simulation_frame)
         return simulation_frame
 
     def create_simulation_frame(self) -> SimulationFrame:
         current_time = time.time()
 
-        qpos = self.genesis.entity.get_qpos()[0].tolist()
-        velocity = self.genesis.entity.get_dofs_velocity()[0].tolist()
-        force = self.genesis.entity.get_dofs_force()[0].tolist()
-        control_force = self.genesis.entity.get_dofs_control_force()[0].tolist()
+        # arrays of environment 0, no conversion to lists
+        qpos = self.host_array(self.genesis.entity.get_qpos()[0])
+        velocity = self.host_array(self.genesis.entity.get_dofs_velocity()[0])
+        force = self.host_array(self.genesis.entity.get_dofs_force()[0])
+        control_force = self.host_array(self.genesis.entity.get_dofs_control_force()[0])
 
         simulation_frame = SimulationFrame(
             timestamp=current_time,
@@ -127,6 +132,74 @@ class RoboticArm():
 
         return simulation_frame
 
+    def create_simulation_frame_batch(self) -> SimulationFrameBatch:
+        """Capture the state and the side camera images of every environment, as contiguous arrays, without converting to lists."""
+        simulation_frame_batch = SimulationFrameBatch(
+            timestamp=time.time(),
+            qpos=self.env_array(self.genesis.entity.get_qpos()),
+            velocity=self.env_array(self.genesis.entity.get_dofs_velocity()),
+            force=self.env_array(self.genesis.entity.get_dofs_force()),
+            control_force=self.env_array(self.genesis.entity.get_dofs_control_force()),
+            side_camera_frame=CameraFrame(),
+        )
+
+        if self.rgb or self.depth or self.segmentation or self.normal:
+            simulation_frame_batch.side_camera_frame = self.render_batch(self.genesis.side_camera)
+
+        return simulation_frame_batch
+
+    def env_array(self, tensor: torch.Tensor) -> np.ndarray:
+        # one host copy for all the environments, shaped (n_envs, n_dofs)
+        return self.host_array(tensor).reshape(self.n_envs(), -1)
+
+    def host_array(self, tensor: torch.Tensor) -> np.ndarray:
+        tensor = tensor.detach()
+        if tensor.device.type == "cpu":
+            # copied, so that the frame does not share memory with a tensor the solver may update
+            return tensor.numpy().copy()
+
+        # the device to host transfer already returns a fresh tensor
+        return tensor.cpu().numpy()
+
+    def n_envs(self) -> int:
+        return max(self.genesis.scene.n_envs, 1)
+
+    def render_batch(self, camera) -> CameraFrame:
+        """Render the camera for every environment, stacking the images into (n_envs, H, W, 3) arrays.
+
+        A batched renderer already returns the images of every environment.
+        Otherwise, the camera is moved by the offset of each environment in turn, the images being copied into preallocated arrays.
+        """
+        n_envs = self.n_envs()
+        images = camera.render(rgb=self.rgb, depth=self.depth, segmentation=self.segmentation, colorize_seg=True, normal=self.normal)
+        if self.is_batched(images):
+            return CameraFrame(*[None if image is None else np.ascontiguousarray(image) for image in images])
+
+        batches = [
+            None if image is None else np.empty((n_envs,) + image.shape, dtype=image.dtype)
+            for image in images
+        ]
+        for env_idx in range(n_envs):
+            if env_idx > 0:
+                env_offset = self.genesis.scene.envs_offset[env_idx]
+                camera.set_pose(pos=self.genesis.camera_pos + env_offset, lookat=self.genesis.lookat + env_offset)
+                images = camera.render(rgb=self.rgb, depth=self.depth, segmentation=self.segmentation, colorize_seg=True, normal=self.normal)
+
+            for batch, image in zip(batches, images):
+                if batch is not None:
+                    batch[env_idx] = image
+
+        if n_envs > 1:
+            camera.set_pose(pos=self.genesis.camera_pos, lookat=self.genesis.lookat)
+
+        return CameraFrame(*batches)
+
+    def is_batched(self, images) -> bool:
+        rgb, depth, segmentation, normal = images
+        if depth is not None:
+            return depth.ndim == 3
+        return next(image for image in (rgb, segmentation, normal) if image is not None).ndim == 4
+
     def handle_qpos(self, feetech_frame: FeetechFrame):
         self.feetech_frame = feetech_frame
         self.genesis.entity.control_dofs_position(feetech_frame.control_pos)
@@ -0,0 +1,94 @@
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Hashable
+
+from slobot.configuration import Configuration
+from slobot.video_writer import VideoWriter
+
+
+class SegmentEncoderPool:
+    """Encodes the segments of several video streams concurrently, one encoder thread per stream.
+
+    The operations of a stream run in order on its own thread, while the streams, like the frame types and the environments, encode in parallel.
+    Once every stream finalized a segment, its result is published, the segments being published in the order they were closed.
+    A stream holds at most MAX_PENDING_FRAMES frames waiting to be encoded, beyond that the caller waits for the encoder to catch up.
+    """
+
+    LOGGER = Configuration.logger(__name__)
+
+    # Maximum number of frames of a stream waiting to be encoded
+    MAX_PENDING_FRAMES = 30
+
+    def __init__(self, video_writers: dict[Hashable, VideoWriter], publish: Callable[[Any], None]):
+        """Initialize the pool.
+
+        Args:
+            video_writers: The video writer of each stream
+            publish: Called with the result of each segment, once all its streams are finalized
+        """
+        self.video_writers = video_writers
+        self.publish = publish
+        self.executors = {
+            stream_id: ThreadPoolExecutor(max_workers=1, thread_name_prefix=f"encoder_{stream_id}")
+            for stream_id in video_writers
+        }
+        self.pending_futures = {stream_id: deque() for stream_id in video_writers}
+
+        # a single thread publishes the segments, in order
+        self.publisher = ThreadPoolExecutor(max_workers=1, thread_name_prefix="segment_publisher")
+        self.publish_futures: list[Future] = []
+
+    def open_segment(self, filenames: dict[Hashable, str]):
+        for stream_id, video_writer in self.video_writers.items():
+            self.submit(stream_id, video_writer.open_segment, filenames[stream_id])
+
+    def write_frames(self, frames: dict[Hashable, Any], timestamp: float):
+        for stream_id, video_writer in self.video_writers.items():
+            self.submit(stream_id, video_writer.write_frame, frames[stream_id], timestamp)
+
+    def close_segment(self, segment_result: Any, last: bool = False):
+        """Finalize the current segment of every stream, then publish the segment result."""
+        for stream_id, video_writer in self.video_writers.items():
+            self.submit(stream_id, video_writer.close if last else video_writer.close_segment)
+
+        # the frames of the segment still pending, up to the finalization
+        futures = [future for pending_futures in self.pending_futures.values() for future in pending_futures]
+        self.publish_futures.append(self.publisher.submit(self.publish_segment, futures, segment_result))
+
+    def publish_segment(self, futures: list[Future], segment_result: Any):
+        try:
+            for future in futures:
+                future.result()
+        except Exception as e:
+            self.LOGGER.error(f"Failed to encode segment {segment_result}: {e}")
+            raise
+
+        self.publish(segment_result)
+
+    def submit(self, stream_id: Hashable, fn: Callable, *args) -> Future:
+        future = self.executors[stream_id].submit(fn, *args)
+
+        pending_futures = self.pending_futures[stream_id]
+        pending_futures.append(future)
+        while pending_futures and (len(pending_futures) > self.MAX_PENDING_FRAMES or pending_futures[0].done()):
+            # raises the encoding error, if any
+            pending_futures.popleft().result()
+
+        return future
+
+    def shutdown(self, end_marker: Any = None):
+        """Wait for the streams to be encoded and the segments to be published, then publish the end marker.
+
+        Raises the first encoding error, if any.
+        """
+        self.publisher.submit(self.publish, end_marker)
+
+        for executor in self.executors.values():
+            executor.shutdown(wait=True)
+        self.publisher.shutdown(wait=True)
+
+        for future in self.publish_futures:
+            future.result()
+        for pending_futures in self.pending_futures.values():
+            for future in pending_futures:
+                future.result()
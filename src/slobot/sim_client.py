@@ -4,6 +4,8 @@ from slobot.configuration import Configuration
 
 import time
 
+import numpy as np
+
 class SimClient():
 
     LOGGER = Configuration.logger(__name__)
@@ -19,7 +21,7 @@ class SimClient():
         period = 1.0 / fps
         for qpos in job:
             SimClient.LOGGER.info(f"Received qpos {qpos}")
-            simulation_frame = SimulationFrame(qpos=qpos)
+            simulation_frame = SimulationFrame(qpos=np.array(qpos, dtype=np.float32))
 
             current_time = time.time()
             delta = current_time - (previous_time + period)
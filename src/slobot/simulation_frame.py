@@ -1,22 +1,28 @@
 from dataclasses import dataclass
 
+import numpy as np
+
 from slobot.feetech_frame import FeetechFrame
 
-@dataclass
+@dataclass(slots=True)
 class CameraFrame:
     rgb: any = None
     depth: any = None
     segmentation: any = None
     normal: any = None
 
-@dataclass
+@dataclass(slots=True)
 class SimulationFrame:
+    """State and camera images of the simulation at a step.
+
+    The joint fields are 1-D arrays of the joint values, which the consumers index or pass on as is, without converting to lists.
+    """
     timestamp: float = None
-    control_pos: list[float] = None
-    qpos: list[float] = None
-    velocity: list[float] = None
-    force: list[float] = None
-    control_force: list[float] = None
+    control_pos: np.ndarray = None
+    qpos: np.ndarray = None
+    velocity: np.ndarray = None
+    force: np.ndarray = None
+    control_force: np.ndarray = None
     side_camera_frame: CameraFrame = None
     link_camera_frame: CameraFrame = None
     feetech_frame: FeetechFrame = None
@@ -30,4 +36,54 @@ class SimulationFrame:
             case 2:
                 return self.side_camera_frame.segmentation
             case 3:
-                return self.normal
\ No newline at end of file
+                return self.side_camera_frame.normal
+
+@dataclass(slots=True)
+class SimulationFrameBatch:
+    """State and side camera images of every environment at a step, as contiguous arrays with a leading n_envs axis.
+
+    The joint arrays have shape (n_envs, n_dofs). The rgb, segmentation and normal images have shape (n_envs, H, W, 3), the depth maps (n_envs, H, W).
+    """
+    timestamp: float = None
+    qpos: np.ndarray = None
+    velocity: np.ndarray = None
+    force: np.ndarray = None
+    control_force: np.ndarray = None
+    side_camera_frame: CameraFrame = None
+
+    @property
+    def n_envs(self) -> int:
+        return self.qpos.shape[0]
+
+    def env_frame(self, env_idx: int) -> SimulationFrame:
+        """The frame of an environment, as views of the batch arrays."""
+        side_camera_frame = CameraFrame(
+            rgb=self.env_image(self.side_camera_frame.rgb, env_idx),
+            depth=self.env_image(self.side_camera_frame.depth, env_idx),
+            segmentation=self.env_image(self.side_camera_frame.segmentation, env_idx),
+            normal=self.env_image(self.side_camera_frame.normal, env_idx),
+        )
+        return SimulationFrame(
+            timestamp=self.timestamp,
+            qpos=self.qpos[env_idx],
+            velocity=self.velocity[env_idx],
+            force=self.force[env_idx],
+            control_force=self.control_force[env_idx],
+            side_camera_frame=side_camera_frame,
+            link_camera_frame=CameraFrame(),
+        )
+
+    def frame(self, frame_id):
+        """The images of every environment for a frame type, with a leading n_envs axis."""
+        match frame_id:
+            case 0:
+                return self.side_camera_frame.rgb
+            case 1:
+                return self.side_camera_frame.depth
+            case 2:
+                return self.side_camera_frame.segmentation
+            case 3:
+                return self.side_camera_frame.normal
+
+    def env_image(self, images, env_idx):
+        return None if images is None else images[env_idx]
@@ -0,0 +1,271 @@
+"""Asyncio runner - hosts several workers in a single process."""
+
+import asyncio
+import collections
+import signal
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Optional
+
+from slobot.configuration import Configuration
+from slobot.teleop.asyncprocessing.fifo_queue import FifoQueue
+
+
+class InProcessQueue(FifoQueue):
+    """A FifoQueue between two workers of the same process, passing the payloads by reference.
+
+    Messages are neither serialized nor copied. Writes are thread safe, as the workers process their messages on executor threads.
+    Like poll_latest, reading returns the latest message whose deadline did not pass, dropping the stale ones,
+    but control messages are returned in order and never dropped.
+    """
+
+    CONTROL_MSG_TYPES = {
+        FifoQueue.MSG_RECORDING_ID,
+        FifoQueue.MSG_RESET,
+        FifoQueue.MSG_POISON_PILL,
+        FifoQueue.MSG_DECIMATION,
+    }
+
+    def __init__(self, name: str):
+        """Initialize an in-process queue.
+
+        Args:
+            name: The name of the queue
+        """
+        self.name = name
+        self.fd: Optional[int] = None
+        self.last_sent_time: Optional[float] = None
+        self.recorder = None
+        self.loop: Optional[asyncio.AbstractEventLoop] = None
+        self.messages = collections.deque()
+        self.ready: Optional[asyncio.Event] = None
+
+    def bind(self, loop: asyncio.AbstractEventLoop):
+        """Attach the queue to the event loop of the runner."""
+        self.loop = loop
+        self.ready = asyncio.Event()
+
+    def open_write(self):
+        pass
+
+    def open_read(self):
+        pass
+
+    def close(self):
+        pass
+
+    def cleanup(self):
+        pass
+
+    def write(self, msg_type: int, result_payload: Any, deadline: float, step: int):
+        """Enqueue a message, from the event loop or from any executor thread."""
+        message = (msg_type, deadline, step, result_payload, time.time())
+        self.loop.call_soon_threadsafe(self.put, message)
+
+    def try_write(self, msg_type: int, result_payload: Any, deadline: float, step: int) -> bool:
+        self.write(msg_type, result_payload, deadline, step)
+        return True
+
+    def poll_available(self) -> list[tuple[int, float, int, Any, float]]:
+        """Take every queued message without waiting, like the load reports polled by the cron on its own thread.
+
+        Returns:
+            List of (msg_type, deadline, step, payload, sent_time), in FIFO order
+        """
+        messages = []
+        while self.messages:
+            messages.append(self.messages.popleft())
+        return messages
+
+    def put(self, message: tuple[int, float, int, Any, float]):
+        self.messages.append(message)
+        self.ready.set()
+
+    async def wait(self):
+        """Wait until a message is queued."""
+        while not self.messages:
+            self.ready.clear()
+            await self.ready.wait()
+
+    async def get_latest(self) -> tuple[int, float, int, Any]:
+        """Wait for a message, then return the next control message or the latest non-stale message.
+
+        Returns:
+            Tuple of (msg_type, deadline, step, payload)
+        """
+        await self.wait()
+
+        latest_msg = None
+        current_time = time.time()
+        while self.messages:
+            msg_type, deadline, step, payload, sent_time = self.messages[0]
+            if msg_type in self.CONTROL_MSG_TYPES:
+                if latest_msg is None:
+                    # return the control message now, the data messages that follow it are read on the next call
+                    self.messages.popleft()
+                    self.last_sent_time = sent_time
+                    return msg_type, deadline, step, payload
+                break
+
+            self.messages.popleft()
+            if deadline > current_time or latest_msg is None:
+                latest_msg = (msg_type, deadline, step, payload)
+                self.last_sent_time = sent_time
+
+        return latest_msg
+
+
+class AsyncioRunner:
+    """Hosts several workers as coroutines of a single event loop, instead of one process per worker.
+
+    The workers talk over in-process queues, which cuts the IPC, the serialization and the memory footprint of
+    importing torch and Genesis in every process. Each worker waits for its input on the event loop, and handles
+    its messages on its own single-threaded executor, so the blocking I/O and the heavy processing of one worker do
+    not stall the others, and each worker always runs on the same thread, like Genesis requires.
+    The cron runs its ticking loop on its own executor thread.
+    A multi-input worker, like the detection server, waits for any of its input queues instead of polling them with epoll.
+
+    On SIGINT, the cron stops ticking, then a poison pill is sent to every worker, so that they all tear down.
+    """
+
+    LOGGER = Configuration.logger(__name__)
+
+    def __init__(self):
+        self.queues: dict[str, InProcessQueue] = {}
+        self.workers = []
+        self.crons = []
+        self.executors: dict[str, ThreadPoolExecutor] = {}
+        self.interrupted: Optional[asyncio.Event] = None
+
+    def queue(self, name: str) -> InProcessQueue:
+        """Get the queue of the given name, shared by its producer and its consumer."""
+        if name not in self.queues:
+            self.queues[name] = InProcessQueue(name)
+        return self.queues[name]
+
+    def add_worker(self, worker):
+        """Host a worker.
+
+        Workers with several input queues are multi-input workers. Workers without any input queue are considered as crons,
+        which start once all the other workers are set up.
+        """
+        if worker.input_queue is None and not self.is_multi_input(worker):
+            self.crons.append(worker)
+        else:
+            self.workers.append(worker)
+        self.executors[worker.worker_name] = ThreadPoolExecutor(max_workers=1, thread_name_prefix=worker.worker_name)
+
+    def run(self):
+        """Run the hosted workers until they all stop."""
+        asyncio.run(self.run_workers())
+
+    async def run_workers(self):
+        loop = asyncio.get_running_loop()
+        for queue in self.queues.values():
+            queue.bind(loop)
+
+        # set up every worker before the first tick, Genesis and YOLO take a while to load
+        await asyncio.gather(*[
+            loop.run_in_executor(self.executors[worker.worker_name], worker.setup)
+            for worker in self.workers
+        ])
+        self.LOGGER.info(f"Workers {[worker.worker_name for worker in self.workers]} set up")
+
+        self.interrupted = asyncio.Event()
+        loop.add_signal_handler(signal.SIGINT, self.interrupt)
+
+        worker_tasks = [
+            asyncio.create_task(self.run_multi_input_worker(worker) if self.is_multi_input(worker) else self.run_worker(worker))
+            for worker in self.workers
+        ]
+        cron_tasks = [
+            loop.run_in_executor(self.executors[cron.worker_name], cron.run)
+            for cron in self.crons
+        ]
+
+        # run until interrupted, until a worker or a cron fails, or until every worker stopped on a poison pill
+        for task in [*worker_tasks, *cron_tasks]:
+            task.add_done_callback(self.check_task)
+        interrupted_task = asyncio.create_task(self.interrupted.wait())
+        workers_task = asyncio.gather(*worker_tasks, return_exceptions=True)
+        await asyncio.wait([interrupted_task, workers_task], return_when=asyncio.FIRST_COMPLETED)
+
+        loop.remove_signal_handler(signal.SIGINT)
+        interrupted_task.cancel()
+
+        # stop the ticks first, so the workers are not fed after their poison pill
+        for cron in self.crons:
+            cron.stop()
+        cron_results = await asyncio.gather(*cron_tasks, return_exceptions=True)
+        self.stop_workers()
+        worker_results = await workers_task
+
+        for executor in self.executors.values():
+            executor.shutdown()
+
+        for result in [*cron_results, *worker_results]:
+            if isinstance(result, Exception):
+                raise result
+
+    async def run_worker(self, worker):
+        """Worker loop, the coroutine counterpart of WorkerBase.run."""
+        loop = asyncio.get_running_loop()
+        executor = self.executors[worker.worker_name]
+        try:
+            while True:
+                msg_type, deadline, step, payload = await worker.input_queue.get_latest()
+                handled = await loop.run_in_executor(executor, worker.handle_message, msg_type, deadline, step, payload, worker.input_queue.last_sent_time)
+                if not handled:
+                    break
+        except Exception as e:
+            self.LOGGER.error(f"Worker {worker.worker_name} error: {e}")
+            raise
+        finally:
+            await loop.run_in_executor(executor, worker.teardown)
+            self.LOGGER.info(f"Worker {worker.worker_name} stopped")
+
+    async def run_multi_input_worker(self, worker):
+        """Multi-input worker loop, the coroutine counterpart of MultiInputWorkerBase.run."""
+        loop = asyncio.get_running_loop()
+        executor = self.executors[worker.worker_name]
+        try:
+            running = True
+            while running:
+                waits = [asyncio.create_task(queue.wait()) for queue in worker.input_queues]
+                _, pending = await asyncio.wait(waits, return_when=asyncio.FIRST_COMPLETED)
+                for wait in pending:
+                    wait.cancel()
+
+                for input_index, queue in enumerate(worker.input_queues):
+                    if queue.messages and not await loop.run_in_executor(executor, worker.receive, input_index):
+                        running = False
+                        break
+                else:
+                    aligned = worker.pop_aligned()
+                    if aligned is not None:
+                        running = await loop.run_in_executor(executor, worker.handle_message, *aligned)
+        except Exception as e:
+            self.LOGGER.error(f"Worker {worker.worker_name} error: {e}")
+            raise
+        finally:
+            await loop.run_in_executor(executor, worker.teardown)
+            self.LOGGER.info(f"Worker {worker.worker_name} stopped")
+
+    @staticmethod
+    def is_multi_input(worker) -> bool:
+        return bool(getattr(worker, "input_queues", None))
+
+    def interrupt(self):
+        self.LOGGER.info("Runner interrupted")
+        self.interrupted.set()
+
+    def check_task(self, task: asyncio.Future):
+        if not task.cancelled() and task.exception() is not None:
+            self.interrupted.set()
+
+    def stop_workers(self):
+        """Send a poison pill to every worker, once the crons stopped ticking."""
+        for worker in self.workers:
+            # a multi-input worker only handles the control messages of its primary input
+            input_queue = worker.input_queues[0] if self.is_multi_input(worker) else worker.input_queue
+            input_queue.send_poison_pill()
@@ -0,0 +1,111 @@
+"""Drift-free ticker scheduling ticks on absolute deadlines."""
+
+import time
+
+import numpy as np
+
+
+class DeadlineTicker:
+    """Schedules tick k at t0 + k * period, so that scheduling errors never accumulate.
+
+    Waiting sleeps until shortly before the tick, then spins on the monotonic clock to absorb the time.sleep granularity.
+    Ticks that are already over when the wait starts are skipped and counted as missed.
+    Changing the period rebases the schedule on the current tick.
+    """
+
+    # Seconds spent spinning before each tick
+    SPIN_DURATION = 0.002
+
+    def __init__(self, period: float):
+        """Initialize the ticker.
+
+        Args:
+            period: Tick period in seconds
+        """
+        self.period = period
+        self.tick = 0
+        self.missed_ticks = 0
+        self.start_tick = 0
+        self.start_time = None
+        self.start_wall_time = None
+
+    def start(self):
+        """Start the ticker, tick 0 happens now."""
+        self.start_time = time.perf_counter()
+        self.start_wall_time = time.time()
+        self.start_tick = 0
+        self.tick = 0
+        self.missed_ticks = 0
+
+    def set_period(self, period: float):
+        """Change the period, starting from the current tick."""
+        self.start_time = self.scheduled_time(self.tick)
+        self.start_wall_time = self.tick_wall_time()
+        self.start_tick = self.tick
+        self.period = period
+
+    def scheduled_time(self, tick: int) -> float:
+        """Monotonic time at which a tick is scheduled."""
+        return self.start_time + (tick - self.start_tick) * self.period
+
+    def tick_wall_time(self) -> float:
+        """Wall clock time at which the current tick is scheduled."""
+        return self.start_wall_time + (self.tick - self.start_tick) * self.period
+
+    def deadline(self) -> float:
+        """Wall clock time by which the current tick must be processed, which is when the next tick is scheduled."""
+        return self.tick_wall_time() + self.period
+
+    def wait_next(self) -> float:
+        """Wait for the next tick, skipping the ticks that are already over.
+
+        Returns:
+            The jitter in seconds, i.e. how late the tick was released compared to its schedule
+        """
+        self.tick += 1
+        now = time.perf_counter()
+        late = now - self.scheduled_time(self.tick)
+        if late >= self.period:
+            missed = int(late // self.period)
+            self.missed_ticks += missed
+            self.tick += missed
+
+        scheduled_time = self.scheduled_time(self.tick)
+        self.wait_until(scheduled_time)
+        return time.perf_counter() - scheduled_time
+
+    def wait_until(self, target_time: float):
+        """Sleep until shortly before the target monotonic time, then spin until it is reached."""
+        sleep_time = target_time - time.perf_counter() - self.SPIN_DURATION
+        if sleep_time > 0:
+            time.sleep(sleep_time)
+
+        while time.perf_counter() < target_time:
+            pass
+
+
+class JitterHistogram:
+    """Histogram of the tick jitter in milliseconds, with an overflow bin for the outliers."""
+
+    # Bin width in milliseconds
+    BIN_WIDTH_MS = 0.1
+
+    # Upper bound of the last regular bin in milliseconds
+    MAX_JITTER_MS = 5.0
+
+    def __init__(self):
+        bin_count = int(round(self.MAX_JITTER_MS / self.BIN_WIDTH_MS))
+        self.bin_starts = np.arange(bin_count + 1) * self.BIN_WIDTH_MS  # the last bin collects everything above MAX_JITTER_MS
+        self.counts = np.zeros(bin_count + 1, dtype=np.int64)
+
+    def add(self, jitter_ms: float):
+        bin_id = min(int(max(jitter_ms, 0.0) / self.BIN_WIDTH_MS), len(self.counts) - 1)
+        self.counts[bin_id] += 1
+
+    def percentile(self, q: float) -> float:
+        """Upper bound in milliseconds of the bin holding the q-th percentile."""
+        total = self.counts.sum()
+        if total == 0:
+            return 0.0
+        bin_id = int(np.searchsorted(np.cumsum(self.counts), total * q / 100))
+        return float(self.bin_starts[bin_id] + self.BIN_WIDTH_MS)
@@ -0,0 +1,171 @@
+"""Fake Feetech arms and webcam, standing in for the USB devices to load test the async teleoperator pipeline."""
+
+import time
+from typing import Optional
+
+import cv2
+import numpy as np
+
+from slobot.configuration import Configuration
+
+
+class FakeFeetech:
+    """Stand-in for a Feetech arm, exposing the methods used by the leader and follower workers.
+
+    The leader follows a deterministic trajectory: each joint oscillates around the middle position, advancing by one sample per read.
+    The follower tracks the goal position with a first order lag, and reports a load proportional to the tracking error.
+    Every bus transaction (read or write) blocks for the configured bus latency, like a sync read or write on the serial bus.
+    """
+
+    LOGGER = Configuration.logger(__name__)
+
+    # Default duration of a bus transaction in milliseconds
+    BUS_LATENCY_MS = 1.0
+
+    # Number of reads per oscillation of the leader trajectory
+    TRAJECTORY_PERIOD = 300
+
+    # Oscillation amplitude of the leader trajectory in motor steps
+    AMPLITUDE = 200
+
+    # Fraction of the tracking error the follower catches up at every read
+    TRACKING_GAIN = 0.5
+
+    # Load reported per motor step of tracking error
+    LOAD_PER_STEP = 0.5
+
+    def __init__(self, robot_id: str, leader: bool, bus_latency_ms: float = BUS_LATENCY_MS):
+        """Initialize the fake arm.
+
+        Args:
+            robot_id: The arm id, for logging
+            leader: Replay the trajectory if True, track the goal position otherwise
+            bus_latency_ms: Duration of each bus transaction in milliseconds
+        """
+        self.robot_id = robot_id
+        self.leader = leader
+        self.bus_latency = bus_latency_ms / 1000
+        self.reads = 0
+        self.pos = np.array(Configuration.POS_MAP[Configuration.REFERENCE_FRAME], dtype=np.float64)
+        self.goal_pos = self.pos.copy()
+        # shift the phase of each joint so the joints do not move in sync
+        self.phases = np.arange(len(self.pos)) * np.pi / 3
+        self.LOGGER.info(f"Fake arm {robot_id} connected with a bus latency of {bus_latency_ms} ms")
+
+    def wait_bus(self):
+        """Block for the bus transaction, spinning as time.sleep is too coarse for sub-millisecond latencies."""
+        end_time = time.perf_counter() + self.bus_latency
+        while time.perf_counter() < end_time:
+            pass
+
+    def trajectory_pos(self, sample: int) -> np.ndarray:
+        """Leader position of a trajectory sample."""
+        angle = 2 * np.pi * sample / self.TRAJECTORY_PERIOD + self.phases
+        middle = np.array(Configuration.POS_MAP[Configuration.REFERENCE_FRAME], dtype=np.float64)
+        return middle + self.AMPLITUDE * np.sin(angle)
+
+    def get_pos(self) -> list[int]:
+        self.wait_bus()
+        if self.leader:
+            self.pos = self.trajectory_pos(self.reads)
+        else:
+            self.pos += self.TRACKING_GAIN * (self.goal_pos - self.pos)
+        self.reads += 1
+        return [int(round(pos)) for pos in self.pos]
+
+    def control_position(self, pos: list[int]):
+        self.wait_bus()
+        self.goal_pos = np.array(pos, dtype=np.float64)
+
+    def get_dofs_control_force(self) -> list[int]:
+        self.wait_bus()
+        return [int(load) for load in self.LOAD_PER_STEP * (self.goal_pos - self.pos)]
+
+    def disconnect(self):
+        self.LOGGER.info(f"Fake arm {self.robot_id} disconnected after {self.reads} reads")
+
+
+class FakeVideoCapture:
+    """Stand-in for cv2.VideoCapture, emitting synthetic BGR frames at the configured resolution and frame rate.
+
+    Reads block until the next frame is due, like a camera streaming at a fixed frame rate.
+    A late reader gets the current frame, the frames due in between are dropped.
+    Frame k is a color gradient with a vertical bar sweeping across the image, so that it only depends on k.
+    """
+
+    LOGGER = Configuration.logger(__name__)
+
+    # Number of frames for the bar to sweep across the image
+    SWEEP_FRAMES = 60
+
+    BAR_COLOR = (255, 255, 255)
+
+    def __init__(self, width: int, height: int, fps: int):
+        """Initialize the fake camera.
+
+        Args:
+            width: Frame width
+            height: Frame height
+            fps: Frame rate
+        """
+        self.width = width
+        self.height = height
+        self.fps = fps
+        self.frame_count = 0
+        self.dropped_frames = 0
+        self.start_time = time.perf_counter()
+        self.opened = True
+
+        # static background, copied into each frame before drawing the bar
+        x = np.linspace(0, 255, width, dtype=np.float32)
+        y = np.linspace(0, 255, height, dtype=np.float32)
+        self.background = np.empty((height, width, 3), dtype=np.uint8)
+        self.background[..., 0] = x[np.newaxis, :]
+        self.background[..., 1] = y[:, np.newaxis]
+        self.background[..., 2] = 128
+        self.LOGGER.info(f"Fake camera opened with resolution {width}x{height} @ {fps} FPS")
+
+    def isOpened(self) -> bool:
+        return self.opened
+
+    def set(self, prop_id: int, value: float) -> bool:
+        # the geometry and the frame rate are fixed at construction
+        return False
+
+    def get(self, prop_id: int) -> float:
+        match prop_id:
+            case cv2.CAP_PROP_FRAME_WIDTH:
+                return self.width
+            case cv2.CAP_PROP_FRAME_HEIGHT:
+                return self.height
+            case cv2.CAP_PROP_FPS:
+                return self.fps
+            case _:
+                return 0
+
+    def read(self, frame: Optional[np.ndarray] = None) -> tuple[bool, np.ndarray]:
+        """Wait for the next frame, then render it into the given buffer, or a new one if it does not match the resolution."""
+        due_frames = int((time.perf_counter() - self.start_time) * self.fps)
+        if due_frames > self.frame_count:
+            self.dropped_frames += due_frames - self.frame_count
+            self.frame_count = due_frames
+
+        sleep_time = self.start_time + self.frame_count / self.fps - time.perf_counter()
+        if sleep_time > 0:
+            time.sleep(sleep_time)
+
+        if frame is None or frame.shape != self.background.shape:
+            frame = np.empty_like(self.background)
+        self.render(self.frame_count, frame)
+        self.frame_count += 1
+        return True, frame
+
+    def render(self, frame_index: int, frame: np.ndarray):
+        np.copyto(frame, self.background)
+        bar_width = max(1, self.width // 20)
+        bar_x = (frame_index % self.SWEEP_FRAMES) * (self.width - bar_width) // self.SWEEP_FRAMES
+        frame[:, bar_x:bar_x + bar_width] = self.BAR_COLOR
+
+    def release(self):
+        self.opened = False
+        self.LOGGER.info(f"Fake camera released after {self.frame_count} frames, {self.dropped_frames} dropped")
@@ -3,6 +3,7 @@
 import os
 import struct
 import select
+import time
 from typing import Any, Optional
 
 from slobot.configuration import Configuration
@@ -11,9 +12,11 @@ from slobot.configuration import Configuration
 class FifoQueue:
     """A FIFO queue wrapper using Linux named pipes for inter-process communication.
     
-    Messages are binary-formatted with a fixed header containing length, type, deadline and step.
+    Messages are binary-formatted with a fixed header containing length, type, deadline, step and sent time.
     The deadline is the timestamp by which all downstream processing must complete.
+    The sent time is the timestamp at which the message was written, to trace the time spent in the queue.
     Supports polling for the latest message while dropping stale ones.
+    Written messages can be captured by a TrafficRecorder, to be replayed later.
     """
 
     # Queue names
@@ -24,26 +27,32 @@ class FifoQueue:
     QUEUE_WEBCAM_CAPTURE2 = 'webcam_capture2'
     QUEUE_OBJECT_DETECTION = 'detect_objects'  # Base name, append camera_id for specific instances
     QUEUE_SIM_STEP = 'sim_step'
+    QUEUE_LOAD_REPORT = 'load_report'  # Shared by all the workers, read by the cron
 
-    # Message header: [msg_length: u32][msg_type: u8][deadline: f64][step: u32]
-    HEADER_FORMAT = '<IBdI'  # little-endian: uint32, uint8, float64, uint32
+    # Message header: [msg_length: u32][msg_type: u8][deadline: f64][step: u32][sent_time: f64]
+    HEADER_FORMAT = '<IBdId'  # little-endian: uint32, uint8, float64, uint32, float64
     HEADER_SIZE = struct.calcsize(HEADER_FORMAT)
     
     # Message types
     MSG_EMPTY = 0             # Empty tick (no payload)
     MSG_POS = 1               # N-DOF int array (motor positions in steps)
-    MSG_QPOS_RENDER_FORCE = 2 # N-DOF float array + RGB array + depth array + segmentation array + normal array + N-DOF float array
+    MSG_QPOS_RENDER_FORCE = 2 # N-DOF float array + images and render times of the due render passes + N-DOF float array
     MSG_QPOS_QPOS_RGB = 3     # N-DOF float array + N-DOF float array + RGB array
     MSG_BGR = 4               # BGR array
     MSG_RECORDING_ID = 5      # string containing the recording id to update
     MSG_POS_FORCE = 6         # N-DOF int array + N-DOF int array (pos + control_force)
     MSG_OBJECT_DETECTION = 7  # Signal that a frame is ready in shared memory
+    MSG_LOAD_REPORT = 8       # Overrun statistics of a worker over a window of steps
+    MSG_DECIMATION = 9        # string containing the worker name and the decimation factor to apply
     MSG_RESET = 254           # Signal to reset the worker
     MSG_POISON_PILL = 255     # Signal to stop the worker
     
     # QPOS format: 6 int32 (motor positions in steps)
     QPOS_FORMAT = '<6i'
     QPOS_SIZE = struct.calcsize(QPOS_FORMAT)  # 24 bytes
+
+    # LOAD_REPORT format: worker name, steps, overruns, mean latency (ms), max lateness past the deadline (ms)
+    LOAD_REPORT_FORMAT = '<32sIIff'
     
     LOGGER = Configuration.logger(__name__)
 
@@ -69,7 +78,9 @@ class FifoQueue:
         self.name = name
         self.path = f"/tmp/slobot/fifo/{name}.fifo"
         self.fd: Optional[int] = None
-        self._read_buffer = b''        
+        self._read_buffer = b''
+        self.last_sent_time: Optional[float] = None  # sent time of the last polled message
+        self.recorder = None  # TrafficRecorder capturing the written messages
 
     def open_write(self):
         """Open the FIFO for writing (blocking until a reader connects)."""
@@ -89,6 +100,21 @@ class FifoQueue:
             os.makedirs(os.path.dirname(self.path), exist_ok=True)
             os.mkfifo(self.path)
 
+    def try_open_write(self) -> bool:
+        """Open the FIFO for writing without blocking.
+
+        Returns:
+            True if a reader is connected and the FIFO is open, False otherwise
+        """
+        self.ensure_exists()
+        try:
+            self.fd = os.open(self.path, os.O_WRONLY | os.O_NONBLOCK)
+        except OSError:
+            # ENXIO: no reader yet
+            return False
+        self.LOGGER.info(f"FIFO {self.name} opened for writing")
+        return True
+
     def drain(self):
         """Drain the FIFO by reading all available data."""
         drained_bytes = 0
@@ -121,7 +147,9 @@ class FifoQueue:
         payload = self.to_bytes(msg_type, result_payload)
 
         msg_len = self.HEADER_SIZE + len(payload)
-        header = struct.pack(self.HEADER_FORMAT, msg_len, msg_type, deadline, step)
+        header = struct.pack(self.HEADER_FORMAT, msg_len, msg_type, deadline, step, time.time())
+        if self.recorder is not None:
+            self.recorder.record_message(self.name, header + payload)
         try:
             os.write(self.fd, header + payload)
         except BrokenPipeError as bpe:
@@ -132,6 +160,29 @@ class FifoQueue:
             # retry once
             os.write(self.fd, header + payload)
 
+    def try_write(self, msg_type: int, result_payload: Any, deadline: float, step: int) -> bool:
+        """Write a message if a reader is connected and the FIFO has room, without ever blocking.
+
+        Returns:
+            True if written, False if dropped
+        """
+        if self.fd is None and not self.try_open_write():
+            return False
+
+        payload = self.to_bytes(msg_type, result_payload)
+        msg_len = self.HEADER_SIZE + len(payload)
+        header = struct.pack(self.HEADER_FORMAT, msg_len, msg_type, deadline, step, time.time())
+        try:
+            os.write(self.fd, header + payload)
+        except BlockingIOError:
+            return False
+        except BrokenPipeError:
+            # the reader is gone, reopen on the next write
+            os.close(self.fd)
+            self.fd = None
+            return False
+        return True
+
     def write_empty(self, deadline: float, step: int):
         """Write an empty tick message."""
         self.write(self.MSG_EMPTY, b'', deadline, step)
@@ -158,6 +209,10 @@ class FifoQueue:
         """Send a recording ID message to signal the recording ID to downstream workers."""
         self.write(self.MSG_RECORDING_ID, recording_id, 0.0, 0)
 
+    def send_decimation(self, worker_name: str, decimation: int):
+        """Send a decimation message, forwarded by the downstream workers until it reaches the target worker."""
+        self.write(self.MSG_DECIMATION, (worker_name, decimation), 0.0, 0)
+
     def poll_next(self) -> Optional[tuple[int, float, bytes]]:
         """Poll for the next message without dropping any.
         
@@ -169,13 +224,14 @@ class FifoQueue:
         """
         # Check if we already have a complete message in the buffer
         if len(self._read_buffer) >= self.HEADER_SIZE:
-            msg_len, msg_type, deadline, step = struct.unpack(
+            msg_len, msg_type, deadline, step, sent_time = struct.unpack(
                 self.HEADER_FORMAT, 
                 self._read_buffer[:self.HEADER_SIZE]
             )
             if len(self._read_buffer) >= msg_len:
                 payload = self._read_buffer[self.HEADER_SIZE:msg_len]
                 self._read_buffer = self._read_buffer[msg_len:]
+                self.last_sent_time = sent_time
                 return (msg_type, deadline, payload, step)
         
         # Wait for data to be available
@@ -193,17 +249,48 @@ class FifoQueue:
         
         # Try to parse one complete message
         if len(self._read_buffer) >= self.HEADER_SIZE:
-            msg_len, msg_type, deadline, step = struct.unpack(
+            msg_len, msg_type, deadline, step, sent_time = struct.unpack(
                 self.HEADER_FORMAT, 
                 self._read_buffer[:self.HEADER_SIZE]
             )
             if len(self._read_buffer) >= msg_len:
                 payload = self._read_buffer[self.HEADER_SIZE:msg_len]
                 self._read_buffer = self._read_buffer[msg_len:]
+                self.last_sent_time = sent_time
                 return (msg_type, deadline, payload, step)
         
         return None
 
+    def poll_available(self) -> list[tuple[int, float, int, Any, float]]:
+        """Poll every complete message without blocking.
+
+        Returns:
+            List of (msg_type, deadline, step, payload, sent_time), in FIFO order
+        """
+        try:
+            while True:
+                chunk = os.read(self.fd, 65536)
+                if not chunk:
+                    break
+                self._read_buffer += chunk
+        except BlockingIOError:
+            pass  # No more data available
+
+        messages = []
+        while len(self._read_buffer) >= self.HEADER_SIZE:
+            msg_len, msg_type, deadline, step, sent_time = struct.unpack(
+                self.HEADER_FORMAT,
+                self._read_buffer[:self.HEADER_SIZE]
+            )
+            if len(self._read_buffer) < msg_len:
+                break  # Incomplete message, wait for more data
+
+            payload = self.from_bytes(msg_type, self._read_buffer[self.HEADER_SIZE:msg_len])
+            self._read_buffer = self._read_buffer[msg_len:]
+            messages.append((msg_type, deadline, step, payload, sent_time))
+
+        return messages
+
     def poll_latest(self, timeout: Optional[float] = None) -> Optional[tuple[int, float, bytes]]:
         """Poll for the latest non-stale message.
         
@@ -216,8 +303,6 @@ class FifoQueue:
         Returns:
             Tuple of (msg_type, deadline, payload) or None if no message available
         """
-        import time
-        
         # Wait for data to be available
         if timeout is not None or timeout == 0:
             ready, _, _ = select.select([self.fd], [], [], timeout)
@@ -243,7 +328,7 @@ class FifoQueue:
         
         while len(self._read_buffer) >= self.HEADER_SIZE:
             # Peek at header
-            msg_len, msg_type, deadline, step = struct.unpack(
+            msg_len, msg_type, deadline, step, sent_time = struct.unpack(
                 self.HEADER_FORMAT, 
                 self._read_buffer[:self.HEADER_SIZE]
             )
@@ -263,6 +348,7 @@ class FifoQueue:
             # Keep only messages with deadline still in the future (or keep latest if all expired)
             if deadline > current_time or latest_msg is None:
                 latest_msg = (msg_type, deadline, step, payload)
+                self.last_sent_time = sent_time
         
         return latest_msg
 
@@ -282,6 +368,11 @@ class FifoQueue:
                 return b''
             case FifoQueue.MSG_OBJECT_DETECTION:
                 return b''
+            case FifoQueue.MSG_LOAD_REPORT:
+                return FifoQueue.pack_load_report(result_payload)
+            case FifoQueue.MSG_DECIMATION:
+                worker_name, decimation = result_payload
+                return f"{worker_name}={decimation}".encode('utf-8')
             case _:
                 raise ValueError(f"Unknown message type: {msg_type}")
 
@@ -301,6 +392,11 @@ class FifoQueue:
                 return None
             case FifoQueue.MSG_OBJECT_DETECTION:
                 return None
+            case FifoQueue.MSG_LOAD_REPORT:
+                return FifoQueue.parse_load_report(payload)
+            case FifoQueue.MSG_DECIMATION:
+                worker_name, decimation = payload.decode('utf-8').split('=')
+                return worker_name, int(decimation)
             case _:
                 raise ValueError(f"Unknown message type: {msg_type}")
 
@@ -314,6 +410,18 @@ class FifoQueue:
         """Parse a position payload into a list of ints (motor steps)."""
         return list(struct.unpack(FifoQueue.QPOS_FORMAT, payload))
 
+    @staticmethod
+    def pack_load_report(load_report: tuple[str, int, int, float, float]) -> bytes:
+        """Pack a (worker_name, steps, overruns, mean_latency_ms, max_lateness_ms) load report into bytes."""
+        worker_name, steps, overruns, mean_latency_ms, max_lateness_ms = load_report
+        return struct.pack(FifoQueue.LOAD_REPORT_FORMAT, worker_name.encode('utf-8'), steps, overruns, mean_latency_ms, max_lateness_ms)
+
+    @staticmethod
+    def parse_load_report(payload: bytes) -> tuple[str, int, int, float, float]:
+        """Parse a load report payload into (worker_name, steps, overruns, mean_latency_ms, max_lateness_ms)."""
+        worker_name, steps, overruns, mean_latency_ms, max_lateness_ms = struct.unpack(FifoQueue.LOAD_REPORT_FORMAT, payload)
+        return worker_name.rstrip(b'\0').decode('utf-8'), steps, overruns, mean_latency_ms, max_lateness_ms
+
     def cleanup(self):
         """Remove the FIFO file."""
         self.close()
@@ -0,0 +1,92 @@
+"""Continuous frame grabbing from a webcam, in a background thread."""
+
+import threading
+import time
+from typing import Optional
+
+import numpy as np
+
+from slobot.configuration import Configuration
+
+
+class FrameGrabber:
+    """Reads the webcam in a loop, in a background thread, always holding the most recent frame and its capture time.
+
+    A tick gets the latest frame immediately, instead of blocking until the driver delivers the next one,
+    so its latency no longer includes the exposure and the USB transfer. The price is the age of the frame at tick time.
+    The grab loop reads into a back buffer, then swaps it with the front buffer, so the lock is only held for the swap and the copy out.
+    """
+
+    LOGGER = Configuration.logger(__name__)
+
+    # Seconds to wait for the first frame
+    FIRST_FRAME_TIMEOUT = 5.0
+
+    def __init__(self, cap, name: str):
+        """Initialize the grabber.
+
+        Args:
+            cap: The opened cv2.VideoCapture, or FakeVideoCapture
+            name: Name of the grab thread
+        """
+        self.cap = cap
+        self.name = name
+        self.front: Optional[np.ndarray] = None
+        self.back: Optional[np.ndarray] = None
+        self.capture_time: Optional[float] = None
+        self.frame_count = 0
+        self.error: Optional[Exception] = None
+        self.running = False
+        self.condition = threading.Condition()
+        self.thread: Optional[threading.Thread] = None
+
+    def start(self):
+        self.running = True
+        self.thread = threading.Thread(target=self.grab_loop, name=self.name, daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        self.running = False
+        if self.thread is not None:
+            self.thread.join()
+            self.thread = None
+        self.LOGGER.info(f"Grab thread {self.name} stopped after {self.frame_count} frames")
+
+    def grab_loop(self):
+        try:
+            while self.running:
+                ret, frame = self.cap.read(self.back)
+                capture_time = time.time()
+                if not ret:
+                    raise RuntimeError("Failed to capture frame from webcam")
+
+                with self.condition:
+                    self.back = self.front
+                    self.front = frame
+                    self.capture_time = capture_time
+                    self.frame_count += 1
+                    self.condition.notify_all()
+        except Exception as e:
+            with self.condition:
+                self.error = e
+                self.condition.notify_all()
+
+    def read_latest(self, frame: Optional[np.ndarray] = None) -> tuple[np.ndarray, float]:
+        """Copy the most recent frame, waiting for the first one if needed.
+
+        Args:
+            frame: Buffer to copy the frame into, a new one is allocated if None or if it does not match the frame shape
+
+        Returns:
+            Tuple of (frame, capture time)
+        """
+        with self.condition:
+            if not self.condition.wait_for(lambda: self.front is not None or self.error is not None, self.FIRST_FRAME_TIMEOUT):
+                raise RuntimeError(f"No frame grabbed by {self.name} after {self.FIRST_FRAME_TIMEOUT} s")
+            if self.error is not None:
+                raise self.error
+
+            if frame is None or frame.shape != self.front.shape:
+                frame = np.empty_like(self.front)
+            np.copyto(frame, self.front)
+            return frame, self.capture_time
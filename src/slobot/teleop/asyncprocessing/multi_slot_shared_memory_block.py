@@ -0,0 +1,358 @@
+"""Multi-slot shared memory block for zero-copy frame handoff between processes."""
+
+import ctypes
+import ctypes.util
+import math
+import platform
+import numpy as np
+import multiprocessing.shared_memory as shm
+import struct
+from dataclasses import dataclass
+from typing import Callable, Optional
+
+from slobot.configuration import Configuration
+
+
+@dataclass
+class FrameLease:
+    frame_id: int
+    slot: int
+    generation: int
+    frame: np.ndarray  # read-only view into the slot
+
+
+class MultiSlotSharedMemoryBlock:
+    """A multi-buffered shared memory block for frame transfer, made consistent with a seqlock per slot.
+
+    The producer writes straight into an ndarray view of the slot following the latest one, then commits it as the latest frame.
+    The consumer leases a read-only view of the latest complete frame, then releases it.
+
+    Each slot has a generation counter, which is odd while the producer is writing into the slot.
+    The producer never waits for the consumers: a consumer detects that a slot was overwritten during its lease
+    because the generation changed, and retries on the new latest frame.
+    Only the producer writes into the header, so there is no check-then-set race between processes.
+    The seqlock only detects an overwrite after the fact, so the producer sizes the ring from the time a consumer holds a slot, see slots_for.
+
+    The counters are aligned uint64 that are loaded and stored in a single instruction.
+    The protocol relies on the stores of the producer, and the loads of the consumers, becoming visible in program order.
+    This holds on x86. On weakly ordered machines like ARM, a full memory fence is issued between them, through libatomic.
+    """
+
+    LOGGER = Configuration.logger(__name__)
+
+    # Default number of slots (triple buffering)
+    SLOTS = 3
+
+    # Default time in seconds a consumer holds a slot, copying the frame out of it
+    READER_HOLD_TIME = 0.005
+
+    # Default number of attempts to read a consistent frame
+    RETRIES = 3
+
+    # Layout:
+    # Byte 0-3: Width (uint32)
+    # Byte 4-7: Height (uint32)
+    # Byte 8-11: Slots (uint32)
+    # Byte 16-23: Latest frame (uint64), frame id << 8 | slot index, NO_FRAME if nothing was committed yet
+    # Byte 24+: Generation of each slot (uint64), odd while the slot is being written
+    # Slot data, each slot is aligned on 64 bytes
+    # Channels defaulted to 3 (BGR)
+    GEOMETRY_FORMAT = '<III'
+    LATEST_OFFSET = 16
+    GENERATIONS_OFFSET = 24
+    ALIGNMENT = 64
+    CHANNELS = 3
+    NO_FRAME = 0
+    SLOT_BITS = 8
+    SLOT_MASK = (1 << SLOT_BITS) - 1
+
+    # Machines with a total store order, where loads and stores are not reordered with the loads and stores of the same kind
+    STRONGLY_ORDERED_MACHINES = {"x86_64", "amd64", "x86", "i386", "i686"}
+
+    # memory order argument of atomic_thread_fence
+    ATOMIC_SEQ_CST = 5
+
+    @staticmethod
+    def align(size: int) -> int:
+        alignment = MultiSlotSharedMemoryBlock.ALIGNMENT
+        return (size + alignment - 1) // alignment * alignment
+
+    @staticmethod
+    def header_size(slots: int) -> int:
+        """Size in bytes of the header, padded to the alignment."""
+        return MultiSlotSharedMemoryBlock.align(MultiSlotSharedMemoryBlock.GENERATIONS_OFFSET + 8 * slots)
+
+    @staticmethod
+    def slot_size(width: int, height: int) -> int:
+        """Size in bytes of a slot, padded to the alignment."""
+        return MultiSlotSharedMemoryBlock.align(width * height * MultiSlotSharedMemoryBlock.CHANNELS)
+
+    @staticmethod
+    def block_size(width: int, height: int, slots: int = SLOTS) -> int:
+        """Total size in bytes of a block holding slots frames of the given resolution."""
+        return MultiSlotSharedMemoryBlock.header_size(slots) + slots * MultiSlotSharedMemoryBlock.slot_size(width, height)
+
+    @staticmethod
+    def slots_for(fps: float, reader_hold_time: float = READER_HOLD_TIME) -> int:
+        """Number of slots so that a consumer holding the latest frame for reader_hold_time is not overwritten.
+
+        The latest frame may already be one frame period old when it is leased, one slot is being written,
+        and the producer must not wrap around to the leased slot before the consumer releases it.
+        """
+        return max(MultiSlotSharedMemoryBlock.SLOTS, math.ceil(reader_hold_time * fps) + 2)
+
+    @staticmethod
+    def load_atomic_thread_fence(machine: str) -> Optional[Callable[[int], None]]:
+        """The atomic_thread_fence function of libatomic for a weakly ordered machine, None on a strongly ordered machine.
+
+        Raises:
+            RuntimeError: If the machine is weakly ordered and libatomic is not installed
+        """
+        if machine.lower() in MultiSlotSharedMemoryBlock.STRONGLY_ORDERED_MACHINES:
+            return None
+
+        library = ctypes.util.find_library("atomic")
+        if library is None:
+            raise RuntimeError(f"libatomic is required for the memory fences of the shared memory frames on {machine}")
+
+        atomic_thread_fence = ctypes.CDLL(library).atomic_thread_fence
+        atomic_thread_fence.argtypes = [ctypes.c_int]
+        atomic_thread_fence.restype = None
+        return atomic_thread_fence
+
+    @staticmethod
+    def create(name: str, width: int, height: int, slots: int = SLOTS) -> 'MultiSlotSharedMemoryBlock':
+        """Create a new multi-slot shared memory block.
+
+        Args:
+            name: Unique name for the shared memory block
+            width: Frame width
+            height: Frame height
+            slots: Number of slots
+
+        Returns:
+            New MultiSlotSharedMemoryBlock instance
+        """
+        size = MultiSlotSharedMemoryBlock.block_size(width, height, slots)
+        shm_obj = shm.SharedMemory(name=name, create=True, size=size)
+        MultiSlotSharedMemoryBlock.init_header(shm_obj.buf, width, height, slots)
+        shm_obj.close()
+
+        # Now attach to it using the normal constructor
+        block = MultiSlotSharedMemoryBlock(name)
+        MultiSlotSharedMemoryBlock.LOGGER.info(f"Created multi-slot shared memory block {name} with {slots} slots of {width}x{height}")
+        return block
+
+    @staticmethod
+    def init_header(buf: memoryview, width: int, height: int, slots: int):
+        if slots > MultiSlotSharedMemoryBlock.SLOT_MASK:
+            raise ValueError(f"At most {MultiSlotSharedMemoryBlock.SLOT_MASK} slots are supported, got {slots}")
+
+        struct.pack_into(MultiSlotSharedMemoryBlock.GEOMETRY_FORMAT, buf, 0, width, height, slots)
+        struct.pack_into('<Q', buf, MultiSlotSharedMemoryBlock.LATEST_OFFSET, MultiSlotSharedMemoryBlock.NO_FRAME)
+        for slot in range(slots):
+            struct.pack_into('<Q', buf, MultiSlotSharedMemoryBlock.GENERATIONS_OFFSET + 8 * slot, 0)
+
+    def __init__(self, name: str, width: int = None, height: int = None, slots: int = SLOTS):
+        """Attach to the shared memory block, creating it if it does not exist yet.
+
+        Args:
+            name: Unique name for the shared memory block
+            width: Frame width (required if creating new shared memory)
+            height: Frame height (required if creating new shared memory)
+            slots: Number of slots (used if creating new shared memory)
+        """
+        self.name = name
+        self.shm = None
+        self.recorder = None  # TrafficRecorder capturing the committed frames
+
+        try:
+            # Try to attach to existing shared memory
+            self.shm = shm.SharedMemory(name=self.name, create=False)
+            self.LOGGER.info(f"Attached to existing multi-slot shared memory block {self.name}")
+        except FileNotFoundError:
+            # Create new shared memory if it doesn't exist
+            if width is None or height is None:
+                raise ValueError(f"Width and height must be provided when creating new shared memory block '{name}'")
+            size = self.block_size(width, height, slots)
+            self.shm = shm.SharedMemory(name=self.name, create=True, size=size)
+            self.init_header(self.shm.buf, width, height, slots)
+            self.LOGGER.info(f"Created new multi-slot shared memory block {self.name} with {slots} slots of {width}x{height}")
+
+        self.width, self.height, self.slots = struct.unpack_from(self.GEOMETRY_FORMAT, self.shm.buf, 0)
+        self.atomic_thread_fence = self.load_atomic_thread_fence(platform.machine())
+        self.size = self.shm.size
+
+        # Counters are accessed through aligned uint64 views rather than struct, so each access is a single load or store
+        self.latest = np.ndarray((1,), dtype=np.uint64, buffer=self.shm.buf, offset=self.LATEST_OFFSET)
+        self.generations = np.ndarray((self.slots,), dtype=np.uint64, buffer=self.shm.buf, offset=self.GENERATIONS_OFFSET)
+
+        # Pre-compute one ndarray view per slot, so that handing off a frame never copies it
+        shape = (self.height, self.width, self.CHANNELS)
+        header_size = self.header_size(self.slots)
+        slot_size = self.slot_size(self.width, self.height)
+        self.frames = [
+            np.ndarray(shape, dtype=np.uint8, buffer=self.shm.buf, offset=header_size + slot * slot_size)
+            for slot in range(self.slots)
+        ]
+        self.read_only_frames = []
+        for frame in self.frames:
+            read_only_frame = frame.view()
+            read_only_frame.flags.writeable = False
+            self.read_only_frames.append(read_only_frame)
+
+    def acquire_write_slot(self) -> int:
+        """Reserve the slot following the latest one for writing.
+
+        The producer never waits: a consumer still leasing this slot will notice the overwrite on release.
+
+        Returns:
+            The slot index
+        """
+        latest = int(self.latest[0])
+        if latest == self.NO_FRAME:
+            slot = 0
+        else:
+            slot = ((latest & self.SLOT_MASK) + 1) % self.slots
+
+        # odd generation: the slot is being written
+        self.generations[slot] += 1
+        # the odd generation is visible before the first pixel is written
+        self.fence()
+        return slot
+
+    def slot_frame(self, slot: int) -> np.ndarray:
+        """Writable ndarray view (H, W, C) of a slot acquired for writing."""
+        return self.frames[slot]
+
+    def commit_write(self, slot: int) -> int:
+        """Publish a written slot as the latest complete frame.
+
+        Returns:
+            The frame id, increasing from 1
+        """
+        # the pixels are visible before the even generation, which is visible before the slot is published
+        self.fence()
+        # even generation: the slot is complete
+        self.generations[slot] += 1
+        self.fence()
+
+        frame_id = (int(self.latest[0]) >> self.SLOT_BITS) + 1
+        self.latest[0] = frame_id << self.SLOT_BITS | slot
+
+        if self.recorder is not None:
+            self.recorder.record_frame(self.name, frame_id, self.frames[slot])
+        return frame_id
+
+    def abort_write(self, slot: int):
+        """Give up on a slot acquired for writing, without publishing it."""
+        # back to an even generation, which differs from the one seen by any consumer leasing the previous content
+        self.generations[slot] += 1
+
+    def write_frame(self, frame: np.ndarray) -> bool:
+        """Copy a frame into the next slot and publish it.
+
+        Prefer acquire_write_slot/slot_frame/commit_write to write straight into the slot.
+
+        Args:
+            frame: Numpy array (H, W, C) matching the block geometry
+
+        Returns:
+            True if written, False if dropped (geometry mismatch)
+        """
+        if frame.shape != self.frames[0].shape:
+            self.LOGGER.error(f"Frame shape {frame.shape} does not match shared memory block shape {self.frames[0].shape}")
+            return False
+
+        slot = self.acquire_write_slot()
+        np.copyto(self.frames[slot], frame)
+        self.commit_write(slot)
+        return True
+
+    def latest_frame_id(self) -> int:
+        """Id of the latest committed frame, 0 if nothing was committed yet."""
+        return int(self.latest[0]) >> self.SLOT_BITS
+
+    def lease_latest(self, retries: int = RETRIES) -> Optional[FrameLease]:
+        """Lease the latest complete frame.
+
+        The leased view is consistent as long as release returns True.
+
+        Args:
+            retries: Number of attempts if the producer moves on while the latest frame is looked up
+
+        Returns:
+            The lease holding a read-only frame view, or None if no frame is ready
+        """
+        for _ in range(retries):
+            latest = int(self.latest[0])
+            if latest == self.NO_FRAME:
+                return None
+
+            slot = latest & self.SLOT_MASK
+            self.fence()
+            generation = int(self.generations[slot])
+            if generation & 1:
+                # the producer already wrapped around to this slot
+                continue
+
+            # the pixels and the latest frame are read after the generation
+            self.fence()
+            if int(self.latest[0]) != latest:
+                # the producer committed frames in between, the generation may belong to a newer frame rewritten into this slot
+                continue
+
+            return FrameLease(latest >> self.SLOT_BITS, slot, generation, self.read_only_frames[slot])
+
+        return None
+
+    def release(self, lease: FrameLease) -> bool:
+        """End a lease.
+
+        Returns:
+            True if the leased frame was not overwritten during the lease, False if it may be torn
+        """
+        # the pixels are read before the generation
+        self.fence()
+        return int(self.generations[lease.slot]) == lease.generation
+
+    def fence(self):
+        """Full memory fence on a weakly ordered machine, nothing on x86."""
+        if self.atomic_thread_fence is not None:
+            self.atomic_thread_fence(self.ATOMIC_SEQ_CST)
+
+    def read_latest(self, out: np.ndarray, retries: int = RETRIES) -> Optional[int]:
+        """Copy the latest complete frame into a caller-owned buffer, retrying on torn reads.
+
+        Args:
+            out: Numpy array (H, W, C) matching the block geometry
+            retries: Number of attempts before giving up
+
+        Returns:
+            The frame id, or None if no consistent frame could be read
+        """
+        for _ in range(retries):
+            lease = self.lease_latest(retries)
+            if lease is None:
+                return None
+
+            np.copyto(out, lease.frame)
+            if self.release(lease):
+                return lease.frame_id
+
+        return None
+
+    def close(self):
+        """Close the shared memory handle."""
+        if self.shm:
+            # ndarray views must be dropped before the underlying buffer can be released
+            self.latest = None
+            self.generations = None
+            self.frames = []
+            self.read_only_frames = []
+            self.shm.close()
+
+    def unlink(self):
+        """Unlink (delete) the shared memory block."""
+        if self.shm:
+            self.shm.unlink()
@@ -0,0 +1,154 @@
+"""Lightweight tracking of the object detections between two detector runs."""
+
+from dataclasses import dataclass
+from typing import Optional
+
+import cv2
+import numpy as np
+
+
+@dataclass
+class Detections:
+    boxes: np.ndarray                        # (N, 4) XYXY boxes in pixels
+    labels: list[str]                        # class name of each box
+    keypoints: Optional[np.ndarray] = None   # (N, K, 2) keypoints in pixels, (0, 0) when not visible
+
+    @staticmethod
+    def from_results(results) -> "Detections":
+        """Convert the YOLO results of a frame."""
+        boxes = results.boxes.xyxy.cpu().numpy()
+        labels = [results.names[int(c)] for c in results.boxes.cls.cpu().numpy()]
+        keypoints = None if results.keypoints is None else results.keypoints.xy.cpu().numpy()
+        return Detections(boxes, labels, keypoints)
+
+    def __len__(self) -> int:
+        return len(self.boxes)
+
+
+class ObjectTracker:
+    """Carries the detections forward between two detector runs, with sparse Lucas-Kanade optical flow.
+
+    The detector runs every detect_every frames, or earlier when the frame differs too much from the last detected frame.
+    In between, a grid of points inside each box and the keypoints are tracked from the previous frame:
+    each box is shifted by the median flow of its points, and each keypoint follows its own flow.
+    """
+
+    # Points tracked per box side
+    GRID_POINTS = 3
+
+    # Thumbnail size of the motion trigger
+    MOTION_SIZE = (80, 60)
+
+    LK_PARAMS = dict(
+        winSize=(21, 21),
+        maxLevel=3,
+        criteria=(cv2.TERM_CRITERIA_EPS | cv2.TERM_CRITERIA_COUNT, 20, 0.03),
+    )
+
+    def __init__(self, detect_every: int = 1, motion_threshold: Optional[float] = None):
+        """Initialize the tracker.
+
+        Args:
+            detect_every: Run the detector every N frames
+            motion_threshold: Also run the detector when the mean absolute difference with the last detected frame, between 0 and 1, exceeds this threshold
+        """
+        self.detect_every = detect_every
+        self.motion_threshold = motion_threshold
+        self.detections: Optional[Detections] = None
+        self.previous_gray: Optional[np.ndarray] = None
+        self.keyframe_thumbnail: Optional[np.ndarray] = None
+        self.frames_since_detection = 0
+
+    def should_detect(self, gray: np.ndarray) -> bool:
+        """Whether the detector should run on this grayscale frame, or the detections be tracked."""
+        if self.detections is None:
+            return True
+
+        if self.frames_since_detection + 1 >= self.detect_every:
+            return True
+
+        return self.motion_threshold is not None and self.motion_score(gray) > self.motion_threshold
+
+    def motion_score(self, gray: np.ndarray) -> float:
+        thumbnail = cv2.resize(gray, self.MOTION_SIZE, interpolation=cv2.INTER_AREA)
+        return float(np.mean(cv2.absdiff(thumbnail, self.keyframe_thumbnail))) / 255
+
+    def update(self, gray: np.ndarray, detections: Detections):
+        """Restart tracking from the detections of the detector."""
+        self.detections = detections
+        self.previous_gray = gray
+        self.keyframe_thumbnail = cv2.resize(gray, self.MOTION_SIZE, interpolation=cv2.INTER_AREA)
+        self.frames_since_detection = 0
+
+    def track(self, gray: np.ndarray) -> Detections:
+        """Move the detections of the previous frame to this grayscale frame."""
+        detections = self.detections
+        box_points = self.box_points(detections.boxes)
+        keypoints = detections.keypoints.reshape(-1, 2) if detections.keypoints is not None else np.empty((0, 2), dtype=np.float32)
+        points = np.concatenate([box_points, keypoints]).astype(np.float32)
+
+        self.previous_gray, previous_gray = gray, self.previous_gray
+        self.frames_since_detection += 1
+        if len(points) == 0:
+            return detections
+
+        next_points, status, _ = cv2.calcOpticalFlowPyrLK(previous_gray, gray, points.reshape(-1, 1, 2), None, **self.LK_PARAMS)
+        flow = next_points.reshape(-1, 2) - points
+        tracked = status.reshape(-1).astype(bool)
+
+        # shift each box by the median flow of its tracked points
+        box_point_count = self.GRID_POINTS * self.GRID_POINTS
+        boxes = detections.boxes.copy()
+        for box_index in range(len(boxes)):
+            box_slice = slice(box_index * box_point_count, (box_index + 1) * box_point_count)
+            box_tracked = tracked[box_slice]
+            if box_tracked.any():
+                dx, dy = np.median(flow[box_slice][box_tracked], axis=0)
+                boxes[box_index] += [dx, dy, dx, dy]
+
+        # move each visible keypoint along its own flow, the lost ones become invisible
+        tracked_keypoints = None
+        if detections.keypoints is not None:
+            keypoint_flow = flow[len(box_points):]
+            keypoint_tracked = tracked[len(box_points):]
+            visible = np.any(keypoints != 0, axis=1)
+            moved_keypoints = np.where((visible & keypoint_tracked)[:, np.newaxis], keypoints + keypoint_flow, 0)
+            tracked_keypoints = moved_keypoints.reshape(detections.keypoints.shape).astype(detections.keypoints.dtype)
+
+        self.detections = Detections(boxes, detections.labels, tracked_keypoints)
+        return self.detections
+
+    def box_points(self, boxes: np.ndarray) -> np.ndarray:
+        """Grid of points inside each box, away from its edges where the background shows."""
+        fractions = (np.arange(self.GRID_POINTS) + 1) / (self.GRID_POINTS + 1)
+        points = []
+        for x1, y1, x2, y2 in boxes:
+            xs = x1 + fractions * (x2 - x1)
+            ys = y1 + fractions * (y2 - y1)
+            points.extend((x, y) for y in ys for x in xs)
+        return np.array(points, dtype=np.float32).reshape(-1, 2)
+
+    @staticmethod
+    def drift(tracked: Detections, detected: Detections) -> float:
+        """Drift of the tracked boxes against the detected boxes of the same frame: 1 - mean IoU of each detected box with its best tracked match."""
+        if len(detected) == 0 and len(tracked) == 0:
+            return 0.0
+        if len(detected) == 0 or len(tracked) == 0:
+            return 1.0
+
+        ious = ObjectTracker.iou(detected.boxes, tracked.boxes)
+        return float(1.0 - np.mean(np.max(ious, axis=1)))
+
+    @staticmethod
+    def iou(boxes1: np.ndarray, boxes2: np.ndarray) -> np.ndarray:
+        """Pairwise IoU of two sets of XYXY boxes, of shape (len(boxes1), len(boxes2))."""
+        x1 = np.maximum(boxes1[:, np.newaxis, 0], boxes2[np.newaxis, :, 0])
+        y1 = np.maximum(boxes1[:, np.newaxis, 1], boxes2[np.newaxis, :, 1])
+        x2 = np.minimum(boxes1[:, np.newaxis, 2], boxes2[np.newaxis, :, 2])
+        y2 = np.minimum(boxes1[:, np.newaxis, 3], boxes2[np.newaxis, :, 3])
+        intersection = np.clip(x2 - x1, 0, None) * np.clip(y2 - y1, 0, None)
+
+        area1 = (boxes1[:, 2] - boxes1[:, 0]) * (boxes1[:, 3] - boxes1[:, 1])
+        area2 = (boxes2[:, 2] - boxes2[:, 0]) * (boxes2[:, 3] - boxes2[:, 1])
+        union = area1[:, np.newaxis] + area2[np.newaxis, :] - intersection
+        return intersection / np.maximum(union, 1e-9)
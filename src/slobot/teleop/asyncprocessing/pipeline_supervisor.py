@@ -0,0 +1,255 @@
+"""Pipeline supervisor - spawns, pins and restarts the async teleoperator workers."""
+
+import json
+import multiprocessing
+import os
+import signal
+import time
+from dataclasses import dataclass, field
+from typing import Any, Optional
+
+from slobot.configuration import Configuration
+from slobot.teleop.asyncprocessing.fifo_queue import FifoQueue
+
+
+@dataclass
+class WorkerSpec:
+    """A worker entry of the topology file."""
+    type: str                                  # cron, leader_read, follower_control, sim_step, mirror_kinematics, webcam_capture, detect_objects or detection_server
+    args: dict[str, Any] = field(default_factory=dict)  # keyword arguments of the AsyncTeleoperator spawn method
+    name: Optional[str] = None                 # defaults to the type, suffixed with the camera id for the webcam and detect workers
+    cores: Optional[list[int]] = None          # CPU cores the worker is pinned to
+    nice: Optional[int] = None                 # nice value, negative values require CAP_SYS_NICE
+    realtime_priority: Optional[int] = None    # SCHED_FIFO priority (1-99), requires CAP_SYS_NICE, a real-time cron requires dedicated cores
+    restart: bool = True                       # restart the worker if it crashes
+
+
+def run_worker(spec: WorkerSpec):
+    """Child process entry point: apply the scheduling policy, then run the worker loop."""
+    # pin before the worker sets up Genesis or YOLO, so their thread pools are sized after the allowed cores
+    if spec.cores is not None:
+        os.sched_setaffinity(0, spec.cores)
+
+    if spec.realtime_priority is not None:
+        os.sched_setscheduler(0, os.SCHED_FIFO, os.sched_param(spec.realtime_priority))
+    elif spec.nice is not None:
+        os.setpriority(os.PRIO_PROCESS, 0, spec.nice)
+
+    from slobot.teleop.asyncprocessing.workers.async_teleoperator import AsyncTeleoperator
+
+    async_teleoperator = AsyncTeleoperator()
+    spawn_method = getattr(async_teleoperator, f"spawn_{spec.type}_worker")
+    spawn_method(**PipelineSupervisor.spawn_kwargs(spec))
+
+
+class PipelineSupervisor:
+    """Spawns every worker of a topology file in its own process.
+
+    Each worker is pinned to its cores and runs with an optional real-time or nice priority,
+    so that YOLO and Genesis do not preempt the Feetech control loop.
+    Crashed workers are restarted, and the CPU usage of each worker is reported periodically.
+
+    The cron spins on the clock before each tick, see DeadlineTicker. Under SCHED_FIFO, nothing else runs on its core while it spins,
+    so a real-time cron must be pinned to cores that no other worker uses.
+    """
+
+    LOGGER = Configuration.logger(__name__)
+
+    # Seconds between two checks of the worker processes
+    POLL_INTERVAL = 1.0
+
+    # Seconds between two CPU usage reports
+    REPORT_INTERVAL = 10.0
+
+    # Maximum number of restarts per worker before giving up
+    MAX_RESTARTS = 5
+
+    # Seconds a worker must run before crashing for its restart count to be reset
+    RESTART_RESET_UPTIME = 60.0
+
+    # Seconds granted to the workers to tear down before they are terminated
+    STOP_TIMEOUT = 5.0
+
+    # Workers whose queue and shared memory names are derived from the camera id
+    CAMERA_WORKER_QUEUES = {
+        'webcam_capture': FifoQueue.QUEUE_WEBCAM_CAPTURE,
+        'detect_objects': FifoQueue.QUEUE_OBJECT_DETECTION,
+    }
+
+    CAMERA_WORKER_NAMES = {
+        'webcam_capture': 'webcam',
+        'detect_objects': 'detect_objects',
+    }
+
+    @staticmethod
+    def load_topology(topology_path: str) -> list[WorkerSpec]:
+        """Parse a JSON topology file of the form {"workers": [{"type": ..., "args": {...}, "cores": [...]}, ...]}."""
+        with open(topology_path) as topology_file:
+            topology = json.load(topology_file)
+
+        return [
+            WorkerSpec(**worker)
+            for worker in topology['workers']
+        ]
+
+    @staticmethod
+    def worker_name(spec: WorkerSpec) -> str:
+        if spec.name is not None:
+            return spec.name
+
+        if spec.type in PipelineSupervisor.CAMERA_WORKER_NAMES:
+            return f"{PipelineSupervisor.CAMERA_WORKER_NAMES[spec.type]}{spec.args['camera_id']}"
+
+        return spec.type
+
+    @staticmethod
+    def spawn_kwargs(spec: WorkerSpec) -> dict[str, Any]:
+        """Keyword arguments of the spawn method, filled like the spawn_*.py scripts do."""
+        kwargs = dict(spec.args)
+
+        if spec.type in PipelineSupervisor.CAMERA_WORKER_QUEUES:
+            kwargs['worker_name'] = PipelineSupervisor.worker_name(spec)
+            kwargs['queue_name'] = FifoQueue.get_queue_name(PipelineSupervisor.CAMERA_WORKER_QUEUES[spec.type], kwargs['camera_id'])
+
+        if spec.type == 'follower_control':
+            kwargs.setdefault('camera_ids', [])
+            kwargs.setdefault('sim', False)
+
+        return kwargs
+
+    @staticmethod
+    def validate_specs(specs: list[WorkerSpec]):
+        """Refuse a real-time cron that is not pinned to dedicated cores, as its spin would starve the workers sharing them."""
+        for spec in specs:
+            if spec.type != 'cron' or spec.realtime_priority is None:
+                continue
+
+            if spec.cores is None:
+                raise ValueError(f"Worker {PipelineSupervisor.worker_name(spec)} has a realtime_priority, it must be pinned to dedicated cores")
+
+            for other_spec in specs:
+                shared_cores = set(spec.cores) & set(other_spec.cores or [])
+                if other_spec is not spec and shared_cores:
+                    raise ValueError(f"Worker {PipelineSupervisor.worker_name(spec)} has a realtime_priority, it must not share cores {sorted(shared_cores)} with worker {PipelineSupervisor.worker_name(other_spec)}")
+
+    def __init__(self, specs: list[WorkerSpec]):
+        """Initialize the supervisor.
+
+        Args:
+            specs: The workers to spawn, in start order. Cron should come last.
+        """
+        self.validate_specs(specs)
+        self.specs = specs
+        self.context = multiprocessing.get_context("spawn")
+        self.processes: dict[str, multiprocessing.Process] = {}
+        self.start_times: dict[str, float] = {}
+        self.restarts: dict[str, int] = {}
+        self.cpu_times: dict[str, tuple[float, float]] = {}
+        self.clock_ticks = os.sysconf('SC_CLK_TCK')
+
+    def start(self):
+        """Start every worker, in topology order."""
+        for spec in self.specs:
+            self.start_worker(spec)
+
+    def start_worker(self, spec: WorkerSpec):
+        name = self.worker_name(spec)
+        process = self.context.Process(target=run_worker, args=(spec,), name=name)
+        process.start()
+        self.processes[name] = process
+        self.start_times[name] = time.monotonic()
+        self.cpu_times[name] = (time.monotonic(), 0.0)
+        self.LOGGER.info(f"Started worker {name} with PID {process.pid} on cores {spec.cores}")
+
+    def run(self):
+        """Start the workers, then supervise them until they all exit or the supervisor is interrupted."""
+        self.start()
+
+        last_report = time.monotonic()
+        try:
+            while self.processes:
+                time.sleep(self.POLL_INTERVAL)
+                self.check_workers()
+
+                now = time.monotonic()
+                if now - last_report >= self.REPORT_INTERVAL:
+                    self.report_cpu_usage()
+                    last_report = now
+        except KeyboardInterrupt:
+            self.LOGGER.info("Supervisor interrupted")
+        finally:
+            self.stop()
+
+    def check_workers(self):
+        """Restart crashed workers, forget the ones that stopped gracefully."""
+        for spec in self.specs:
+            name = self.worker_name(spec)
+            process = self.processes.get(name)
+            if process is None or process.is_alive():
+                continue
+
+            del self.processes[name]
+            if process.exitcode == 0:
+                self.LOGGER.info(f"Worker {name} stopped")
+                continue
+
+            restarts = self.restarts.get(name, 0)
+            if time.monotonic() - self.start_times[name] >= self.RESTART_RESET_UPTIME:
+                # the worker ran healthy for a while, this crash starts a new series of restarts
+                restarts = 0
+
+            if not spec.restart or restarts >= self.MAX_RESTARTS:
+                self.LOGGER.error(f"Worker {name} crashed with exit code {process.exitcode}, not restarting it after {restarts} restarts")
+                continue
+
+            self.restarts[name] = restarts + 1
+            self.LOGGER.warning(f"Worker {name} crashed with exit code {process.exitcode}, restarting it ({restarts + 1}/{self.MAX_RESTARTS})")
+            self.start_worker(spec)
+
+    def cpu_usage(self) -> dict[str, float]:
+        """CPU usage of each worker since the previous call, in percent of one core."""
+        usage = {}
+        for name, process in self.processes.items():
+            cpu_time = self.process_cpu_time(process.pid)
+            if cpu_time is None:
+                continue
+
+            now = time.monotonic()
+            previous_time, previous_cpu_time = self.cpu_times[name]
+            self.cpu_times[name] = (now, cpu_time)
+            usage[name] = 100 * (cpu_time - previous_cpu_time) / (now - previous_time)
+        return usage
+
+    def report_cpu_usage(self):
+        usage = self.cpu_usage()
+        report = ", ".join(f"{name}={percent:.1f}%" for name, percent in usage.items())
+        self.LOGGER.info(f"Worker CPU usage: {report}")
+
+    def process_cpu_time(self, pid: int) -> Optional[float]:
+        """User + system CPU time of a process in seconds, read from /proc."""
+        try:
+            with open(f"/proc/{pid}/stat") as stat_file:
+                stat = stat_file.read()
+        except FileNotFoundError:
+            return None
+
+        # the command name may contain spaces, so split after its closing parenthesis
+        fields = stat[stat.rindex(')') + 2:].split()
+        utime, stime = int(fields[11]), int(fields[12])
+        return (utime + stime) / self.clock_ticks
+
+    def stop(self):
+        """Interrupt the remaining workers so they tear down, terminating the ones that do not exit in time."""
+        for name, process in self.processes.items():
+            if process.is_alive():
+                self.LOGGER.info(f"Stopping worker {name}")
+                os.kill(process.pid, signal.SIGINT)
+
+        for name, process in self.processes.items():
+            process.join(self.STOP_TIMEOUT)
+            if process.is_alive():
+                self.LOGGER.warning(f"Terminating worker {name}")
+                process.terminate()
+                process.join()
+
+        self.processes.clear()
@@ -0,0 +1,61 @@
+"""Rate-limited, downscaled preview images."""
+
+import time
+from typing import Optional
+
+import cv2
+import numpy as np
+
+
+class PreviewSampler:
+    """Samples the preview images of a video stream, at a maximum rate and downscaled.
+
+    The preview is only for live viewing, the video stream keeps every frame at full resolution.
+    Previews are scheduled on a grid of the preview period, frames arriving before the next slot being skipped.
+    A frame slightly early is accepted, so that jitter does not halve a preview rate dividing the frame rate.
+    The downscale uses area interpolation on uint8, into a buffer reused across previews.
+    """
+
+    # Fraction of the preview period a frame may arrive early
+    EARLY_TOLERANCE = 0.1
+
+    def __init__(self, max_rate: Optional[float] = None, downscale: int = 1):
+        """Initialize the sampler.
+
+        Args:
+            max_rate: Maximum number of previews per second, None for a preview of every frame
+            downscale: Factor dividing the width and the height of the preview
+        """
+        if downscale < 1:
+            raise ValueError(f"Invalid preview downscale {downscale}")
+
+        self.min_period = 1.0 / max_rate if max_rate else 0.0
+        self.downscale = downscale
+        self.next_preview_time: Optional[float] = None
+        self.preview: Optional[np.ndarray] = None
+
+    def sample(self, rgb: np.ndarray, now: Optional[float] = None) -> Optional[np.ndarray]:
+        """Return the preview of the frame, or None if the frame is skipped.
+
+        The returned buffer is overwritten by the next preview.
+        """
+        now = time.monotonic() if now is None else now
+        slot_time = now
+        if self.next_preview_time is not None:
+            if now < self.next_preview_time - self.min_period * self.EARLY_TOLERANCE:
+                return None
+            if now < self.next_preview_time + self.min_period:
+                slot_time = self.next_preview_time
+        # after a gap, the grid restarts from the current frame
+        self.next_preview_time = slot_time + self.min_period
+
+        if self.downscale == 1:
+            return rgb
+
+        height, width = rgb.shape[:2]
+        preview_shape = (max(height // self.downscale, 1), max(width // self.downscale, 1)) + rgb.shape[2:]
+        if self.preview is None or self.preview.shape != preview_shape:
+            self.preview = np.empty(preview_shape, dtype=np.uint8)
+
+        cv2.resize(rgb, (preview_shape[1], preview_shape[0]), dst=self.preview, interpolation=cv2.INTER_AREA)
+        return self.preview
@@ -0,0 +1,110 @@
+"""Adaptive rate control and load shedding for the async teleoperator pipeline."""
+
+from typing import Optional
+
+from slobot.configuration import Configuration
+
+
+class RateController:
+    """Feedback loop keeping the end-to-end latency within the budget.
+
+    Workers report how many steps overran their deadline over a window of steps.
+    When a sheddable worker (simulation, detection) overruns, its decimation factor is increased, so it only processes every N-th step.
+    When a worker of the control loop (leader, follower, webcam) overruns, the tick rate is decreased instead.
+    Once every worker stays within its deadline for a few windows, the tick rate is restored first, then the decimation factors.
+    """
+
+    LOGGER = Configuration.logger(__name__)
+
+    # Fraction of overrun steps in a window above which a worker is considered overloaded
+    OVERRUN_RATIO = 0.1
+
+    # Number of consecutive windows without overrun before recovering
+    RECOVERY_WINDOWS = 3
+
+    # Multiplicative decrease and additive increase of the tick rate
+    FPS_DECREASE_FACTOR = 0.8
+    FPS_INCREASE_STEP = 2
+
+    MAX_DECIMATION = 4
+
+    # Workers whose load can be shed by decimation, by prefix
+    SHEDDABLE_PREFIXES = ["sim", "kinematics", "detect_objects", "detection_server"]
+
+    def __init__(self, target_fps: int, min_fps: int):
+        """Initialize the controller.
+
+        Args:
+            target_fps: Nominal tick rate, never exceeded
+            min_fps: Lowest tick rate the controller may fall back to
+        """
+        self.target_fps = target_fps
+        self.min_fps = min_fps
+        self.fps = target_fps
+        self.decimations: dict[str, int] = {}
+        self.quiet_windows = 0
+
+    def is_sheddable(self, worker_name: str) -> bool:
+        return any(worker_name.startswith(prefix) for prefix in self.SHEDDABLE_PREFIXES)
+
+    def handle_reports(self, load_reports: list[tuple[str, int, int, float, float]]) -> tuple[Optional[int], dict[str, int]]:
+        """Update the tick rate and the decimation factors after receiving load reports.
+
+        Args:
+            load_reports: List of (worker_name, steps, overruns, mean_latency_ms, max_lateness_ms)
+
+        Returns:
+            Tuple of (new tick rate or None if unchanged, changed decimation factors by worker name)
+        """
+        overloaded = [
+            worker_name
+            for worker_name, steps, overruns, _, _ in load_reports
+            if steps > 0 and overruns / steps > self.OVERRUN_RATIO
+        ]
+
+        if overloaded:
+            self.quiet_windows = 0
+            return self.shed(overloaded)
+
+        self.quiet_windows += 1
+        if self.quiet_windows < self.RECOVERY_WINDOWS:
+            return None, {}
+
+        self.quiet_windows = 0
+        return self.recover()
+
+    def shed(self, overloaded: list[str]) -> tuple[Optional[int], dict[str, int]]:
+        new_fps = None
+        changed_decimations = {}
+        slow_down = False
+        for worker_name in overloaded:
+            decimation = self.decimations.get(worker_name, 1)
+            if self.is_sheddable(worker_name) and decimation < self.MAX_DECIMATION:
+                self.decimations[worker_name] = decimation + 1
+                changed_decimations[worker_name] = decimation + 1
+            else:
+                slow_down = True
+
+        if slow_down and self.fps > self.min_fps:
+            self.fps = max(self.min_fps, int(self.fps * self.FPS_DECREASE_FACTOR))
+            new_fps = self.fps
+
+        if new_fps is not None or changed_decimations:
+            self.LOGGER.warning(f"Overloaded workers {overloaded}: tick rate {self.fps} Hz, decimations {self.decimations}")
+        return new_fps, changed_decimations
+
+    def recover(self) -> tuple[Optional[int], dict[str, int]]:
+        if self.fps < self.target_fps:
+            self.fps = min(self.target_fps, self.fps + self.FPS_INCREASE_STEP)
+            self.LOGGER.info(f"Recovering tick rate {self.fps} Hz")
+            return self.fps, {}
+
+        changed_decimations = {}
+        for worker_name, decimation in self.decimations.items():
+            if decimation > 1:
+                self.decimations[worker_name] = decimation - 1
+                changed_decimations[worker_name] = decimation - 1
+
+        if changed_decimations:
+            self.LOGGER.info(f"Recovering decimations {self.decimations}")
+        return None, changed_decimations
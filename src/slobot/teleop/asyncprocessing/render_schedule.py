@@ -0,0 +1,57 @@
+"""Selection and decimation of the sim camera render passes."""
+
+from enum import Enum
+
+
+class RenderMode(Enum):
+    RGB = "rgb"
+    DEPTH = "depth"
+    SEGMENTATION = "segmentation"
+    NORMAL = "normal"
+
+
+class RenderSchedule:
+    """Decides which render passes are due at each step.
+
+    Each enabled pass has its own decimation, for example RGB every step and depth every 5th step.
+    Disabled passes are neither rendered nor encoded.
+    The cron decimation of the worker applies on top, a pass only renders on steps that are due for both.
+    """
+
+    def __init__(self, pass_decimations: dict[RenderMode, int]):
+        """Initialize the schedule.
+
+        Args:
+            pass_decimations: Decimation of each enabled pass, 1 to render it every step
+        """
+        for render_mode, decimation in pass_decimations.items():
+            if decimation < 1:
+                raise ValueError(f"Invalid decimation {decimation} for render pass {render_mode.value}")
+        self.pass_decimations = pass_decimations
+
+    @staticmethod
+    def all_passes() -> "RenderSchedule":
+        return RenderSchedule({render_mode: 1 for render_mode in RenderMode})
+
+    @staticmethod
+    def parse(pass_specs: list[str]) -> "RenderSchedule":
+        """Parse pass specs like ["rgb", "depth:5"], a pass without decimation being rendered every step."""
+        pass_decimations = {}
+        for pass_spec in pass_specs:
+            name, _, decimation = pass_spec.partition(":")
+            pass_decimations[RenderMode(name)] = int(decimation) if decimation else 1
+        return RenderSchedule(pass_decimations)
+
+    def enabled_passes(self) -> list[RenderMode]:
+        return list(self.pass_decimations)
+
+    def due_passes(self, step: int, decimation: int = 1) -> list[RenderMode]:
+        """Passes to render at the step, given the cron decimation of the worker."""
+        if step % decimation != 0:
+            return []
+
+        return [
+            render_mode
+            for render_mode, pass_decimation in self.pass_decimations.items()
+            if step % pass_decimation == 0
+        ]
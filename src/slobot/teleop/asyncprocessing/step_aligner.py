@@ -0,0 +1,71 @@
+"""Step alignment of the messages of several input queues."""
+
+from typing import Any, Optional
+
+
+class StepAligner:
+    """Buffers the messages of several inputs by step, and pops them once aligned.
+
+    The latest step of the primary input (the first one) is aligned with the message of each other input
+    whose step is the closest within the step tolerance, the latest one on a tie.
+    Older primary steps that could not be aligned are dropped as stale.
+    A message of a secondary input may be aligned with several primary steps, in case that input publishes at a lower rate.
+    """
+
+    # Maximum number of pending steps buffered per input, waiting to be aligned
+    MAX_PENDING_STEPS = 30
+
+    def __init__(self, input_count: int, step_tolerance: int = 0):
+        """Initialize the aligner.
+
+        Args:
+            input_count: Number of inputs, the first one being the primary input
+            step_tolerance: Maximum step difference between the primary message and the aligned messages of the other inputs
+        """
+        self.step_tolerance = step_tolerance
+        self.pending: list[dict[int, Any]] = [{} for _ in range(input_count)]
+        self.unaligned_steps = 0
+
+    def add(self, input_index: int, step: int, message: Any):
+        """Buffer the message of an input, replacing any pending message of the same step."""
+        pending = self.pending[input_index]
+        pending[step] = message
+        if len(pending) > self.MAX_PENDING_STEPS:
+            del pending[min(pending)]
+
+    def pop_aligned(self) -> Optional[tuple[int, list[Any]]]:
+        """Pop the latest primary step for which every other input has a message within the step tolerance.
+
+        Returns:
+            Tuple of (primary step, messages in the order of the inputs), or None if no step is aligned yet
+        """
+        primary = self.pending[0]
+        for step in sorted(primary, reverse=True):
+            aligned_steps = [self.closest_step(pending, step) for pending in self.pending[1:]]
+            if None in aligned_steps:
+                continue
+
+            messages = [primary[step]] + [pending[aligned_step] for pending, aligned_step in zip(self.pending[1:], aligned_steps)]
+
+            # drop the aligned primary step and the older ones, and the secondary steps older than the aligned ones
+            dropped_steps = [primary_step for primary_step in primary if primary_step < step]
+            self.unaligned_steps += len(dropped_steps)
+            for primary_step in dropped_steps + [step]:
+                del primary[primary_step]
+            for pending, aligned_step in zip(self.pending[1:], aligned_steps):
+                for pending_step in [pending_step for pending_step in pending if pending_step < aligned_step]:
+                    del pending[pending_step]
+
+            return step, messages
+
+        return None
+
+    def closest_step(self, pending: dict[int, Any], step: int) -> Optional[int]:
+        candidate_steps = [pending_step for pending_step in pending if abs(pending_step - step) <= self.step_tolerance]
+        if not candidate_steps:
+            return None
+        return min(candidate_steps, key=lambda pending_step: (abs(pending_step - step), -pending_step))
+
+    def clear(self):
+        for pending in self.pending:
+            pending.clear()
@@ -0,0 +1,236 @@
+"""Per-step latency tracing across the async teleoperator workers."""
+
+import csv
+import glob
+import json
+import os
+from typing import Optional
+
+import numpy as np
+
+from slobot.configuration import Configuration
+
+
+class StepTracer:
+    """Records the timestamps of each step processed by a worker.
+
+    For every step, the worker records when the input message was sent upstream, when it was received,
+    when processing started and ended, and when the outputs were published.
+    Rows are buffered in memory and appended to a CSV file per worker, under a folder per recording.
+    All timestamps come from time.time(), so they can be compared across processes.
+    """
+
+    LOGGER = Configuration.logger(__name__)
+
+    TRACE_DIR = "/tmp/slobot/trace"
+
+    # Number of buffered steps before the rows are appended to the file
+    FLUSH_SIZE = 300
+
+    COLUMNS = ["step", "sent", "receive", "process_start", "process_end", "publish"]
+
+    @staticmethod
+    def trace_dir(recording_id: str) -> str:
+        return f"{StepTracer.TRACE_DIR}/{recording_id}"
+
+    def __init__(self, worker_name: str, recording_id: str):
+        """Initialize the tracer.
+
+        Args:
+            worker_name: The worker's name, used as the file name
+            recording_id: The recording id, used as the folder name
+        """
+        self.worker_name = worker_name
+        trace_dir = self.trace_dir(recording_id)
+        os.makedirs(trace_dir, exist_ok=True)
+        self.path = f"{trace_dir}/{worker_name}.csv"
+        self.rows = []
+
+        with open(self.path, "w", newline="") as trace_file:
+            csv.writer(trace_file).writerow(self.COLUMNS)
+
+    def record(self, step: int, sent: Optional[float], receive: float, process_start: float, process_end: float, publish: float):
+        """Record the timestamps of a step. The sent time is None for the cron, which has no input queue."""
+        self.rows.append((step, receive if sent is None else sent, receive, process_start, process_end, publish))
+        if len(self.rows) >= self.FLUSH_SIZE:
+            self.flush()
+
+    def flush(self):
+        if not self.rows:
+            return
+
+        with open(self.path, "a", newline="") as trace_file:
+            csv.writer(trace_file).writerows(self.rows)
+        self.rows.clear()
+
+
+class StepTraceReport:
+    """Merges the per-worker trace files of a recording, to export a Chrome trace or compute latency statistics.
+
+    A hop is the span between the publish of the upstream worker and the publish of the downstream worker.
+    It splits into the time spent in the queue, in processing and in publishing.
+    The critical path of a step is the chain of hops from the cron to the worker that published last.
+    """
+
+    # Upstream worker of each worker, for the worker names that are not dynamic
+    UPSTREAM = {
+        "leader": "cron",
+        "follower": "leader",
+        "kinematics": "leader",
+        "sim": "follower",
+    }
+
+    # Upstream worker of the dynamic workers, by prefix
+    UPSTREAM_PREFIXES = {
+        "webcam": "follower",
+        "detect_objects": "webcam",  # suffixed with the same camera id
+    }
+
+    # Upstream workers of the workers fed by every dynamic worker of a prefix, the upstream of a step being the one that published last
+    UPSTREAM_FAN_IN = {
+        "detection_server": "webcam",
+    }
+
+    ROOT = "cron"
+
+    PERCENTILES = [50, 90, 99]
+
+    def __init__(self, trace_dir: str):
+        """Load the trace files of a recording.
+
+        Args:
+            trace_dir: Folder holding one CSV file per worker
+        """
+        self.traces: dict[str, dict[int, dict[str, float]]] = {}
+        for path in sorted(glob.glob(f"{trace_dir}/*.csv")):
+            worker_name = os.path.splitext(os.path.basename(path))[0]
+            with open(path, newline="") as trace_file:
+                self.traces[worker_name] = {
+                    int(row["step"]): {
+                        column: float(row[column])
+                        for column in StepTracer.COLUMNS[1:]
+                    }
+                    for row in csv.DictReader(trace_file)
+                }
+
+    def upstream(self, worker_name: str, step: Optional[int] = None) -> Optional[str]:
+        if worker_name in self.UPSTREAM:
+            return self.UPSTREAM[worker_name]
+
+        if worker_name in self.UPSTREAM_FAN_IN:
+            return self.last_publisher(step, self.UPSTREAM_FAN_IN[worker_name])
+
+        for prefix, upstream_prefix in self.UPSTREAM_PREFIXES.items():
+            if worker_name.startswith(prefix):
+                camera_id = worker_name[len(prefix):]
+                return upstream_prefix if upstream_prefix == "follower" else f"{upstream_prefix}{camera_id}"
+
+        return None
+
+    def chrome_trace(self) -> dict:
+        """Build a Chrome trace (chrome://tracing or https://ui.perfetto.dev) with one track per worker."""
+        events = []
+        for tid, (worker_name, steps) in enumerate(self.traces.items()):
+            events.append({"name": "thread_name", "ph": "M", "pid": 0, "tid": tid, "args": {"name": worker_name}})
+            for step, timestamps in steps.items():
+                spans = [
+                    ("queue", timestamps["sent"], timestamps["receive"]),
+                    ("process", timestamps["process_start"], timestamps["process_end"]),
+                    ("publish", timestamps["process_end"], timestamps["publish"]),
+                ]
+                for name, start, end in spans:
+                    events.append({
+                        "name": name,
+                        "ph": "X",
+                        "pid": 0,
+                        "tid": tid,
+                        "ts": start * 1e6,
+                        "dur": max(end - start, 0) * 1e6,
+                        "args": {"step": step},
+                    })
+
+        return {"traceEvents": events, "displayTimeUnit": "ms"}
+
+    def export_chrome_trace(self, output_path: str):
+        with open(output_path, "w") as output_file:
+            json.dump(self.chrome_trace(), output_file)
+
+    def last_publisher(self, step: Optional[int], prefix: str = "") -> Optional[str]:
+        """Worker whose name starts with the prefix that published last for this step, the first such worker if the step is None."""
+        last_worker = None
+        last_publish = None
+        for worker_name, steps in self.traces.items():
+            if not worker_name.startswith(prefix):
+                continue
+            if step is None:
+                return worker_name
+            if step not in steps:
+                continue
+            if last_publish is None or steps[step]["publish"] > last_publish:
+                last_worker = worker_name
+                last_publish = steps[step]["publish"]
+        return last_worker
+
+    def critical_path(self, step: int) -> list[str]:
+        """Workers from the cron to the worker that published last for this step."""
+        last_worker = self.last_publisher(step)
+
+        path = []
+        while last_worker is not None:
+            path.append(last_worker)
+            last_worker = self.upstream(last_worker, step)
+        path.reverse()
+        return path
+
+    def hop_latencies(self) -> dict[str, dict[str, list[float]]]:
+        """Queue, process and publish latencies in milliseconds of each worker, for every traced step."""
+        latencies = {}
+        for worker_name, steps in self.traces.items():
+            latencies[worker_name] = {
+                "queue": [(t["receive"] - t["sent"]) * 1000 for t in steps.values()],
+                "process": [(t["process_end"] - t["process_start"]) * 1000 for t in steps.values()],
+                "publish": [(t["publish"] - t["process_end"]) * 1000 for t in steps.values()],
+            }
+        return latencies
+
+    def end_to_end_latencies(self) -> list[float]:
+        """Latency in milliseconds from the cron tick to the last publish, for every step traced by the cron."""
+        latencies = []
+        for step, cron_timestamps in self.traces.get(self.ROOT, {}).items():
+            last_publish = max(
+                steps[step]["publish"]
+                for steps in self.traces.values()
+                if step in steps
+            )
+            latencies.append((last_publish - cron_timestamps["receive"]) * 1000)
+        return latencies
+
+    def report(self) -> str:
+        """Human readable summary of the per-hop percentiles and of the most frequent critical paths."""
+        lines = []
+
+        header = " ".join(f"p{percentile:<7}" for percentile in self.PERCENTILES)
+        lines.append(f"{'worker':<20} {'span':<8} {header} {'max':<8}")
+        for worker_name, spans in self.hop_latencies().items():
+            for span, values in spans.items():
+                if not values:
+                    continue
+                stats = " ".join(f"{value:<8.2f}" for value in np.percentile(values, self.PERCENTILES))
+                lines.append(f"{worker_name:<20} {span:<8} {stats} {max(values):<8.2f}")
+
+        end_to_end = self.end_to_end_latencies()
+        if end_to_end:
+            stats = " ".join(f"{value:<8.2f}" for value in np.percentile(end_to_end, self.PERCENTILES))
+            lines.append(f"{'end_to_end':<20} {'':<8} {stats} {max(end_to_end):<8.2f}")
+
+        critical_paths = {}
+        for step in self.traces.get(self.ROOT, {}):
+            critical_path = " -> ".join(self.critical_path(step))
+            critical_paths[critical_path] = critical_paths.get(critical_path, 0) + 1
+
+        lines.append("")
+        lines.append("Critical paths:")
+        for critical_path, count in sorted(critical_paths.items(), key=lambda item: -item[1]):
+            lines.append(f"{count:>8} steps: {critical_path}")
+
+        return "\n".join(lines)
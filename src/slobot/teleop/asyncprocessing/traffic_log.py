@@ -0,0 +1,246 @@
+"""Traffic capture and deterministic replay of the async teleoperator messages."""
+
+import glob
+import heapq
+import os
+import struct
+import time
+from dataclasses import dataclass
+from typing import Any, Iterator, Optional
+
+import numpy as np
+
+from slobot.configuration import Configuration
+from slobot.teleop.asyncprocessing.fifo_queue import FifoQueue
+from slobot.teleop.asyncprocessing.multi_slot_shared_memory_block import MultiSlotSharedMemoryBlock
+
+
+@dataclass
+class TrafficRecord:
+    kind: int             # RECORD_MESSAGE or RECORD_FRAME
+    capture_time: float   # time.time() when the message was written or the frame was committed
+    channel: str          # queue name or shared memory block name
+    data: bytes           # raw FIFO message (header + payload), or frame header + BGR pixels
+
+
+class TrafficRecorder:
+    """Appends every message a worker writes to its output queues, and every frame it commits to shared memory, to a binary log.
+
+    Each record is a fixed header [kind: u8][capture_time: f64][channel length: u16][data length: u32], followed by the channel name and the data.
+    FIFO messages are stored exactly as they were written to the pipe. Frames are stored raw, prefixed by their geometry and frame id.
+    There is one log file per worker, under a folder per recording, merged by capture time on replay.
+    """
+
+    LOGGER = Configuration.logger(__name__)
+
+    TRAFFIC_DIR = "/tmp/slobot/traffic"
+
+    RECORD_MESSAGE = 0
+    RECORD_FRAME = 1
+
+    RECORD_FORMAT = '<BdHI'
+    RECORD_SIZE = struct.calcsize(RECORD_FORMAT)
+
+    # Frame header: [width: u32][height: u32][frame_id: u64]
+    FRAME_FORMAT = '<IIQ'
+    FRAME_SIZE = struct.calcsize(FRAME_FORMAT)
+
+    @staticmethod
+    def traffic_dir(recording_id: str) -> str:
+        return f"{TrafficRecorder.TRAFFIC_DIR}/{recording_id}"
+
+    def __init__(self, worker_name: str, recording_id: str):
+        """Initialize the recorder.
+
+        Args:
+            worker_name: The worker's name, used as the file name
+            recording_id: The recording id, used as the folder name
+        """
+        traffic_dir = self.traffic_dir(recording_id)
+        os.makedirs(traffic_dir, exist_ok=True)
+        self.path = f"{traffic_dir}/{worker_name}.traffic"
+        self.file = open(self.path, "wb")
+        self.LOGGER.info(f"Capturing the traffic of worker {worker_name} to {self.path}")
+
+    def record_message(self, queue_name: str, message: bytes):
+        """Record a message written to a FIFO queue, header included."""
+        self.write_record(self.RECORD_MESSAGE, queue_name, message)
+
+    def record_frame(self, block_name: str, frame_id: int, frame: np.ndarray):
+        """Record a frame committed to a shared memory block."""
+        height, width = frame.shape[:2]
+        frame_header = struct.pack(self.FRAME_FORMAT, width, height, frame_id)
+        self.write_record(self.RECORD_FRAME, block_name, frame_header + frame.tobytes())
+
+    def write_record(self, kind: int, channel: str, data: bytes):
+        channel = channel.encode('utf-8')
+        self.file.write(struct.pack(self.RECORD_FORMAT, kind, time.time(), len(channel), len(data)))
+        self.file.write(channel)
+        self.file.write(data)
+
+    def flush(self):
+        self.file.flush()
+
+    def close(self):
+        self.file.close()
+
+    @staticmethod
+    def read_records(path: str) -> Iterator[TrafficRecord]:
+        """Iterate over the records of a log file, in write order."""
+        with open(path, "rb") as traffic_file:
+            while True:
+                record_header = traffic_file.read(TrafficRecorder.RECORD_SIZE)
+                if len(record_header) < TrafficRecorder.RECORD_SIZE:
+                    return  # end of file, or a record truncated by a crash
+
+                kind, capture_time, channel_length, data_length = struct.unpack(TrafficRecorder.RECORD_FORMAT, record_header)
+                channel = traffic_file.read(channel_length).decode('utf-8')
+                data = traffic_file.read(data_length)
+                if len(data) < data_length:
+                    return
+
+                yield TrafficRecord(kind, capture_time, channel, data)
+
+    @staticmethod
+    def merge_records(traffic_dir: str, channels: Optional[set[str]] = None) -> Iterator[TrafficRecord]:
+        """Iterate over the records of every log file of a recording, in capture time order.
+
+        Args:
+            traffic_dir: Folder holding one log file per worker
+            channels: Only keep the records of these queues and shared memory blocks, all of them if None
+        """
+        paths = sorted(glob.glob(f"{traffic_dir}/*.traffic"))
+        records = heapq.merge(
+            *[TrafficRecorder.read_records(path) for path in paths],
+            key=lambda record: record.capture_time,
+        )
+        for record in records:
+            if channels is None or record.channel in channels:
+                yield record
+
+    @staticmethod
+    def parse_frame(data: bytes) -> tuple[int, np.ndarray]:
+        """Parse the data of a frame record into (frame_id, BGR frame)."""
+        width, height, frame_id = struct.unpack_from(TrafficRecorder.FRAME_FORMAT, data)
+        frame = np.frombuffer(data, dtype=np.uint8, offset=TrafficRecorder.FRAME_SIZE)
+        return frame_id, frame.reshape((height, width, MultiSlotSharedMemoryBlock.CHANNELS))
+
+
+class ReplayQueue:
+    """Drop-in replacement of a worker input FifoQueue, reading the messages of a captured recording.
+
+    Messages are returned one by one in capture order, none is dropped as stale, so that the worker processes the same steps on every replay.
+    The captured frames of the shared memory blocks the worker reads from are committed to those blocks before the messages that follow them.
+    In real time mode, messages are released at their captured pace, scaled by the speed factor. Otherwise they are released as fast as the worker processes them.
+    Deadlines keep their captured budget relative to the replay time.
+    A poison pill is returned at the end of the recording, so the worker tears down and stops its downstream workers.
+    """
+
+    LOGGER = Configuration.logger(__name__)
+
+    def __init__(self, traffic_dir: str, name: str, shm_names: Optional[list[str]] = None, realtime: bool = True, speed: float = 1.0):
+        """Initialize the replay queue.
+
+        Args:
+            traffic_dir: Folder holding the log files of the recording
+            name: Name of the queue to replay
+            shm_names: Names of the shared memory blocks to replay the frames of
+            realtime: Release the messages at their captured pace, or as fast as possible
+            speed: Speed factor of the real time replay
+        """
+        self.name = name
+        self.traffic_dir = traffic_dir
+        self.shm_names = shm_names or []
+        self.realtime = realtime
+        self.speed = speed
+        self.fd: Optional[int] = None
+        self.last_sent_time: Optional[float] = None
+        self.records: Optional[Iterator[TrafficRecord]] = None
+        self.shm_blocks: dict[str, MultiSlotSharedMemoryBlock] = {}
+        self.start_capture_time = None
+        self.start_time = None
+        self.replayed_messages = 0
+
+    def open_read(self):
+        self.records = TrafficRecorder.merge_records(self.traffic_dir, {self.name, *self.shm_names})
+        self.LOGGER.info(f"Replaying queue {self.name} and shared memory blocks {self.shm_names} from {self.traffic_dir}")
+
+    def close(self):
+        # the replay queue is the producer of the replayed blocks
+        for shm_block in self.shm_blocks.values():
+            shm_block.close()
+            shm_block.unlink()
+        self.shm_blocks.clear()
+        self.LOGGER.info(f"Replayed {self.replayed_messages} messages of queue {self.name}")
+
+    def poll_latest(self, timeout: Optional[float] = None) -> Optional[tuple[int, float, int, Any]]:
+        """Return the next captured message of the queue.
+
+        Returns:
+            Tuple of (msg_type, deadline, step, payload), a poison pill once the recording is over
+        """
+        for record in self.records:
+            self.wait_capture_time(record.capture_time)
+
+            if record.kind == TrafficRecorder.RECORD_FRAME:
+                self.replay_frame(record)
+                continue
+
+            msg_len, msg_type, deadline, step, sent_time = struct.unpack_from(FifoQueue.HEADER_FORMAT, record.data)
+            payload = FifoQueue.from_bytes(msg_type, record.data[FifoQueue.HEADER_SIZE:msg_len])
+
+            self.last_sent_time = time.time()
+            if deadline > 0:
+                deadline = self.last_sent_time + deadline - sent_time
+            self.replayed_messages += 1
+            return msg_type, deadline, step, payload
+
+        return FifoQueue.MSG_POISON_PILL, 0.0, 0, None
+
+    def wait_capture_time(self, capture_time: float):
+        """In real time mode, sleep until the replay time of a record."""
+        if not self.realtime:
+            return
+
+        if self.start_time is None:
+            self.start_capture_time = capture_time
+            self.start_time = time.perf_counter()
+            return
+
+        sleep_time = self.start_time + (capture_time - self.start_capture_time) / self.speed - time.perf_counter()
+        if sleep_time > 0:
+            time.sleep(sleep_time)
+
+    def replay_frame(self, record: TrafficRecord):
+        _, frame = TrafficRecorder.parse_frame(record.data)
+        shm_block = self.shm_blocks.get(record.channel)
+        if shm_block is None:
+            height, width = frame.shape[:2]
+            shm_block = MultiSlotSharedMemoryBlock(record.channel, width=width, height=height)
+            self.shm_blocks[record.channel] = shm_block
+
+        shm_block.write_frame(frame)
+
+
+class TrafficReplay:
+    """Creates the replay queues, in place of the input FifoQueue of the worker driven by a recording.
+
+    The downstream workers of a sub-pipeline are spawned as usual, and read the outputs of the replayed worker from their FIFO queues.
+    """
+
+    def __init__(self, recording_id: str, shm_names: Optional[list[str]] = None, realtime: bool = True, speed: float = 1.0):
+        """Initialize the replay.
+
+        Args:
+            recording_id: The recording id of the captured traffic
+            shm_names: Names of the shared memory blocks to replay the frames of
+            realtime: Release the messages at their captured pace, or as fast as possible
+            speed: Speed factor of the real time replay
+        """
+        self.traffic_dir = TrafficRecorder.traffic_dir(recording_id)
+        self.shm_names = shm_names or []
+        self.realtime = realtime
+        self.speed = speed
+
+    def queue(self, name: str) -> ReplayQueue:
+        return ReplayQueue(self.traffic_dir, name, self.shm_names, self.realtime, self.speed)
@@ -1,7 +1,14 @@
 """Async Teleoperator - main entry point for all the workers."""
 
+from typing import Optional
+
 from slobot.teleop.asyncprocessing.fifo_queue import FifoQueue
+from slobot.teleop.asyncprocessing.fake_devices import FakeFeetech
+from slobot.teleop.asyncprocessing.traffic_log import TrafficReplay
+from slobot.teleop.asyncprocessing.asyncio_runner import AsyncioRunner
 from slobot.teleop.asyncprocessing.workers.worker_base import WorkerBase
+from slobot.encoder_profile import EncoderProfile
+from slobot.metrics.video_encoder import DropPolicy
 
 
 class AsyncTeleoperator:
@@ -13,60 +20,109 @@ class AsyncTeleoperator:
     - Follower Control (sends commands to follower arm and reads position)
     - Sim Step (runs Genesis simulation)
     - Webcam Capture (captures webcam frames)
+    - Detect Objects (runs object detection on the frames of a webcam), or Detection Server (on the frames of every webcam)
+
+    Pass fake=True to the leader, follower or webcam spawn methods to use a fake device, for load testing without USB devices.
+    Pass trace_steps=True to a spawn method to record the per-step timestamps of the worker.
+    Pass capture_traffic=True to a spawn method to capture the messages the worker writes.
+    With a traffic replay, the input queue of the spawned worker is replaced by the captured messages.
+    With an asyncio runner, the spawned workers are hosted by the runner in the current process, talking over in-process queues.
     """
+
+    def __init__(self, traffic_replay: Optional[TrafficReplay] = None, asyncio_runner: Optional[AsyncioRunner] = None):
+        self.traffic_replay = traffic_replay
+        self.asyncio_runner = asyncio_runner
+
+    def queue(self, name: str) -> FifoQueue:
+        if self.asyncio_runner is not None:
+            return self.asyncio_runner.queue(name)
+        return FifoQueue(name)
+
+    def input_queue(self, name: str) -> FifoQueue:
+        if self.traffic_replay is not None:
+            return self.traffic_replay.queue(name)
+        return self.queue(name)
+
+    def run_worker(self, worker: WorkerBase, **kwargs):
+        # the load reports go through the same kind of queue as the other messages, in-process with an asyncio runner
+        worker.load_report_queue = self.queue(FifoQueue.QUEUE_LOAD_REPORT)
+        worker.trace_steps = kwargs.get('trace_steps', False)
+        worker.capture_traffic = kwargs.get('capture_traffic', False)
+        if kwargs.get('encoder_profile') is not None:
+            worker.encoder_profile = EncoderProfile.parse(kwargs['encoder_profile'])
+        worker.encoder_queue_size = kwargs.get('encoder_queue_size')
+        if kwargs.get('drop_policy') is not None:
+            worker.drop_policy = DropPolicy(kwargs['drop_policy'])
+        if self.asyncio_runner is not None:
+            # the runner starts the workers once they are all spawned
+            self.asyncio_runner.add_worker(worker)
+        else:
+            worker.run()
     
     def spawn_cron_worker(self, **kwargs):
         from slobot.teleop.asyncprocessing.workers.cron_worker import CronWorker
         cron_worker = CronWorker(
-            leader_read_queue=FifoQueue(FifoQueue.QUEUE_LEADER_READ),
+            leader_read_queue=self.queue(FifoQueue.QUEUE_LEADER_READ),
             recording_id=kwargs['recording_id'],
             fps=kwargs['fps'],
+            latency_budget_ms=kwargs.get('latency_budget_ms'),
+            adaptive=kwargs.get('adaptive', False),
+            min_fps=kwargs.get('min_fps'),
         )
-        cron_worker.run()
+        self.run_worker(cron_worker, **kwargs)
 
     def spawn_leader_read_worker(self, **kwargs):
         from slobot.teleop.asyncprocessing.workers.leader_read_worker import LeaderReadWorker
+        from slobot.feetech import Feetech
         leader_read_worker = LeaderReadWorker(
-            input_queue=FifoQueue(FifoQueue.QUEUE_LEADER_READ),
-            follower_control_queue=FifoQueue(FifoQueue.QUEUE_FOLLOWER_CONTROL),
-            port=kwargs['port'],
+            input_queue=self.input_queue(FifoQueue.QUEUE_LEADER_READ),
+            follower_control_queue=self.queue(FifoQueue.QUEUE_FOLLOWER_CONTROL),
+            port=kwargs.get('port', Feetech.PORT_LEADER),
+            fake=kwargs.get('fake', False),
+            bus_latency_ms=kwargs.get('bus_latency_ms', FakeFeetech.BUS_LATENCY_MS),
         )
-        leader_read_worker.run()
+        self.run_worker(leader_read_worker, **kwargs)
         
     def spawn_follower_control_worker(self, **kwargs):
         from slobot.teleop.asyncprocessing.workers.follower_control_worker import FollowerControlWorker
+        from slobot.feetech import Feetech
 
         # Create webcam capture queues dynamically based on camera IDs
         camera_ids = kwargs['camera_ids'] or []
         webcam_queues = [
-            FifoQueue(FifoQueue.get_queue_name(FifoQueue.QUEUE_WEBCAM_CAPTURE, camera_id))
+            self.queue(FifoQueue.get_queue_name(FifoQueue.QUEUE_WEBCAM_CAPTURE, camera_id))
             for camera_id in camera_ids
         ]
 
         follower_control_worker = FollowerControlWorker(
-            input_queue=FifoQueue(FifoQueue.QUEUE_FOLLOWER_CONTROL),
+            input_queue=self.input_queue(FifoQueue.QUEUE_FOLLOWER_CONTROL),
             webcam_capture_queues=webcam_queues,
-            sim_step_queue=FifoQueue(FifoQueue.QUEUE_SIM_STEP) if kwargs['sim'] else None,
-            port=kwargs['port'],
+            sim_step_queue=self.queue(FifoQueue.QUEUE_SIM_STEP) if kwargs['sim'] else None,
+            port=kwargs.get('port', Feetech.PORT_FOLLOWER),
+            fake=kwargs.get('fake', False),
+            bus_latency_ms=kwargs.get('bus_latency_ms', FakeFeetech.BUS_LATENCY_MS),
         )
-        follower_control_worker.run()
+        self.run_worker(follower_control_worker, **kwargs)
 
     def spawn_sim_step_worker(self, **kwargs):
         from slobot.teleop.asyncprocessing.workers.sim_step_worker import SimStepWorker
+        from slobot.teleop.asyncprocessing.render_schedule import RenderSchedule
         sim_step_worker = SimStepWorker(
-            input_queue=FifoQueue(FifoQueue.QUEUE_SIM_STEP),
+            input_queue=self.input_queue(FifoQueue.QUEUE_SIM_STEP),
             fps=kwargs['fps'],
             substeps=kwargs['substeps'],
             vis_mode=kwargs['vis_mode'],
             width=kwargs['width'],
             height=kwargs['height'],
+            depth_range=kwargs.get('depth_range'),
+            render_schedule=RenderSchedule.parse(kwargs['render_pass']) if kwargs.get('render_pass') else None,
         )
-        sim_step_worker.run()
+        self.run_worker(sim_step_worker, **kwargs)
 
     def spawn_mirror_kinematics_worker(self, **kwargs):
         from slobot.teleop.asyncprocessing.workers.mirror_kinematics_worker import MirrorKinematicsWorker
         mirror_kinematics_worker = MirrorKinematicsWorker(
-            input_queue=FifoQueue(FifoQueue.QUEUE_FOLLOWER_CONTROL), # replaces the follower, so it should use the same queue as Follower Control worker
+            input_queue=self.input_queue(FifoQueue.QUEUE_FOLLOWER_CONTROL), # replaces the follower, so it should use the same queue as Follower Control worker
             fps=kwargs['fps'],
             substeps=kwargs['substeps'],
             vis_mode=kwargs['vis_mode'],
@@ -75,31 +131,60 @@ class AsyncTeleoperator:
             mjcf_path=kwargs['mjcf_path'],
             end_effector_link=kwargs['end_effector_link'],
         )
-        mirror_kinematics_worker.run()
+        self.run_worker(mirror_kinematics_worker, **kwargs)
 
     def spawn_webcam_capture_worker(self, worker_name: str, queue_name: str, **kwargs):
         from slobot.teleop.asyncprocessing.workers.webcam_capture_worker import WebcamCaptureWorker
+        from slobot.teleop.asyncprocessing.multi_slot_shared_memory_block import MultiSlotSharedMemoryBlock
 
         webcam_capture_worker = WebcamCaptureWorker(
             worker_name=worker_name,
-            input_queue=FifoQueue(queue_name),
+            input_queue=self.input_queue(queue_name),
             camera_id=kwargs['camera_id'],
             width=kwargs['width'],
             height=kwargs['height'],
             fps=kwargs['fps'],
-            detect_objects_queue=FifoQueue(FifoQueue.get_queue_name(FifoQueue.QUEUE_OBJECT_DETECTION, kwargs['camera_id'])) if kwargs.get('detect_objects') else None,
+            detect_objects_queue=self.queue(FifoQueue.get_queue_name(FifoQueue.QUEUE_OBJECT_DETECTION, kwargs['camera_id'])) if kwargs.get('detect_objects') else None,
+            fake=kwargs.get('fake', False),
+            continuous_grab=kwargs.get('continuous_grab', False),
+            preview_rate=kwargs.get('preview_rate'),
+            preview_downscale=kwargs.get('preview_downscale', 1),
+            reader_hold_time=kwargs['reader_hold_ms'] / 1000 if kwargs.get('reader_hold_ms') is not None else MultiSlotSharedMemoryBlock.READER_HOLD_TIME,
         )
-        webcam_capture_worker.run()
+        self.run_worker(webcam_capture_worker, **kwargs)
 
     def spawn_detect_objects_worker(self, worker_name: str, queue_name: str, **kwargs):
         from slobot.teleop.asyncprocessing.workers.detect_objects_workers import DetectObjectsWorker
 
         detection_worker = DetectObjectsWorker(
             worker_name=worker_name,
-            input_queue=FifoQueue(FifoQueue.get_queue_name(FifoQueue.QUEUE_OBJECT_DETECTION, kwargs['camera_id'])),
+            input_queue=self.input_queue(FifoQueue.get_queue_name(FifoQueue.QUEUE_OBJECT_DETECTION, kwargs['camera_id'])),
             camera_id=kwargs['camera_id'],
             detection_task=kwargs['detection_task'],
             width=kwargs['width'],
             height=kwargs['height'],
+            detect_every=kwargs.get('detect_every', 1),
+            motion_threshold=kwargs.get('motion_threshold'),
+            copy_frame=kwargs.get('copy_frame', False),
+        )
+        self.run_worker(detection_worker, **kwargs)
+
+    def spawn_detection_server_worker(self, **kwargs):
+        from slobot.teleop.asyncprocessing.workers.detection_server_worker import DetectionServerWorker
+
+        # the server reads the detection queues of every camera, in place of their Detect Objects workers
+        camera_ids = kwargs['camera_ids']
+        detection_server_worker = DetectionServerWorker(
+            worker_name=WorkerBase.WORKER_DETECTION_SERVER,
+            input_queues=[
+                self.queue(FifoQueue.get_queue_name(FifoQueue.QUEUE_OBJECT_DETECTION, camera_id))
+                for camera_id in camera_ids
+            ],
+            camera_ids=camera_ids,
+            detection_task=kwargs['detection_task'],
+            width=kwargs['width'],
+            height=kwargs['height'],
+            step_tolerance=kwargs.get('step_tolerance', 0),
+            copy_frame=kwargs.get('copy_frame', False),
         )
-        detection_worker.run()
\ No newline at end of file
+        self.run_worker(detection_server_worker, **kwargs)
\ No newline at end of file
@@ -2,8 +2,10 @@
 
 import time
 from types import NoneType
-from typing import Any
+from typing import Any, Optional
 from slobot.teleop.asyncprocessing.fifo_queue import FifoQueue
+from slobot.teleop.asyncprocessing.deadline_ticker import DeadlineTicker, JitterHistogram
+from slobot.teleop.asyncprocessing.rate_controller import RateController
 from slobot.teleop.asyncprocessing.workers.worker_base import WorkerBase
 from slobot.configuration import Configuration
 
@@ -14,6 +16,12 @@ class CronWorker(WorkerBase):
     This is the main scheduler that initiates each cycle of the control loop.
     Unlike other workers, it doesn't have an input queue - it generates ticks
     based on a timer.
+
+    Tick k is released at t0 + k * period, so the clock does not drift.
+    The step id is the tick index: missed ticks are skipped and show up as gaps.
+
+    In adaptive mode, it reads the load reports of the workers once per second,
+    and lowers its tick rate or decimates the sheddable workers to keep the latency within the budget.
     """
     
     LOGGER = Configuration.logger(__name__)
@@ -23,12 +31,18 @@ class CronWorker(WorkerBase):
         leader_read_queue: FifoQueue,
         recording_id: str,
         fps: int,
+        latency_budget_ms: Optional[float] = None,
+        adaptive: bool = False,
+        min_fps: Optional[int] = None,
     ):
         """Initialize the cron worker.
         
         Args:
             leader_read_queue: The queue to publish ticks to (typically leader_read_q)
             fps: Target frequency in Hz
+            latency_budget_ms: End-to-end latency budget, defaults to the period
+            adaptive: Adapt the tick rate and the decimations to the load reports
+            min_fps: Lowest frequency in adaptive mode, defaults to half the target frequency
         """
         super().__init__(
             worker_name=self.WORKER_CRON,
@@ -37,9 +51,21 @@ class CronWorker(WorkerBase):
         )
         self.recording_id = recording_id
         self.leader_read_queue = leader_read_queue
+        self.fps = fps
         self.period = 1.0 / fps
+        self.latency_budget = None if latency_budget_ms is None else latency_budget_ms / 1000
+        self.ticker = DeadlineTicker(self.period)
+        self.jitter_histogram = JitterHistogram()
+        self.histogram_step = 0
+        self.rate_controller = RateController(fps, min_fps or max(1, fps // 2)) if adaptive else None
+        self.load_reports = []
+        self.control_step = 0
+        self.running = True
 
     def setup(self):
+        if self.rate_controller is not None:
+            # open before blocking on the leader, the workers report without waiting for the cron
+            self.load_report_queue.open_read()
         self.setup_output()
         self.setup_metrics()
         self.publish_recording_id(self.recording_id)
@@ -51,31 +77,35 @@ class CronWorker(WorkerBase):
         self.LOGGER.info(f"Cron worker started with period {self.period} seconds")
 
         try:
-            step = 0
-            while True:
+            self.ticker.start()
+            jitter = 0.0
+            while self.running:
+                step = self.ticker.tick
                 start_time = time.time()
-                
-                # Set deadline = start_time + period
-                # All downstream workers must complete before this deadline
-                deadline = start_time + self.period
-    
+
+                # All downstream workers must complete before the next tick is scheduled, or within the latency budget
+                if self.latency_budget is None:
+                    deadline = self.ticker.deadline()
+                else:
+                    deadline = self.ticker.tick_wall_time() + self.latency_budget
+
                 # Publish tick to all output queues with the deadline
                 self.leader_read_queue.write_empty(deadline, step)
-                
+
                 end_time = time.time()
                 latency_ms = (end_time - start_time) * 1000
-                
+
                 # Publish metrics
                 self.publish_metrics(step, latency_ms)
-                
-                # Sleep for remaining time in the period
-                elapsed = end_time - start_time
-                sleep_time = self.period - elapsed
-                if sleep_time > 0:
-                    time.sleep(sleep_time)
-
-                step += 1
-                    
+                self.publish_jitter(step, jitter * 1000)
+                self.publish_trace(step, None, start_time, start_time, end_time, end_time)
+
+                if self.rate_controller is not None:
+                    self.adapt_rate(step)
+
+                # Wait for the next absolute deadline
+                jitter = self.ticker.wait_next()
+
         except Exception as e:
             self.LOGGER.error(f"Cron worker error: {e}")
             raise
@@ -83,14 +113,59 @@ class CronWorker(WorkerBase):
             self.teardown()
             self.LOGGER.info("Cron worker stopped")
 
+    def stop(self):
+        """Stop ticking after the current tick, when the cron runs in a thread rather than its own process."""
+        self.running = False
+
     def process(self, payload: Any) -> tuple[int, Any]:
         return FifoQueue.MSG_EMPTY, None
 
     def publish_data(self, step: int, result_payload: NoneType):
         pass
 
+    def publish_jitter(self, step: int, jitter_ms: float):
+        """Publish the tick jitter, and its histogram once per second."""
+        self.jitter_histogram.add(jitter_ms)
+        self.rerun_metrics.log_tick_jitter(step, self.worker_name, jitter_ms, self.ticker.missed_ticks)
+
+        if step - self.histogram_step >= self.fps:
+            self.rerun_metrics.log_histogram(step, f"/{self.worker_name}/jitter_histogram", self.jitter_histogram.bin_starts, self.jitter_histogram.counts)
+            self.histogram_step = step
+
+    def adapt_rate(self, step: int):
+        """Collect the load reports, and run the rate controller once per second."""
+        for msg_type, _, _, payload, _ in self.load_report_queue.poll_available():
+            if msg_type == FifoQueue.MSG_LOAD_REPORT:
+                self.load_reports.append(payload)
+
+        if step - self.control_step < self.fps:
+            return
+        self.control_step = step
+
+        new_fps, decimations = self.rate_controller.handle_reports(self.load_reports)
+        self.load_reports.clear()
+
+        if new_fps is not None:
+            self.fps = new_fps
+            self.period = 1.0 / new_fps
+            self.ticker.set_period(self.period)
+
+        for worker_name, decimation in decimations.items():
+            self.leader_read_queue.send_decimation(worker_name, decimation)
+
+        self.rerun_metrics.log_rate(step, self.worker_name, self.fps, self.rate_controller.decimations)
+
     def teardown(self):
-        """Close output queues."""
+        """Close the output queues, and the load report queue in adaptive mode."""
+        if self.step_tracer is not None:
+            self.step_tracer.flush()
+
+        self.rerun_metrics.flush_scalars()
+
         self.publish_reset() # trigger a reset of the downstream workers so they can be ready for the next recording
+        self.stop_traffic_capture()
         for queue in self.output_queues:
-            queue.close()
\ No newline at end of file
+            queue.close()
+
+        if self.load_report_queue.fd is not None:
+            self.load_report_queue.close()
\ No newline at end of file
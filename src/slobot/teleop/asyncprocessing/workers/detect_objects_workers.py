@@ -1,7 +1,9 @@
 """Detection worker - runs object detection on frames from shared memory."""
 
 import enum
+import time
 from typing import Any, Optional
+import cv2
 import numpy as np
 from ultralytics import YOLO
 
@@ -9,6 +11,8 @@ from slobot.teleop.asyncprocessing.fifo_queue import FifoQueue
 from slobot.teleop.asyncprocessing.workers.worker_base import WorkerBase
 from slobot.configuration import Configuration
 from slobot.teleop.asyncprocessing.shared_memory_block import SharedMemoryBlock
+from slobot.teleop.asyncprocessing.multi_slot_shared_memory_block import FrameLease, MultiSlotSharedMemoryBlock
+from slobot.teleop.asyncprocessing.object_tracker import Detections, ObjectTracker
 
 class DetectionTask(enum.Enum):
     DETECT = "detect", "yolo26n.pt"
@@ -22,12 +26,21 @@ class DetectObjectsWorker(WorkerBase):
     """Worker that runs detection on frames read from shared memory.
     
     Receives MSG_OBJECT_DETECTION signals.
-    Reads the latest frame from the shared memory block (using locking).
-    Runs YOLO inference and publishes metrics.
+    Leases a read-only view of the latest frame from the shared memory block, without copying it.
+    Runs YOLO inference on the view and publishes metrics. The webcam sizes its ring from the time a reader holds a slot,
+    the detections being dropped if the slot was overwritten during the inference anyway.
+    With copy_frame, the frame is copied into a buffer reused across steps instead, for an inference outlasting the ring.
+
+    In detect-then-track mode, YOLO only runs every N frames, or when the frame moved away from the last detected frame.
+    The detections are carried forward by a lightweight optical flow tracker in between.
+    The latency saved by tracking, and the drift of the tracked boxes against the next detection, are published as metrics.
     """
     
     LOGGER = Configuration.logger(__name__)
 
+    # Smoothing factor of the moving average of the detection latency
+    DETECTION_LATENCY_SMOOTHING = 0.1
+
     def __init__(
         self,
         worker_name: str,
@@ -36,6 +49,9 @@ class DetectObjectsWorker(WorkerBase):
         detection_task: str,
         width: int,
         height: int,
+        detect_every: int = 1,
+        motion_threshold: Optional[float] = None,
+        copy_frame: bool = False,
     ):
         """Initialize the detection worker.
         
@@ -46,6 +62,9 @@ class DetectObjectsWorker(WorkerBase):
             detection_task: Task to run (detect or pose)
             width: Frame width
             height: Frame height
+            detect_every: Run YOLO every N frames, tracking the detections in between
+            motion_threshold: Also run YOLO when the mean absolute difference with the last detected frame, between 0 and 1, exceeds this threshold
+            copy_frame: Copy the latest frame out of shared memory instead of leasing it, when the inference outlasts the ring of slots
         """
         super().__init__(
             worker_name=worker_name,
@@ -57,7 +76,14 @@ class DetectObjectsWorker(WorkerBase):
         self.width = width
         self.height = height
         self.model: Optional[YOLO] = None
-        self.shm_block: Optional[SharedMemoryBlock] = None
+        self.shm_block: Optional[MultiSlotSharedMemoryBlock] = None
+        self.copy_frame = copy_frame
+        self.frame: Optional[np.ndarray] = None  # copy of the latest frame reused across steps, with copy_frame
+
+        # Detect-then-track mode
+        self.tracker = ObjectTracker(detect_every, motion_threshold) if detect_every > 1 or motion_threshold is not None else None
+        self.detection_latency_ms: Optional[float] = None
+        self.tracking_report: Optional[tuple[bool, float, Optional[float]]] = None  # (detected, latency saved in ms, drift)
 
     def setup(self):
         super().setup()
@@ -66,13 +92,11 @@ class DetectObjectsWorker(WorkerBase):
         self.model = YOLO(self.detection_task.model_name)
         self.LOGGER.info(f"Initialized {self.detection_task.model_name} for {self.detection_task.value}")
         
-        # Compute shared memory size: header + frame data
-        frame_size = self.width * self.height * SharedMemoryBlock.CHANNELS
-        total_size = SharedMemoryBlock.HEADER_SIZE + frame_size
-        
         # Attach to shared memory block using centralized naming
         shm_name = SharedMemoryBlock.get_name_from_camera_id(self.camera_id)
-        self.shm_block = SharedMemoryBlock(shm_name, size=total_size)
+        self.shm_block = MultiSlotSharedMemoryBlock(shm_name, width=self.width, height=self.height)
+        if self.copy_frame:
+            self.frame = np.empty((self.shm_block.height, self.shm_block.width, MultiSlotSharedMemoryBlock.CHANNELS), dtype=np.uint8)
 
     def teardown(self):
         self.shm_block.close()
@@ -90,16 +114,68 @@ class DetectObjectsWorker(WorkerBase):
         Returns:
             MSG_EMPTY, detections
         """
-        # Read frame from shared memory
-        frame = self.shm_block.read_frame()
-            
+        frame, lease = self.latest_frame()
+        if frame is None:
+            return FifoQueue.MSG_EMPTY, None
+
+        gray = None
+        detect = True
+        if self.tracker is not None:
+            gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+            detect = self.tracker.should_detect(gray)
+
         # Run inference
-        results = self.model(frame, verbose=False)
-        if results:
-            detections = results[0]
-            return FifoQueue.MSG_EMPTY, detections
-            
-        return FifoQueue.MSG_EMPTY, None
+        if detect:
+            start_time = time.time()
+            results = self.model(frame, verbose=False)
+            self.update_detection_latency((time.time() - start_time) * 1000)
+
+        if lease is not None and not self.shm_block.release(lease):
+            # the webcam overwrote the slot during inference, the detections may come from a torn frame
+            self.LOGGER.warning(f"Dropped detections on torn frame {lease.frame_id} from camera {self.camera_id}")
+            return FifoQueue.MSG_EMPTY, None
+
+        if not detect:
+            return FifoQueue.MSG_EMPTY, self.track(gray)
+
+        detections = Detections.from_results(results[0]) if results else None
+        if self.tracker is not None and detections is not None:
+            self.restart_tracking(gray, detections)
+
+        return FifoQueue.MSG_EMPTY, detections
+
+    def latest_frame(self) -> tuple[Optional[np.ndarray], Optional[FrameLease]]:
+        """The latest frame, as a leased view of its slot, or as a copy with copy_frame, in which case the lease is None."""
+        if self.copy_frame:
+            frame_id = self.shm_block.read_latest(self.frame)
+            return (None if frame_id is None else self.frame), None
+
+        lease = self.shm_block.lease_latest()
+        return (None if lease is None else lease.frame), lease
+
+    def track(self, gray: np.ndarray) -> Detections:
+        """Carry the detections forward to this frame instead of running YOLO."""
+        start_time = time.time()
+        detections = self.tracker.track(gray)
+        tracking_latency_ms = (time.time() - start_time) * 1000
+
+        self.tracking_report = (False, self.detection_latency_ms - tracking_latency_ms, None)
+        return detections
+
+    def restart_tracking(self, gray: np.ndarray, detections: Detections):
+        """Measure the drift of the tracked detections against the fresh ones, then track the fresh ones."""
+        drift = None
+        if self.tracker.detections is not None:
+            drift = ObjectTracker.drift(self.tracker.track(gray), detections)
+
+        self.tracker.update(gray, detections)
+        self.tracking_report = (True, 0.0, drift)
+
+    def update_detection_latency(self, latency_ms: float):
+        if self.detection_latency_ms is None:
+            self.detection_latency_ms = latency_ms
+        else:
+            self.detection_latency_ms += self.DETECTION_LATENCY_SMOOTHING * (latency_ms - self.detection_latency_ms)
 
     def publish_data(self, step: int, result_payload: Any):
         """Publish detection results to Rerun."""
@@ -112,30 +188,38 @@ class DetectObjectsWorker(WorkerBase):
         video_path = f"/webcam{self.camera_id}/video"
 
         if detections:
-            match self.detection_task:
-                case DetectionTask.DETECT:
-                    self._log_detections(step, detections, video_path)
-                case DetectionTask.POSE:
-                    self._log_pose(step, detections, video_path)
-
-    def _log_detections(self, step: int, detections, video_path: str):
-        boxes = detections.boxes.xyxy.cpu().numpy()
-        classes = detections.boxes.cls.cpu().numpy()
-        names = [detections.names[int(c)] for c in classes]
-        
-        self.rerun_metrics.log_boxes2D(
+            DetectObjectsWorker.log_results(self.rerun_metrics, self.detection_task, step, detections, video_path)
+
+        if self.tracking_report is not None:
+            detected, latency_saved_ms, drift = self.tracking_report
+            self.rerun_metrics.log_tracking(step, self.worker_name, detected, latency_saved_ms, drift)
+            self.tracking_report = None
+
+    @staticmethod
+    def log_results(rerun_metrics, detection_task: DetectionTask, step: int, detections: Detections, video_path: str):
+        """Publish the detections of a frame to Rerun, over the video of its camera."""
+        match detection_task:
+            case DetectionTask.DETECT:
+                DetectObjectsWorker._log_detections(rerun_metrics, step, detections, video_path)
+            case DetectionTask.POSE:
+                DetectObjectsWorker._log_pose(rerun_metrics, step, detections, video_path)
+
+    @staticmethod
+    def _log_detections(rerun_metrics, step: int, detections: Detections, video_path: str):
+        rerun_metrics.log_boxes2D(
             step,
             f"{video_path}/detections",
-            boxes,
-            names
+            detections.boxes,
+            detections.labels
         )
 
-    def _log_pose(self, step: int, detections, video_path: str):
+    @staticmethod
+    def _log_pose(rerun_metrics, step: int, detections: Detections, video_path: str):
         if detections.keypoints is None:
             return
         
         # Keypoints: [N, 17, 2] (x, y)
-        kpts = detections.keypoints.xy.cpu().numpy()
+        kpts = detections.keypoints
         
         all_points = []
         for person_kpts in kpts:
@@ -144,7 +228,7 @@ class DetectObjectsWorker(WorkerBase):
                     all_points.append(kp)
             
         if all_points:
-            self.rerun_metrics.log_points2D(
+            rerun_metrics.log_points2D(
                 step,
                 f"{video_path}/pose",
                 all_points
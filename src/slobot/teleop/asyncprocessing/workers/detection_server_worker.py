@@ -0,0 +1,136 @@
+"""Detection server - runs batched object detection on the frames of every webcam."""
+
+from typing import Any, Optional
+
+import numpy as np
+from ultralytics import YOLO
+
+from slobot.teleop.asyncprocessing.fifo_queue import FifoQueue
+from slobot.teleop.asyncprocessing.workers.multi_input_worker_base import MultiInputWorkerBase
+from slobot.teleop.asyncprocessing.workers.detect_objects_workers import DetectionTask, DetectObjectsWorker
+from slobot.configuration import Configuration
+from slobot.teleop.asyncprocessing.shared_memory_block import SharedMemoryBlock
+from slobot.teleop.asyncprocessing.multi_slot_shared_memory_block import FrameLease, MultiSlotSharedMemoryBlock
+from slobot.teleop.asyncprocessing.object_tracker import Detections
+
+
+class DetectionServerWorker(MultiInputWorkerBase):
+    """Worker that runs detection on the frames of several webcams with a single model.
+
+    Replaces the Detect Objects workers of a multi-camera rig: one model copy is loaded instead of one per camera.
+    Receives the MSG_OBJECT_DETECTION signals of every webcam, aligned by step.
+    Leases the latest frame of each webcam shared memory block, and runs a single batched YOLO inference over them, without copying them.
+    The detections of a camera whose slot was overwritten during the inference are dropped.
+    With copy_frame, the frames are copied into buffers reused across steps instead, for an inference outlasting the rings.
+    Publishes the detections of each camera over its video.
+    """
+
+    LOGGER = Configuration.logger(__name__)
+
+    def __init__(
+        self,
+        worker_name: str,
+        input_queues: list[FifoQueue],
+        camera_ids: list[int],
+        detection_task: str,
+        width: int,
+        height: int,
+        step_tolerance: int = 0,
+        copy_frame: bool = False,
+    ):
+        """Initialize the detection server.
+
+        Args:
+            worker_name: The name of the worker
+            input_queues: The queues to read detection signals from, one per camera
+            camera_ids: Camera IDs to derive shared memory block names, in the order of the input queues
+            detection_task: Task to run (detect or pose)
+            width: Frame width
+            height: Frame height
+            step_tolerance: Maximum step difference between the frames batched together
+            copy_frame: Copy the latest frames out of shared memory instead of leasing them, when the inference outlasts the rings of slots
+        """
+        super().__init__(
+            worker_name=worker_name,
+            input_queues=input_queues,
+            input_msg_types=[FifoQueue.MSG_OBJECT_DETECTION] * len(input_queues),
+            output_queues=[],
+            step_tolerance=step_tolerance,
+        )
+        self.camera_ids = camera_ids
+        self.detection_task = DetectionTask[detection_task]
+        self.width = width
+        self.height = height
+        self.model: Optional[YOLO] = None
+        self.shm_blocks: list[MultiSlotSharedMemoryBlock] = []
+        self.copy_frame = copy_frame
+        self.frames: list[np.ndarray] = []  # copy of the latest frame of each camera reused across steps, with copy_frame
+
+    def setup(self):
+        super().setup()
+
+        # Initialize a single YOLO model, shared by every camera
+        self.model = YOLO(self.detection_task.model_name)
+        self.LOGGER.info(f"Initialized {self.detection_task.model_name} for {self.detection_task.value} on cameras {self.camera_ids}")
+
+        # Attach to the shared memory block of each camera
+        self.shm_blocks = [
+            MultiSlotSharedMemoryBlock(SharedMemoryBlock.get_name_from_camera_id(camera_id), width=self.width, height=self.height)
+            for camera_id in self.camera_ids
+        ]
+        if self.copy_frame:
+            self.frames = [
+                np.empty((shm_block.height, shm_block.width, MultiSlotSharedMemoryBlock.CHANNELS), dtype=np.uint8)
+                for shm_block in self.shm_blocks
+            ]
+
+    def teardown(self):
+        for shm_block in self.shm_blocks:
+            shm_block.close()
+            # Do NOT unlink in the consumer
+
+        super().teardown()
+
+    def process(self, payload: Any) -> tuple[int, Any]:
+        """Process the aligned detection signals of every camera.
+
+        Args:
+            payload: List of None, one per camera
+
+        Returns:
+            MSG_EMPTY, list of detections per camera, None for the cameras without a valid frame
+        """
+        latest_frames = [self.latest_frame(camera_index) for camera_index in range(len(self.camera_ids))]
+        batch_indexes = [camera_index for camera_index, (frame, _) in enumerate(latest_frames) if frame is not None]
+        if not batch_indexes:
+            return FifoQueue.MSG_EMPTY, [None] * len(self.camera_ids)
+
+        # Run a single inference over the batch of frames
+        results = self.model([latest_frames[camera_index][0] for camera_index in batch_indexes], verbose=False)
+
+        detections = [None] * len(self.camera_ids)
+        for camera_index, result in zip(batch_indexes, results):
+            lease = latest_frames[camera_index][1]
+            if lease is not None and not self.shm_blocks[camera_index].release(lease):
+                # the webcam overwrote the slot during inference, the detections may come from a torn frame
+                self.LOGGER.warning(f"Dropped detections on torn frame {lease.frame_id} from camera {self.camera_ids[camera_index]}")
+                continue
+            detections[camera_index] = Detections.from_results(result)
+
+        return FifoQueue.MSG_EMPTY, detections
+
+    def latest_frame(self, camera_index: int) -> tuple[Optional[np.ndarray], Optional[FrameLease]]:
+        """The latest frame of a camera, as a leased view of its slot, or as a copy with copy_frame, in which case the lease is None."""
+        shm_block = self.shm_blocks[camera_index]
+        if self.copy_frame:
+            frame = self.frames[camera_index]
+            return (None if shm_block.read_latest(frame) is None else frame), None
+
+        lease = shm_block.lease_latest()
+        return (None if lease is None else lease.frame), lease
+
+    def publish_data(self, step: int, result_payload: Any):
+        """Publish the detection results of each camera to Rerun."""
+        for camera_id, detections in zip(self.camera_ids, result_payload):
+            if detections:
+                DetectObjectsWorker.log_results(self.rerun_metrics, self.detection_task, step, detections, f"/webcam{camera_id}/video")
@@ -4,6 +4,7 @@ from typing import Any, Optional
 
 from slobot.teleop.asyncprocessing.fifo_queue import FifoQueue
 from slobot.teleop.asyncprocessing.workers.worker_base import WorkerBase
+from slobot.teleop.asyncprocessing.fake_devices import FakeFeetech
 from slobot.feetech import Feetech
 from slobot.configuration import Configuration
 
@@ -25,6 +26,8 @@ class FollowerControlWorker(WorkerBase):
         webcam_capture_queues: list[FifoQueue],
         sim_step_queue: Optional[FifoQueue],
         port: str = Feetech.PORT_FOLLOWER,
+        fake: bool = False,
+        bus_latency_ms: float = FakeFeetech.BUS_LATENCY_MS,
     ):
         """Initialize the follower control worker.
         
@@ -33,6 +36,8 @@ class FollowerControlWorker(WorkerBase):
             webcam_capture_queues: List of queues to trigger webcam capture for multiple cameras
             sim_step_queue: Queue to send qpos for simulation
             port: Serial port for the follower arm
+            fake: Simulate the follower arm tracking the control position instead of driving it
+            bus_latency_ms: Bus latency of the fake follower arm in milliseconds
         """
         # Store queues for different message types
         self.webcam_capture_queues: list[FifoQueue] = webcam_capture_queues
@@ -49,11 +54,17 @@ class FollowerControlWorker(WorkerBase):
             output_queues=all_output_queues,
         )
         self.port = port
-        self.follower: Optional[Feetech] = None
+        self.fake = fake
+        self.bus_latency_ms = bus_latency_ms
+        self.follower: Optional[Feetech | FakeFeetech] = None
 
     def setup(self):
         """Initialize the follower arm connection."""
         super().setup()
+
+        if self.fake:
+            self.follower = FakeFeetech(Feetech.FOLLOWER_ID, leader=False, bus_latency_ms=self.bus_latency_ms)
+            return
         
         # Connect to follower arm with torque enabled (it's the actuator)
         self.follower = Feetech(
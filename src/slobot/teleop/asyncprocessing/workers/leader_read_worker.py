@@ -5,6 +5,7 @@ from typing import Any, Optional
 
 from slobot.teleop.asyncprocessing.fifo_queue import FifoQueue
 from slobot.teleop.asyncprocessing.workers.worker_base import WorkerBase
+from slobot.teleop.asyncprocessing.fake_devices import FakeFeetech
 from slobot.feetech import Feetech
 from slobot.configuration import Configuration
 
@@ -23,6 +24,8 @@ class LeaderReadWorker(WorkerBase):
         input_queue: FifoQueue,
         follower_control_queue: FifoQueue,
         port: str = Feetech.PORT_LEADER,
+        fake: bool = False,
+        bus_latency_ms: float = FakeFeetech.BUS_LATENCY_MS,
     ):
         """Initialize the leader read worker.
         
@@ -30,6 +33,8 @@ class LeaderReadWorker(WorkerBase):
             input_queue: The queue to read tick messages from
             follower_control_queue: The queue to publish qpos to (typically follower_control_q)
             port: Serial port for the leader arm
+            fake: Replay a deterministic trajectory instead of reading the leader arm
+            bus_latency_ms: Bus latency of the fake leader arm in milliseconds
         """
         super().__init__(
             worker_name=self.WORKER_LEADER,
@@ -37,11 +42,17 @@ class LeaderReadWorker(WorkerBase):
             output_queues=[follower_control_queue],
         )
         self.port = port
-        self.leader: Optional[Feetech] = None
+        self.fake = fake
+        self.bus_latency_ms = bus_latency_ms
+        self.leader: Optional[Feetech | FakeFeetech] = None
 
     def setup(self):
         """Initialize the leader arm connection."""
         super().setup()
+
+        if self.fake:
+            self.leader = FakeFeetech(Feetech.LEADER_ID, leader=True, bus_latency_ms=self.bus_latency_ms)
+            return
         
         # Connect to leader arm with torque disabled (it's the input device)
         self.leader = Feetech(
@@ -0,0 +1,139 @@
+"""Base class for async teleoperator workers fusing several input queues."""
+
+import select
+from typing import Any, Optional
+
+from slobot.teleop.asyncprocessing.fifo_queue import FifoQueue
+from slobot.teleop.asyncprocessing.step_aligner import StepAligner
+from slobot.teleop.asyncprocessing.workers.worker_base import WorkerBase
+from slobot.configuration import Configuration
+
+
+class MultiInputWorkerBase(WorkerBase):
+    """Base class for workers consuming several input queues, like the follower position along with the webcam frames.
+
+    Waits on every input queue at once with epoll, then aligns the data messages by step with a StepAligner:
+    the latest step of the primary input (the first queue) is processed along with the message of each other input
+    whose step is the closest within the step tolerance. Older steps that could not be aligned are dropped as stale.
+
+    Control messages are broadcast by the cron down every branch of the pipeline, so they reach every input.
+    Only those of the primary input are handled, so that each is handled once.
+
+    The process method receives the list of aligned payloads, in the order of the input queues.
+    """
+
+    LOGGER = Configuration.logger(__name__)
+
+    def __init__(
+        self,
+        worker_name: str,
+        input_queues: list[FifoQueue],
+        input_msg_types: list[int],
+        output_queues: list[FifoQueue],
+        step_tolerance: int = 0,
+    ):
+        """Initialize a multi-input worker.
+
+        Args:
+            worker_name: The worker's name
+            input_queues: The queues to read input messages from, the first one being the primary input
+            input_msg_types: Expected data message type of each input queue
+            output_queues: List of queues to publish outputs to
+            step_tolerance: Maximum step difference between the primary message and the aligned messages of the other inputs
+        """
+        super().__init__(
+            worker_name=worker_name,
+            input_queue=None,
+            output_queues=output_queues,
+        )
+        self.input_queues = input_queues
+        self.input_msg_types = tuple(input_msg_types)
+
+        # pending data messages by step, per input: (msg_type, deadline, payload, sent_time)
+        self.step_aligner = StepAligner(len(input_queues), step_tolerance)
+
+    def run(self):
+        """Main worker loop. Waits for any input queue, then processes the latest aligned messages."""
+        self.setup()
+
+        self.LOGGER.info(f"Worker {self.worker_name} started")
+
+        epoll = select.epoll()
+        input_indexes = {}
+        for input_index, queue in enumerate(self.input_queues):
+            epoll.register(queue.fd, select.EPOLLIN)
+            input_indexes[queue.fd] = input_index
+
+        try:
+            running = True
+            while running:
+                for fd, _ in epoll.poll():
+                    if not self.receive(input_indexes[fd]):
+                        running = False
+                        break
+                else:
+                    aligned = self.pop_aligned()
+                    if aligned is not None:
+                        running = self.handle_message(*aligned)
+
+        except Exception as e:
+            self.LOGGER.error(f"Worker {self.worker_name} error: {e}")
+            raise
+        finally:
+            epoll.close()
+            self.teardown()
+            self.LOGGER.info(f"Worker {self.worker_name} stopped")
+
+    def receive(self, input_index: int) -> bool:
+        """Read the available messages of an input queue, handling the control messages and buffering the data messages.
+
+        Returns:
+            False once the worker received a poison pill and must stop, True otherwise
+        """
+        for msg_type, deadline, step, payload, sent_time in self.input_queues[input_index].poll_available():
+            if msg_type in (FifoQueue.MSG_POISON_PILL, FifoQueue.MSG_RESET, FifoQueue.MSG_RECORDING_ID, FifoQueue.MSG_DECIMATION):
+                if input_index == 0 and not self.handle_message(msg_type, deadline, step, payload, sent_time):
+                    return False
+                continue
+
+            self.step_aligner.add(input_index, step, (msg_type, deadline, payload, sent_time))
+
+        return True
+
+    def pop_aligned(self) -> Optional[tuple[tuple[int, ...], float, int, list[Any], float]]:
+        """Pop the latest aligned messages.
+
+        Returns:
+            Arguments of handle_message: (msg_types, earliest deadline, primary step, payloads, primary sent time), or None if no step is aligned yet
+        """
+        aligned = self.step_aligner.pop_aligned()
+        if aligned is None:
+            return None
+
+        step, messages = aligned
+        msg_types = tuple(msg_type for msg_type, _, _, _ in messages)
+        deadline = min(deadline for _, deadline, _, _ in messages)
+        payloads = [payload for _, _, payload, _ in messages]
+        _, _, _, sent_time = messages[0]
+        return msg_types, deadline, step, payloads, sent_time
+
+    def setup_input(self):
+        for queue in self.input_queues:
+            queue.open_read()
+
+    def teardown(self):
+        super().teardown()
+
+        for queue in self.input_queues:
+            queue.close()
+
+        if self.step_aligner.unaligned_steps > 0:
+            self.LOGGER.info(f"Worker {self.worker_name} dropped {self.step_aligner.unaligned_steps} steps that could not be aligned")
+
+    def reset(self):
+        self.step_aligner.clear()
+        super().reset()
+
+    def validate_input(self, msg_types: tuple[int, ...]):
+        if msg_types != self.input_msg_types:
+            raise ValueError(f"Input types {msg_types} for worker {self.worker_name} do not match expected types {self.input_msg_types}.")
@@ -1,6 +1,7 @@
 """Sim Step worker - runs the Genesis simulation step."""
 
-from typing import Any
+import time
+from typing import Any, Optional
 
 import torch
 import av
@@ -10,15 +11,8 @@ from slobot.teleop.asyncprocessing.workers.worker_base import WorkerBase
 from slobot.configuration import Configuration
 from slobot.feetech import Feetech
 from slobot.so_arm_100 import SoArm100
-from slobot.video_streams import VideoStreams
-
-from enum import Enum
-
-class RenderMode(Enum):
-    RGB = "rgb"
-    DEPTH = "depth"
-    SEGMENTATION = "segmentation"
-    NORMAL = "normal"
+from slobot.depth_colorizer import DepthColorizer
+from slobot.teleop.asyncprocessing.render_schedule import RenderMode, RenderSchedule
 
 
 class SimStepWorker(WorkerBase):
@@ -26,6 +20,8 @@ class SimStepWorker(WorkerBase):
     
     Receives qpos arrays and runs a simulation step with that control input.
     Publishes the resulting qpos and RGB render to metrics.
+    When decimated by the cron, the physics still steps every tick, but the camera only renders every N-th step.
+    The passes due at a step, according to the render schedule, are rendered together by a single camera render, whose render time is published.
     """
     
     LOGGER = Configuration.logger(__name__)
@@ -38,6 +34,8 @@ class SimStepWorker(WorkerBase):
         vis_mode: str,
         width: int,
         height: int,
+        depth_range: Optional[tuple[float, float]] = None,
+        render_schedule: Optional[RenderSchedule] = None,
     ):
         """Initialize the sim step worker.
         
@@ -48,6 +46,8 @@ class SimStepWorker(WorkerBase):
             vis_mode: Visualization mode
             width: Width of the sim RGB image
             height: Height of the sim RGB image
+            depth_range: Fixed (near, far) range of the depth colormap, the range of each frame if None
+            render_schedule: The render passes to render and their decimations, every pass at every step if None
         """
         super().__init__(
             worker_name=WorkerBase.WORKER_SIM,
@@ -59,6 +59,10 @@ class SimStepWorker(WorkerBase):
         self.vis_mode = vis_mode
         self.width = width
         self.height = height
+        self.render_schedule = render_schedule or RenderSchedule.all_passes()
+        self.due_passes = self.render_schedule.enabled_passes()
+        self.depth_colorizer = DepthColorizer(depth_range)
+        self.depth_rgb = None  # reused across steps, the video frame copies it
 
     def setup(self):
         """Initialize the Genesis simulation."""
@@ -67,11 +71,19 @@ class SimStepWorker(WorkerBase):
         # Feetech instance for pos (motor steps) to qpos (radians) conversion
         self.feetech = Feetech(connect=False, qpos_map=Configuration.MJCF_QPOS_MAP)
 
-        for render_mode in RenderMode:
-            self.rerun_metrics.add_video_stream(self.metric_name(render_mode), self.fps)
+        enabled_passes = self.render_schedule.enabled_passes()
+        for render_mode in enabled_passes:
+            self.rerun_metrics.add_video_stream(self.render_mode_metric_name(render_mode), self.fps)
 
         res = (self.width, self.height)
-        self.arm = SoArm100(show_viewer=False, fps=self.fps, substeps=self.substeps, rgb=True, depth=True, segmentation=True, normal=True, res=res, vis_mode=self.vis_mode)
+        self.arm = SoArm100(
+            show_viewer=False, fps=self.fps, substeps=self.substeps,
+            rgb=RenderMode.RGB in enabled_passes,
+            depth=RenderMode.DEPTH in enabled_passes,
+            segmentation=RenderMode.SEGMENTATION in enabled_passes,
+            normal=RenderMode.NORMAL in enabled_passes,
+            res=res, vis_mode=self.vis_mode,
+        )
         
         self.LOGGER.info(f"Genesis simulation started with {self.fps} FPS, {self.substeps} substeps, {self.width}x{self.height} resolution, and {self.vis_mode} visualization mode")
 
@@ -84,6 +96,11 @@ class SimStepWorker(WorkerBase):
         
         super().teardown()
 
+    def should_process(self, step: int) -> bool:
+        # skipping physics steps would break the simulation dynamics, shed the rendering only
+        self.due_passes = self.render_schedule.due_passes(step, self.decimation)
+        return True
+
     def process(self, control_pos: list[int]) -> tuple[int, Any]:
         """Run a simulation step with the given control input.
         
@@ -91,7 +108,7 @@ class SimStepWorker(WorkerBase):
             control_pos: Motor positions in steps (from MSG_POS)
         
         Returns:
-            Tuple of (MSG_QPOS_RENDER_FORCE, (qpos, rgb, ...)) - the simulated qpos and RGB image
+            Tuple of (MSG_QPOS_RENDER_FORCE, (qpos, images, render_time_ms, control_force)) - the simulated qpos and the images of the due render passes
         """
         # Convert motor steps to qpos (radians) for Genesis
         control_qpos = self.feetech.pos_to_qpos(control_pos)
@@ -109,30 +126,55 @@ class SimStepWorker(WorkerBase):
         control_force = self.arm.genesis.entity.get_dofs_control_force()
         control_force = control_force[0].tolist()
         
-        # Render the camera
-        rgb, depth, segmentation, normal = self.arm.genesis.side_camera.render(rgb=True, depth=True, segmentation=True, colorize_seg=True, normal=True)
-        
-        return FifoQueue.MSG_QPOS_RENDER_FORCE, (qpos, rgb, depth, segmentation, normal, control_force)
+        # Render the due passes of the camera, the scene being rasterized once for all of them
+        images = {}
+        render_time_ms = None
+        if self.due_passes:
+            start_time = time.perf_counter()
+            images = self.render_passes(self.due_passes)
+            render_time_ms = (time.perf_counter() - start_time) * 1000
+
+        return FifoQueue.MSG_QPOS_RENDER_FORCE, (qpos, images, render_time_ms, control_force)
+
+    def render_passes(self, render_modes: list[RenderMode]) -> dict[RenderMode, Any]:
+        rgb, depth, segmentation, normal = self.arm.genesis.side_camera.render(
+            rgb=RenderMode.RGB in render_modes,
+            depth=RenderMode.DEPTH in render_modes,
+            segmentation=RenderMode.SEGMENTATION in render_modes,
+            colorize_seg=True,
+            normal=RenderMode.NORMAL in render_modes,
+        )
+
+        images = {
+            RenderMode.RGB: rgb,
+            RenderMode.DEPTH: depth,
+            RenderMode.SEGMENTATION: segmentation,
+            RenderMode.NORMAL: normal,
+        }
+        return {render_mode: images[render_mode] for render_mode in render_modes}
 
     def publish_data(self, step: int, result_payload: Any):
-        qpos, rgb, depth, segmentation, normal, control_force = result_payload
+        qpos, images, render_time_ms, control_force = result_payload
 
         self.rerun_metrics.log_qpos(step, self.worker_name, qpos)
         self.rerun_metrics.log_control_force(step, self.worker_name, control_force)
 
-        self.log_rgb(step, rgb, RenderMode.RGB)
-
-        depth = VideoStreams.logarithmic_depth_to_rgb(depth)
-        self.log_rgb(step, depth, RenderMode.DEPTH)
+        if render_time_ms is not None:
+            # one series per combination of passes, e.g. rgb+depth, as the passes share the render
+            render_passes = "+".join(render_mode.value for render_mode in images)
+            self.rerun_metrics.log_render_time(step, self.worker_name, render_passes, render_time_ms)
 
-        self.log_rgb(step, segmentation, RenderMode.SEGMENTATION)
+        for render_mode, image in images.items():
+            if render_mode == RenderMode.DEPTH:
+                self.depth_rgb = self.depth_colorizer.colorize(image, self.depth_rgb)
+                image = self.depth_rgb
 
-        self.log_rgb(step, normal, RenderMode.NORMAL)
+            self.log_rgb(step, image, render_mode)
 
     def publish_recording_id(self, recording_id: str):
         super().publish_recording_id(recording_id)
-        for render_mode in RenderMode:
-            self.rerun_metrics.add_video_stream(f"/{self.worker_name}/{render_mode.value}/video")
+        for render_mode in self.render_schedule.enabled_passes():
+            self.rerun_metrics.add_video_stream(self.render_mode_metric_name(render_mode))
 
     def log_rgb(self, step: int, rgb: Any, render_mode: RenderMode):
         # transcode image into a video stream to reduce disk space
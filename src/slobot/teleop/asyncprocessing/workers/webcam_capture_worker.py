@@ -2,6 +2,7 @@
 
 from typing import Any, Optional
 import enum
+import time
 
 import cv2
 import av
@@ -12,6 +13,10 @@ from slobot.teleop.asyncprocessing.fifo_queue import FifoQueue
 from slobot.teleop.asyncprocessing.workers.worker_base import WorkerBase
 from slobot.configuration import Configuration
 from slobot.teleop.asyncprocessing.shared_memory_block import SharedMemoryBlock
+from slobot.teleop.asyncprocessing.multi_slot_shared_memory_block import MultiSlotSharedMemoryBlock
+from slobot.teleop.asyncprocessing.fake_devices import FakeVideoCapture
+from slobot.teleop.asyncprocessing.frame_grabber import FrameGrabber
+from slobot.teleop.asyncprocessing.preview_sampler import PreviewSampler
 
 
 class DetectionTask(enum.Enum):
@@ -29,6 +34,11 @@ class WebcamCaptureWorker(WorkerBase):
     Receives empty tick messages and captures a frame from the webcam.
     Publishes the RGB image to metrics.
     Writes frame to Shared Memory for decoupled detection.
+
+    In continuous grab mode, a background thread reads the webcam in a loop, and a tick takes the most recent frame
+    without waiting for the driver. The age of the frame at tick time is published as a metric.
+
+    The preview image can be rate-limited and downscaled, while the video stream keeps every frame at full resolution.
     """
     
     LOGGER = Configuration.logger(__name__)
@@ -42,6 +52,11 @@ class WebcamCaptureWorker(WorkerBase):
         height: int,
         fps: int,
         detect_objects_queue: Optional[FifoQueue] = None,
+        fake: bool = False,
+        continuous_grab: bool = False,
+        preview_rate: Optional[float] = None,
+        preview_downscale: int = 1,
+        reader_hold_time: float = MultiSlotSharedMemoryBlock.READER_HOLD_TIME,
     ):
         """Initialize the webcam capture worker.
         
@@ -53,6 +68,11 @@ class WebcamCaptureWorker(WorkerBase):
             height: Height of the webcam image
             fps: Height of the webcam image
             detect_objects_queue: Optional queue to signal detection worker
+            fake: Emit synthetic frames instead of opening the webcam
+            continuous_grab: Read the webcam in a background thread, ticks taking the most recent frame
+            preview_rate: Maximum number of preview images per second, a preview of every frame if None
+            preview_downscale: Factor dividing the width and the height of the preview image
+            reader_hold_time: Time in seconds the detection worker holds a shared memory slot, which sizes the slot ring
         """
         super().__init__(
             worker_name=worker_name,
@@ -64,9 +84,15 @@ class WebcamCaptureWorker(WorkerBase):
         self.height = height
         self.fps = fps
         self.detect_objects_queue = detect_objects_queue
-        self.cap: Optional[cv2.VideoCapture] = None
+        self.fake = fake
+        self.continuous_grab = continuous_grab
+        self.cap: Optional[cv2.VideoCapture | FakeVideoCapture] = None
+        self.frame_grabber: Optional[FrameGrabber] = None
+        self.frame_age_ms: Optional[float] = None
+        self.preview_sampler = PreviewSampler(preview_rate, preview_downscale)
+        self.reader_hold_time = reader_hold_time
         self.model: Optional[YOLO] = None
-        self.shm_block: Optional[SharedMemoryBlock] = None
+        self.shm_block: Optional[MultiSlotSharedMemoryBlock] = None
 
     def setup(self):
         """Initialize the webcam capture."""
@@ -77,7 +103,7 @@ class WebcamCaptureWorker(WorkerBase):
         self.rerun_metrics.add_video_stream(self.metric_name(), self.fps)
 
         # Open the webcam
-        self.cap = cv2.VideoCapture(self.camera_id)
+        self.cap = FakeVideoCapture(self.width, self.height, self.fps) if self.fake else cv2.VideoCapture(self.camera_id)
         
         if not self.cap.isOpened():
             raise RuntimeError(f"Failed to open camera {self.camera_id}")
@@ -98,13 +124,15 @@ class WebcamCaptureWorker(WorkerBase):
         actual_fps = int(self.cap.get(cv2.CAP_PROP_FPS))
         self.LOGGER.info(f"Webcam {self.camera_id} opened with resolution {actual_width}x{actual_height} @ {actual_fps} FPS")
 
-        if self.detect_objects_queue:
-             # Calculate size: W x H x C (BGR) + header
-             size = SharedMemoryBlock.HEADER_SIZE + self.width * self.height * SharedMemoryBlock.CHANNELS
+        if self.continuous_grab:
+            self.frame_grabber = FrameGrabber(self.cap, f"{self.worker_name}_grab")
+            self.frame_grabber.start()
 
+        if self.detect_objects_queue:
              # Use centralized naming convention
              shm_name = SharedMemoryBlock.get_name_from_camera_id(self.camera_id)
-             self.shm_block = SharedMemoryBlock.create(shm_name, size)
+             slots = MultiSlotSharedMemoryBlock.slots_for(self.fps, self.reader_hold_time)
+             self.shm_block = MultiSlotSharedMemoryBlock.create(shm_name, self.width, self.height, slots)
 
     def reset(self):
         '''Reset the video stream.'''
@@ -114,6 +142,9 @@ class WebcamCaptureWorker(WorkerBase):
 
     def teardown(self):
         """Release the webcam."""
+        if self.frame_grabber is not None:
+            self.frame_grabber.stop()
+
         self.cap.release()
 
         self.rerun_metrics.close_container()
@@ -124,13 +155,39 @@ class WebcamCaptureWorker(WorkerBase):
 
         super().teardown()
 
-    def _write_frame_to_shm(self, frame: np.ndarray):
-        """Write frame to shared memory and signal detection worker."""
-        if not self.shm_block.write_frame(frame):
-            return
+    def _read_frame_to_shm(self) -> np.ndarray:
+        """Read the webcam frame straight into a shared memory slot."""
+        slot = self.shm_block.acquire_write_slot()
+        slot_frame = self.shm_block.slot_frame(slot)
+        try:
+            frame = self._read_frame(slot_frame)
+            if frame.ctypes.data != slot_frame.ctypes.data:
+                # the driver returned a new buffer, e.g. the actual resolution differs from the requested one
+                if frame.shape != slot_frame.shape:
+                    raise RuntimeError(f"Webcam frame shape {frame.shape} does not match shared memory shape {slot_frame.shape}")
+                np.copyto(slot_frame, frame)
+                frame = slot_frame
+        except Exception:
+            self.shm_block.abort_write(slot)
+            raise
+
+        self.shm_block.commit_write(slot)
+
+        return frame
+
+    def _read_frame(self, frame: Optional[np.ndarray] = None) -> np.ndarray:
+        if self.frame_grabber is not None:
+            tick_time = time.time()
+            frame, capture_time = self.frame_grabber.read_latest(frame)
+            self.frame_age_ms = (tick_time - capture_time) * 1000
+            return frame
+
+        ret, frame = self.cap.read(frame)
 
-        # Signal detection worker
-        self.detect_objects_queue.write(FifoQueue.MSG_OBJECT_DETECTION, b'', 0.0, 0)
+        if not ret:
+            raise RuntimeError("Failed to capture frame from webcam")
+
+        return frame
 
     def process(self, payload: Any) -> tuple[int, Any]:
         """Capture a frame from the webcam.
@@ -142,36 +199,47 @@ class WebcamCaptureWorker(WorkerBase):
         Returns:
             Tuple of (MSG_RGB, rgb_payload)
         """
-        # Capture frame
-        ret, frame = self.cap.read()
-        
-        if not ret:
-            raise RuntimeError("Failed to capture frame from webcam")
-
-        # Write to shared memory
+        # Capture frame, directly into shared memory if detection is enabled
         if self.detect_objects_queue:
-            self._write_frame_to_shm(frame)
+            frame = self._read_frame_to_shm()
+        else:
+            frame = self._read_frame()
 
         return FifoQueue.MSG_BGR, frame
 
     def publish_outputs(self, msg_type: int, result_payload: Any, deadline: float, step: int):
-        # Trigger detect objects
+        # Signal the detection worker that the frame of this step is ready in shared memory
         if self.detect_objects_queue:
-            self.detect_objects_queue.write(FifoQueue.MSG_EMPTY, None, deadline, step)
+            self.detect_objects_queue.write(FifoQueue.MSG_OBJECT_DETECTION, None, deadline, step)
 
     def publish_recording_id(self, recording_id: str):
         super().publish_recording_id(recording_id)
         self.rerun_metrics.add_video_stream(self.metric_name())
 
+    def start_traffic_capture(self, recording_id: str):
+        super().start_traffic_capture(recording_id)
+        if self.shm_block:
+            self.shm_block.recorder = self.traffic_recorder
+
+    def stop_traffic_capture(self):
+        if self.shm_block:
+            self.shm_block.recorder = None
+        super().stop_traffic_capture()
+
     def publish_data(self, step: int, bgr: Any):
         # convert BGR to RGB
         rgb = cv2.cvtColor(bgr, cv2.COLOR_BGR2RGB)
 
         self.log_rgb(step, rgb)
 
+        if self.frame_age_ms is not None:
+            self.rerun_metrics.log_frame_age(step, self.worker_name, self.frame_age_ms)
+
     def log_rgb(self, step: int, rgb: Any):
-        # this frame is only for preview, it will be updated at every step
-        self.rerun_metrics.log_raw_frame(step, f"/{self.worker_name}/preview", rgb)
+        # this frame is only for preview, it is overwritten by the next preview
+        preview = self.preview_sampler.sample(rgb)
+        if preview is not None:
+            self.rerun_metrics.log_raw_frame(step, f"/{self.worker_name}/preview", preview)
 
         # transcode image into a video stream to reduce disk space
         frame = av.VideoFrame.from_ndarray(rgb, format="rgb24")
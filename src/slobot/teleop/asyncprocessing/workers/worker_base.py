@@ -6,6 +6,8 @@ from abc import ABC, abstractmethod
 from typing import Any, Optional
 
 from slobot.teleop.asyncprocessing.fifo_queue import FifoQueue
+from slobot.teleop.asyncprocessing.step_tracer import StepTracer
+from slobot.teleop.asyncprocessing.traffic_log import TrafficRecorder
 from slobot.configuration import Configuration
 from slobot.metrics.rerun_metrics import RerunMetrics, OperationMode
 
@@ -21,6 +23,9 @@ class WorkerBase(ABC):
 
     # Operation mode for Rerun.io
     OPERATION_MODE = OperationMode.SPAWN # use SAVE to save the worker metrics to file
+
+    # Number of processed steps summarized in each load report sent to the cron
+    LOAD_REPORT_STEPS = 30
     
     # Worker IDs for metrics
     WORKER_CRON = "cron"
@@ -30,6 +35,7 @@ class WorkerBase(ABC):
     WORKER_KINEMATICS = "kinematics"
     WORKER_WEBCAM = "webcam"  # Base pattern for dynamic webcam workers (webcam1, webcam2, etc.)
     WORKER_DETECT_OBJECTS = "detect_objects"
+    WORKER_DETECTION_SERVER = "detection_server"
 
     WORKER_NAMES = {
         WORKER_CRON: WORKER_CRON,
@@ -39,6 +45,7 @@ class WorkerBase(ABC):
         WORKER_KINEMATICS: WORKER_KINEMATICS,
         WORKER_WEBCAM: WORKER_WEBCAM,
         WORKER_DETECT_OBJECTS: WORKER_DETECT_OBJECTS,
+        WORKER_DETECTION_SERVER: WORKER_DETECTION_SERVER,
     }
 
     WORKER_INPUT_MSG_TYPE = {
@@ -49,6 +56,7 @@ class WorkerBase(ABC):
         WORKER_KINEMATICS: FifoQueue.MSG_POS,
         WORKER_WEBCAM: FifoQueue.MSG_EMPTY,
         WORKER_DETECT_OBJECTS: FifoQueue.MSG_OBJECT_DETECTION,
+        WORKER_DETECTION_SERVER: FifoQueue.MSG_OBJECT_DETECTION,
     }
 
     WORKER_OUTPUT_MSG_TYPE = {
@@ -59,6 +67,7 @@ class WorkerBase(ABC):
         WORKER_KINEMATICS: FifoQueue.MSG_QPOS_QPOS_RGB,
         WORKER_WEBCAM: FifoQueue.MSG_BGR,
         WORKER_DETECT_OBJECTS: FifoQueue.MSG_EMPTY,
+        WORKER_DETECTION_SERVER: FifoQueue.MSG_EMPTY,
     }
 
     # Worker prefixes for dynamic worker name matching
@@ -85,6 +94,22 @@ class WorkerBase(ABC):
         self.LOGGER.info(f"Output queues for {self.worker_name}: {output_queue_names}")
 
         self.rerun_metrics = None
+        self.step_tracer: Optional[StepTracer] = None
+
+        # Record the per-step timestamps to /tmp/slobot/trace, see StepTraceReport
+        self.trace_steps = False
+
+        # Capture the written messages to /tmp/slobot/traffic, see TrafficReplay
+        self.capture_traffic = False
+        self.encoder_profile = None  # encoder settings of the video streams, the libx264 defaults if None
+        self.encoder_queue_size = None  # frames waiting to be encoded per video stream, RerunMetrics.ENCODER_QUEUE_SIZE if None
+        self.drop_policy = None  # frame dropped when a video stream's queue is full, DROP_OLDEST if None
+        self.traffic_recorder: Optional[TrafficRecorder] = None
+
+        # Load shedding: only process every decimation-th step, as decided by the cron
+        self.decimation = 1
+        self.load_report_queue = FifoQueue(FifoQueue.QUEUE_LOAD_REPORT)
+        self.reset_load()
 
         process_pid = os.getpid()
         self.LOGGER.info(f"Worker {self.worker_name} started with PID {process_pid}")
@@ -103,46 +128,8 @@ class WorkerBase(ABC):
                     continue
                 
                 msg_type, deadline, step, payload = result
-                start_time = time.time()
-
-                # Check for poison pill
-                match msg_type:
-                    case FifoQueue.MSG_POISON_PILL:
-                        self.publish_poison_pill()
-                        break
-                    case FifoQueue.MSG_RESET:
-                        self.reset()
-                        continue
-                    case FifoQueue.MSG_RECORDING_ID:
-                        recording_id = payload
-                        self.publish_recording_id(recording_id)
-                        continue
-
-                # Validate the message
-                self.validate_input(msg_type)
-
-                # Process the message
-                result_type, result_payload = self.process(payload)
-
-                # Validate the result
-                self.validate_output(result_type)
-
-                end_time = time.time()
-                latency_ms = (end_time - start_time) * 1000
-
-                # Check deadline
-                if end_time > deadline:
-                    delay = (end_time - deadline) * 1000
-                    self.LOGGER.debug(f"Worker {self.worker_name} exceeded the deadline by {delay} ms at step {step}. Latency was {latency_ms} ms.")
-                
-                # Publish outputs with same deadline (time remaining decreases as we progress) and step
-                self.publish_outputs(result_type, result_payload, deadline, step)
-
-                # Publish data
-                self.publish_data(step, result_payload)
-
-                # Publish metrics
-                self.publish_metrics(step, latency_ms)
+                if not self.handle_message(msg_type, deadline, step, payload, self.input_queue.last_sent_time):
+                    break
                 
         except Exception as e:
             self.LOGGER.error(f"Worker {self.worker_name} error: {e}")
@@ -151,6 +138,74 @@ class WorkerBase(ABC):
             self.teardown()
             self.LOGGER.info(f"Worker {self.worker_name} stopped")
 
+    def handle_message(self, msg_type: int, deadline: float, step: int, payload: Any, sent_time: Optional[float]) -> bool:
+        """Handle an input message: control messages, or processing then publishing.
+
+        Args:
+            msg_type: The message type
+            deadline: The deadline by which downstream processing must complete
+            step: The step number
+            payload: The deserialized payload
+            sent_time: The time at which the message was written to the input queue
+
+        Returns:
+            False once the worker received a poison pill and must stop, True otherwise
+        """
+        receive_time = time.time()
+
+        # Check for poison pill
+        match msg_type:
+            case FifoQueue.MSG_POISON_PILL:
+                self.publish_poison_pill()
+                return False
+            case FifoQueue.MSG_RESET:
+                self.reset()
+                return True
+            case FifoQueue.MSG_RECORDING_ID:
+                recording_id = payload
+                self.publish_recording_id(recording_id)
+                return True
+            case FifoQueue.MSG_DECIMATION:
+                worker_name, decimation = payload
+                self.publish_decimation(worker_name, decimation)
+                return True
+
+        # Validate the message
+        self.validate_input(msg_type)
+
+        # Shed the load
+        if not self.should_process(step):
+            return True
+
+        # Process the message
+        start_time = time.time()
+        result_type, result_payload = self.process(payload)
+
+        # Validate the result
+        self.validate_output(result_type)
+
+        end_time = time.time()
+        latency_ms = (end_time - start_time) * 1000
+
+        # Check deadline
+        if end_time > deadline:
+            delay = (end_time - deadline) * 1000
+            self.LOGGER.debug(f"Worker {self.worker_name} exceeded the deadline by {delay} ms at step {step}. Latency was {latency_ms} ms.")
+        self.record_load(step, latency_ms, (end_time - deadline) * 1000)
+
+        # Publish outputs with same deadline (time remaining decreases as we progress) and step
+        self.publish_outputs(result_type, result_payload, deadline, step)
+        publish_time = time.time()
+
+        # Publish data
+        self.publish_data(step, result_payload)
+
+        # Publish metrics
+        self.publish_metrics(step, latency_ms)
+        self.publish_trace(step, sent_time, receive_time, start_time, end_time, publish_time)
+
+        return True
+
     def setup(self):
         """Called once before the main loop. Override to initialize resources."""
         self.setup_input()
@@ -166,15 +221,33 @@ class WorkerBase(ABC):
             queue.open_write()
 
     def setup_metrics(self):
-        self.rerun_metrics = RerunMetrics(operation_mode=WorkerBase.OPERATION_MODE, worker_name=self.worker_name)
+        self.rerun_metrics = RerunMetrics(
+            operation_mode=WorkerBase.OPERATION_MODE,
+            worker_name=self.worker_name,
+            encoder_profile=self.encoder_profile,
+            encoder_queue_size=self.encoder_queue_size,
+            drop_policy=self.drop_policy,
+        )
 
     def teardown(self):
         """Called once after the main loop. Override to cleanup resources."""
-        self.input_queue.close()
+        if self.step_tracer is not None:
+            self.step_tracer.flush()
+
+        if self.rerun_metrics is not None:
+            self.rerun_metrics.flush_scalars()
+
+        self.stop_traffic_capture()
+
+        if self.input_queue is not None:
+            self.input_queue.close()
         
         for queue in self.output_queues:
             queue.close()
 
+        if self.load_report_queue.fd is not None:
+            self.load_report_queue.close()
+
     @abstractmethod
     def process(self, payload: Any) -> tuple[int, Any]:
         """Process an input message and return the output.
@@ -225,9 +298,72 @@ class WorkerBase(ABC):
     def publish_recording_id(self, recording_id: str):
         self.rerun_metrics.init_rerun(recording_id)
 
+        if self.step_tracer is not None:
+            self.step_tracer.flush()
+        if self.trace_steps:
+            self.step_tracer = StepTracer(self.worker_name, recording_id)
+
+        self.stop_traffic_capture()
+        if self.capture_traffic:
+            self.start_traffic_capture(recording_id)
+
         for queue in self.output_queues:
             queue.send_recording_id(recording_id)
 
+    def start_traffic_capture(self, recording_id: str):
+        """Record the messages written to the output queues. Override to also record the shared memory frames."""
+        self.traffic_recorder = TrafficRecorder(self.worker_name, recording_id)
+        for queue in self.output_queues:
+            queue.recorder = self.traffic_recorder
+
+    def stop_traffic_capture(self):
+        if self.traffic_recorder is None:
+            return
+
+        for queue in self.output_queues:
+            queue.recorder = None
+        self.traffic_recorder.close()
+        self.traffic_recorder = None
+
+    def publish_decimation(self, worker_name: str, decimation: int):
+        """Apply the decimation if it targets this worker, and forward it to the downstream workers."""
+        if worker_name == self.worker_name:
+            self.LOGGER.info(f"Worker {self.worker_name} now processes every {decimation} steps")
+            self.decimation = decimation
+
+        for queue in self.output_queues:
+            queue.send_decimation(worker_name, decimation)
+
+    def should_process(self, step: int) -> bool:
+        """Whether the step is processed or shed. Override to shed only part of the processing."""
+        return step % self.decimation == 0
+
+    def reset_load(self):
+        self.load_steps = 0
+        self.load_overruns = 0
+        self.load_latency_ms = 0.0
+        self.load_max_lateness_ms = float('-inf')
+
+    def record_load(self, step: int, latency_ms: float, lateness_ms: float):
+        """Accumulate the overrun statistics, and report them to the cron once the window is complete.
+
+        Args:
+            step: The step number
+            latency_ms: Processing latency in milliseconds
+            lateness_ms: Time past the deadline in milliseconds, negative if the deadline was met
+        """
+        self.load_steps += 1
+        if lateness_ms > 0:
+            self.load_overruns += 1
+        self.load_latency_ms += latency_ms
+        self.load_max_lateness_ms = max(self.load_max_lateness_ms, lateness_ms)
+
+        if self.load_steps >= self.LOAD_REPORT_STEPS:
+            load_report = (self.worker_name, self.load_steps, self.load_overruns, self.load_latency_ms / self.load_steps, self.load_max_lateness_ms)
+            # dropped if the cron is not reading, the worker must never block on it
+            self.load_report_queue.try_write(FifoQueue.MSG_LOAD_REPORT, load_report, 0.0, step)
+            self.reset_load()
+
     def publish_metrics(self, step: int, latency_ms: float):
         """Publish metrics to Rerun.io.
         
@@ -237,6 +373,14 @@ class WorkerBase(ABC):
         """
         self.rerun_metrics.log_latency(step, self.worker_name, latency_ms)
 
+    def publish_trace(self, step: int, sent_time: Optional[float], receive_time: float, start_time: float, end_time: float, publish_time: float):
+        """Record the step timestamps, and publish the time spent in the input queue to Rerun.io."""
+        if sent_time is not None:
+            self.rerun_metrics.log_queue_delay(step, self.worker_name, (receive_time - sent_time) * 1000)
+
+        if self.step_tracer is not None:
+            self.step_tracer.record(step, sent_time, receive_time, start_time, end_time, publish_time)
+
     def validate_input(self, msg_type: int):
         expected_msg_type = self._get_expected_input_msg_type()
         if msg_type != expected_msg_type:
@@ -2,15 +2,14 @@ import time
 import os
 import threading
 import queue
-import numpy as np
-import matplotlib.pyplot as plt
 import torch
 
 from slobot.configuration import Configuration
-from slobot.so_arm_100 import SoArm100
-from slobot.simulation_frame import SimulationFrame
+from slobot.simulation_frame import SimulationFrame, SimulationFrameBatch
 from slobot.simulation_frame_paths import SimulationFramePaths
 from slobot.video_writer import VideoWriter
+from slobot.segment_encoder_pool import SegmentEncoderPool
+from slobot.depth_colorizer import DepthColorizer
 
 
 class VideoStreams:
@@ -23,10 +22,13 @@ class VideoStreams:
         self.video_segment_queue = queue.Queue()
 
         self.codec = VideoStreams.codec()
+        self.encoder_profile = kwargs.get('encoder_profile')
 
-    def frame_filenames(self, res, fps, segment_duration, rgb=True, depth=False, segmentation=False, normal=False):
+        self.depth_colorizer = DepthColorizer()
+
+    def frame_filenames(self, res, fps, segment_duration, rgb=True, depth=False, segmentation=False, normal=False, n_envs=1):
         # run simulation in a separate thread
-        thread = threading.Thread(target=self.run_simulation, args=(res, fps, segment_duration, rgb, depth, segmentation, normal))
+        thread = threading.Thread(target=self.run_simulation, args=(res, fps, segment_duration, rgb, depth, segmentation, normal, n_envs))
         thread.start()
 
         while True:
@@ -38,12 +40,15 @@ class VideoStreams:
 
         thread.join()
 
-    def run_simulation(self, res, fps, segment_duration, rgb=True, depth=False, segmentation=False, normal=False):
+    def run_simulation(self, res, fps, segment_duration, rgb=True, depth=False, segmentation=False, normal=False, n_envs=1):
+        from slobot.so_arm_100 import SoArm100
+
         cam_id = 0
-        env_id = 0
-        self.start(cam_id, [env_id], res, fps, segment_duration, rgb=rgb, depth=depth, segmentation=segmentation, normal=normal)
+        env_ids = list(range(n_envs))
+        self.start(cam_id, env_ids, res, fps, segment_duration, rgb=rgb, depth=depth, segmentation=segmentation, normal=normal)
 
-        arm = SoArm100(step_handler=self, res=res, fps=fps, show_viewer=False, rgb=rgb, depth=depth, segmentation=segmentation, normal=normal)
+        # with several environments, the arm captures a SimulationFrameBatch of every environment at each step
+        arm = SoArm100(step_handler=self, res=res, fps=fps, show_viewer=False, rgb=rgb, depth=depth, segmentation=segmentation, normal=normal, n_envs=n_envs, batch_frames=n_envs > 1)
         arm.elemental_rotations()
 
         self.stop()
@@ -68,88 +73,78 @@ class VideoStreams:
         self.res = res
         self.fps = fps
 
-        self.period = 1.0 / self.fps
         self.segment_id = 0
 
         self.frame_enabled = [rgb, depth, segmentation, normal]
 
-        self.video_timestamp = time.time()
-        self.current_frame = None
-
         self.segment_duration = segment_duration
 
-        self.simulation_frames = []
-
-    def handle_step(self, simulation_frame: SimulationFrame):
-        if simulation_frame.depth is not None:
-           simulation_frame.depth = VideoStreams.logarithmic_depth_to_rgb(simulation_frame.depth)
-
-        self.simulation_frames.append(simulation_frame)
-
-        if self.video_timestamp + self.segment_duration <= simulation_frame.timestamp:
-            self.do_transcode(self.simulation_frames)
-
-    def do_transcode(self, simulation_frames):
-        if len(simulation_frames) == 0:
-            return
-
-        simulation_frame_paths = self.transcode_frames(simulation_frames)
-        self.video_segment_queue.put(simulation_frame_paths)
-
-    def transcode_frames(self, simulation_frames) -> SimulationFramePaths:
+        # one long-lived encoder per env and enabled frame type, the frames are encoded as they arrive instead of being buffered per segment
+        self.stream_ids = [
+            (env_id, frame_id)
+            for env_id in self.env_ids
+            for frame_id in range(len(self.FRAME_TYPES))
+            if self.frame_enabled[frame_id]
+        ]
+        video_writers = {
+            stream_id: VideoWriter(self.res, self.fps, codec=self.codec, encoder_profile=self.encoder_profile)
+            for stream_id in self.stream_ids
+        }
+        # the streams encode concurrently, the segments are published in order
+        self.encoder_pool = SegmentEncoderPool(video_writers, self.video_segment_queue.put)
+        self.segment_paths = None
+
+    def handle_step(self, simulation_frame: SimulationFrame | SimulationFrameBatch):
+        if simulation_frame.side_camera_frame.depth is not None:
+           simulation_frame.side_camera_frame.depth = self.depth_colorizer.colorize(simulation_frame.side_camera_frame.depth)
+
+        if self.segment_paths is not None and self.segment_first_frame.timestamp + self.segment_duration <= simulation_frame.timestamp:
+            self.close_segment()
+
+        if self.segment_paths is None:
+            self.open_segment(simulation_frame)
+
+        # encode the frame at its simulation timestamp, slow steps lengthen the frame instead of repeating it
+        self.write_frame(simulation_frame)
+
+    def open_segment(self, simulation_frame: SimulationFrame | SimulationFrameBatch):
         VideoStreams.LOGGER.info(f"Transcoding video segment {self.segment_id}")
         date_time = time.strftime('%Y%m%d_%H%M%S')
 
-        if self.current_frame is None:
-            self.current_frame = simulation_frames[0]
-
-        first_timestamp = simulation_frames[0].timestamp
-
-        video_frames = []
-        for simulation_frame in simulation_frames:
-            while self.video_timestamp + self.period < simulation_frame.timestamp:
-                video_frames.append(self.current_frame)
-                self.video_timestamp += self.period
-
-            # TODO last frame of the simulation will be dropped
-            self.current_frame = simulation_frame
-
-        simulation_frames.clear()
-
-        simulation_frame_videos = []
-        for env_id in self.env_ids:
-            env_simulation_frame_videos = []
-            for frame_id in range(len(self.FRAME_TYPES)):
-                if not self.frame_enabled[frame_id]:
-                    next
-
-                filename = self._filename(self.cam_id, env_id, self.FRAME_TYPES[frame_id], date_time, self.segment_id)
-
-                video_writer = VideoWriter(self.res, self.fps, codec=self.codec)
-                type_frames = [
-                    simulation_frame.frame(frame_id)
-                    for simulation_frame in video_frames
-                ]
-                if len(self.env_ids) > 1:
-                    type_frames = [
-                        env_frame[env_id]
-                        for env_frame in type_frames
-                    ]
-                type_frames = np.array(type_frames)
-                video_writer.transcode_numpy(type_frames, filename)
+        self.segment_first_frame = simulation_frame
+
+        filenames = {}
+        self.segment_paths = [[] for _ in self.env_ids]
+        for env_id, frame_id in self.stream_ids:
+            filename = self._filename(self.cam_id, env_id, self.FRAME_TYPES[frame_id], date_time, self.segment_id)
+            filenames[(env_id, frame_id)] = filename
+            self.segment_paths[self.env_ids.index(env_id)].append(filename)
+        self.encoder_pool.open_segment(filenames)
+
+    def write_frame(self, simulation_frame: SimulationFrame | SimulationFrameBatch):
+        frames = {}
+        for env_id, frame_id in self.stream_ids:
+            frame = simulation_frame.frame(frame_id)
+            if isinstance(simulation_frame, SimulationFrameBatch):
+                # a view of the environment image in the (n_envs, H, W, 3) batch
+                frame = frame[env_id]
+            frames[(env_id, frame_id)] = frame
+        self.encoder_pool.write_frames(frames, simulation_frame.timestamp)
+
+    def close_segment(self, last=False):
+        if self.segment_paths is None:
+            return
 
-                env_simulation_frame_videos.append(filename)
-            simulation_frame_videos.append(env_simulation_frame_videos)
+        VideoStreams.LOGGER.info(f"Closing video segment {self.segment_id}")
+        self.encoder_pool.close_segment(SimulationFramePaths(simulation_frame=self.segment_first_frame, paths=self.segment_paths), last=last)
 
-        VideoStreams.LOGGER.info(f"Done transcoding video segment {self.segment_id}")
         self.segment_id += 1
-
-        return SimulationFramePaths(first_timestamp, simulation_frame_videos, None)
+        self.segment_paths = None
 
     def stop(self):
-        self.do_transcode(self.simulation_frames)
+        self.close_segment(last=True)
 
-        self.video_segment_queue.put(None) # add poison pill
+        self.encoder_pool.shutdown(end_marker=None) # add poison pill once every segment is published
 
     def _filename(self, cam_id, env_id, frame_type, date_time, segment_id):
         return f"{Configuration.WORK_DIR}/cam_{cam_id}_env_{env_id}_{frame_type}_{date_time}_{segment_id}.ts"
@@ -161,12 +156,6 @@ class VideoStreams:
         """
         Use logarithmic scaling to enhance depth visualization
         Helps spread out colors better than linearly potentially improving contrast
+        Prefer a DepthColorizer instance, which reuses its buffers across frames
         """
-        # Add small epsilon to avoid log(0)
-        log_depth = np.log1p(depth_arr - np.min(depth_arr))
-        normalized_log_depth = (log_depth - np.min(log_depth)) / (np.max(log_depth) - np.min(log_depth))
-
-        # Use a perceptually uniform colormap for better distinction
-        depth_rgb = plt.cm.plasma(normalized_log_depth) * 255
-        depth_rgb = depth_rgb.astype(np.uint8)
-        return depth_rgb[:, :, :3]
\ No newline at end of file
+        return DepthColorizer().colorize(depth_arr)
\ No newline at end of file
@@ -1,14 +1,39 @@
+from fractions import Fraction
 from multiprocessing import shared_memory
 import numpy as np
 import subprocess
 
+import av
+
+from slobot.encoder_profile import EncoderProfile
+
 class VideoWriter():
     FFMPEG_BINARY = "ffmpeg"
 
-    def __init__(self, res, fps, codec):
+    # Low latency options of the segment encoder, so that each frame is emitted as soon as it is encoded and a segment ends without draining the encoder
+    # They are forced over the encoder profile, a frame lookahead would delay packets of a segment into the next one
+    SEGMENT_ENCODER_OPTIONS = {
+        "libx264": {"tune": "zerolatency", "rc-lookahead": "0", "forced-idr": "1"},
+        "h264_nvenc": {"zerolatency": "1", "delay": "0", "rc-lookahead": "0", "forced-idr": "1"},
+    }
+
+    # Time base of the segment timestamps, the MPEG-TS clock
+    TIME_BASE = Fraction(1, 90000)
+
+    def __init__(self, res, fps, codec, encoder_profile=None):
         self.res = res
         self.fps = fps
         self.codec = codec
+        self.encoder_profile = encoder_profile or EncoderProfile()
+
+        # segment encoding state
+        self.encoder = None
+        self.container = None
+        self.stream = None
+        self.frame_count = 0
+        self.first_timestamp = None
+        self.last_pts = None
+        self.segment_start_pts = None
 
     def transcode_numpy(self, numpy_buffer, output_filename):
         shared_memory = self.shared_memory(numpy_buffer)
@@ -76,4 +101,87 @@ class VideoWriter():
         shm_raw_video[:] = numpy_buffer[:]
         shm.close()
         return shm
-    
\ No newline at end of file
+
+    def open_segment(self, output_filename):
+        """
+        Start writing the frames to a new segment file.
+        The encoder is created once, then kept across segments, so that no process is spawned and no frame is buffered per segment.
+        """
+        if self.encoder is None:
+            self.encoder = self.create_encoder()
+
+        self.container = av.open(output_filename, "w")
+        self.stream = self.container.add_stream(self.encoder.name, rate=self.fps)
+        self.stream.width = self.res[0]
+        self.stream.height = self.res[1]
+        self.stream.pix_fmt = self.encoder.pix_fmt
+        self.segment_start_pts = None
+
+    def write_frame(self, rgb, timestamp=None):
+        """
+        Encode a RGB24 frame of shape (height, width, 3) into the current segment.
+        With a timestamp in seconds, the frame is presented at that time relative to the first frame, for a variable frame rate.
+        Without, frames are presented at the constant frame rate.
+        """
+        if timestamp is None:
+            timestamp = self.frame_count / self.fps
+        if self.first_timestamp is None:
+            self.first_timestamp = timestamp
+
+        pts = round((timestamp - self.first_timestamp) / VideoWriter.TIME_BASE)
+        if self.last_pts is not None and pts <= self.last_pts:
+            # timestamps must strictly increase
+            pts = self.last_pts + 1
+        self.last_pts = pts
+
+        frame = av.VideoFrame.from_ndarray(rgb, format="rgb24")
+        frame.pts = pts
+        frame.time_base = VideoWriter.TIME_BASE
+        if self.segment_start_pts is None:
+            # each segment starts with a keyframe, to be decodable on its own
+            frame.pict_type = av.video.frame.PictureType.I
+            self.segment_start_pts = pts
+        self.frame_count += 1
+
+        self.mux(self.encoder.encode(frame))
+
+    def close_segment(self):
+        """Finalize the current segment file, keeping the encoder for the next segment."""
+        self.container.close()
+        self.container = None
+        self.stream = None
+
+    def close(self):
+        """Flush the encoder into the current segment, then finalize it."""
+        if self.encoder is not None and self.container is not None:
+            self.mux(self.encoder.encode(None))
+        if self.container is not None:
+            self.close_segment()
+        self.encoder = None
+
+    def create_encoder(self):
+        encoder = av.CodecContext.create(self.codec, "w")
+        encoder.width = self.res[0]
+        encoder.height = self.res[1]
+        encoder.time_base = VideoWriter.TIME_BASE
+        encoder.framerate = self.fps  # nominal rate, for the rate control
+        self.encoder_profile.apply(encoder)
+        encoder.options = {**encoder.options, **self.segment_encoder_options()}
+        encoder.max_b_frames = 0
+        return encoder
+
+    def segment_encoder_options(self) -> dict[str, str]:
+        options = dict(VideoWriter.SEGMENT_ENCODER_OPTIONS.get(self.codec, {}))
+        tune = self.encoder_profile.tune
+        if self.codec == "libx264" and tune is not None and "zerolatency" not in tune:
+            # x264 combines a psychovisual tuning of the profile, like film, with zerolatency
+            options["tune"] = f"{tune},zerolatency"
+        return options
+
+    def mux(self, packets):
+        for packet in packets:
+            # timestamps restart at 0 in each segment
+            packet.pts -= self.segment_start_pts
+            packet.dts -= self.segment_start_pts
+            packet.stream = self.stream
+            self.container.mux(packet)
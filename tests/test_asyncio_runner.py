@@ -0,0 +1,183 @@
+import asyncio
+import os
+import signal
+import threading
+import time
+import unittest
+from typing import Any
+
+from slobot.teleop.asyncprocessing.asyncio_runner import AsyncioRunner, InProcessQueue
+from slobot.teleop.asyncprocessing.fifo_queue import FifoQueue
+from slobot.teleop.asyncprocessing.step_aligner import StepAligner
+
+
+class RecordingWorker:
+    """Minimal worker recording the messages it handles, on which thread."""
+
+    def __init__(self, worker_name, input_queue, output_queues=()):
+        self.worker_name = worker_name
+        self.input_queue = input_queue
+        self.output_queues = list(output_queues)
+        self.handled = []
+        self.threads = set()
+        self.torn_down = False
+
+    def setup(self):
+        self.threads.add(threading.get_ident())
+
+    def handle_message(self, msg_type: int, deadline: float, step: int, payload: Any, sent_time: float) -> bool:
+        self.threads.add(threading.get_ident())
+        self.handled.append((msg_type, step, payload))
+        if msg_type == FifoQueue.MSG_POISON_PILL:
+            for queue in self.output_queues:
+                queue.send_poison_pill()
+            return False
+        if msg_type == FifoQueue.MSG_RECORDING_ID:
+            for queue in self.output_queues:
+                queue.send_recording_id(payload)
+            return True
+
+        time.sleep(0.001)  # blocking I/O
+        for queue in self.output_queues:
+            queue.write(FifoQueue.MSG_POS, payload, deadline, step)
+        return True
+
+    def teardown(self):
+        self.torn_down = True
+
+
+class FusionWorker:
+    """Minimal multi-input worker recording the steps aligned across its inputs, like MultiInputWorkerBase."""
+
+    def __init__(self, worker_name, input_queues):
+        self.worker_name = worker_name
+        self.input_queue = None
+        self.input_queues = input_queues
+        self.step_aligner = StepAligner(len(input_queues), 0)
+        self.handled = []
+        self.torn_down = False
+
+    def setup(self):
+        pass
+
+    def receive(self, input_index: int) -> bool:
+        for msg_type, deadline, step, payload, sent_time in self.input_queues[input_index].poll_available():
+            if msg_type in InProcessQueue.CONTROL_MSG_TYPES:
+                if input_index == 0 and not self.handle_message(msg_type, deadline, step, payload, sent_time):
+                    return False
+                continue
+            self.step_aligner.add(input_index, step, (msg_type, deadline, payload, sent_time))
+        return True
+
+    def pop_aligned(self):
+        aligned = self.step_aligner.pop_aligned()
+        if aligned is None:
+            return None
+        step, messages = aligned
+        return tuple(message[0] for message in messages), messages[0][1], step, [message[2] for message in messages], messages[0][3]
+
+    def handle_message(self, msg_type, deadline: float, step: int, payload: Any, sent_time: float) -> bool:
+        self.handled.append((msg_type, step, payload))
+        return msg_type != FifoQueue.MSG_POISON_PILL
+
+    def teardown(self):
+        self.torn_down = True
+
+
+class TickingCron:
+    """Minimal cron sending a fixed number of ticks, then idling until stopped."""
+
+    def __init__(self, output_queue, ticks):
+        self.worker_name = "cron"
+        self.input_queue = None
+        self.output_queue = output_queue
+        self.ticks = ticks
+        self.running = True
+
+    def run(self):
+        self.output_queue.send_recording_id("episode")
+        for step in range(self.ticks):
+            self.output_queue.write(FifoQueue.MSG_EMPTY, [step], time.time() + 1.0, step)
+            time.sleep(0.005)
+        while self.running:
+            time.sleep(0.001)
+
+    def stop(self):
+        self.running = False
+
+
+class TestAsyncioRunner(unittest.TestCase):
+    def test_pipeline_in_one_process(self):
+        runner = AsyncioRunner()
+        leader = RecordingWorker("leader", runner.queue("leader_read"), [runner.queue("follower_control")])
+        follower = RecordingWorker("follower", runner.queue("follower_control"))
+        cron = TickingCron(runner.queue("leader_read"), ticks=20)
+        for worker in [cron, leader, follower]:
+            runner.add_worker(worker)
+
+        # interrupt once the ticks are handled
+        timer = threading.Timer(0.5, os.kill, args=(os.getpid(), signal.SIGINT))
+        timer.start()
+        runner.run()
+
+        self.assertEqual(leader.handled[0], (FifoQueue.MSG_RECORDING_ID, 0, "episode"))
+        self.assertEqual([step for _, step, _ in leader.handled[1:-1]], list(range(20)))
+        self.assertEqual(leader.handled[-1][0], FifoQueue.MSG_POISON_PILL)
+
+        # payloads are passed by reference
+        follower_payloads = [payload for msg_type, _, payload in follower.handled if msg_type == FifoQueue.MSG_POS]
+        leader_payloads = [payload for msg_type, _, payload in leader.handled if msg_type == FifoQueue.MSG_EMPTY]
+        self.assertEqual(len(follower_payloads), 20)
+        self.assertTrue(all(a is b for a, b in zip(follower_payloads, leader_payloads)))
+
+        # each worker stays on its own thread
+        self.assertEqual(len(leader.threads), 1)
+        self.assertNotEqual(leader.threads, follower.threads)
+        self.assertTrue(leader.torn_down and follower.torn_down)
+
+    def test_multi_input_worker(self):
+        runner = AsyncioRunner()
+        leader = RecordingWorker("leader", runner.queue("leader_read"), [runner.queue("detection1"), runner.queue("detection2")])
+        server = FusionWorker("detection_server", [runner.queue("detection1"), runner.queue("detection2")])
+        cron = TickingCron(runner.queue("leader_read"), ticks=20)
+        for worker in [cron, leader, server]:
+            runner.add_worker(worker)
+        self.assertEqual(runner.crons, [cron])
+
+        timer = threading.Timer(0.5, os.kill, args=(os.getpid(), signal.SIGINT))
+        timer.start()
+        runner.run()
+
+        self.assertEqual(server.handled[0], (FifoQueue.MSG_RECORDING_ID, 0, "episode"))
+        aligned = [(step, payload) for msg_type, step, payload in server.handled if msg_type == (FifoQueue.MSG_POS, FifoQueue.MSG_POS)]
+        self.assertEqual([step for step, _ in aligned], list(range(20)))
+        self.assertTrue(all(payload[0] is payload[1] for _, payload in aligned))
+        self.assertEqual(server.handled[-1][0], FifoQueue.MSG_POISON_PILL)
+        self.assertTrue(server.torn_down)
+
+    def test_load_reports_in_process(self):
+        runner = AsyncioRunner()
+        load_report_queue = runner.queue(FifoQueue.QUEUE_LOAD_REPORT)
+        loop = asyncio.new_event_loop()
+        load_report_queue.bind(loop)
+
+        # the workers report from their executor threads, the cron polls without waiting
+        reports = [("leader", 30, 0, 1.5, -20.0), ("sim", 30, 4, 40.0, 12.0)]
+        threads = [
+            threading.Thread(target=load_report_queue.try_write, args=(FifoQueue.MSG_LOAD_REPORT, report, 0.0, 30))
+            for report in reports
+        ]
+        for thread in threads:
+            thread.start()
+            thread.join()
+        loop.run_until_complete(asyncio.sleep(0))
+        loop.close()
+
+        messages = load_report_queue.poll_available()
+        self.assertEqual([msg_type for msg_type, _, _, _, _ in messages], [FifoQueue.MSG_LOAD_REPORT] * 2)
+        self.assertEqual([payload for _, _, _, payload, _ in messages], reports)
+        self.assertEqual(load_report_queue.poll_available(), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,35 @@
+import os
+import unittest
+import uuid
+from unittest import mock
+
+from slobot.teleop.asyncprocessing.fifo_queue import FifoQueue
+
+try:
+    from slobot.teleop.asyncprocessing.workers.cron_worker import CronWorker
+except ImportError:
+    # rerun is not installed, or its version is not supported
+    CronWorker = None
+
+
+@unittest.skipIf(CronWorker is None, "rerun is not available")
+class TestCronWorker(unittest.TestCase):
+    def test_teardown_closes_load_report_queue(self):
+        cron_worker = CronWorker(mock.MagicMock(), "recording", 30, adaptive=True)
+        cron_worker.load_report_queue = FifoQueue(f"test_load_report_{uuid.uuid4().hex[:8]}")
+        cron_worker.rerun_metrics = mock.MagicMock()
+        cron_worker.publish_reset = mock.MagicMock()
+
+        cron_worker.load_report_queue.open_read()
+        fd = cron_worker.load_report_queue.fd
+        try:
+            cron_worker.teardown()
+
+            with self.assertRaises(OSError):
+                os.fstat(fd)
+        finally:
+            os.unlink(cron_worker.load_report_queue.path)
+
+
+if __name__ == '__main__':
+    unittest.main()
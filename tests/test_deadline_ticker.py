@@ -0,0 +1,45 @@
+import time
+import unittest
+
+from slobot.teleop.asyncprocessing.deadline_ticker import DeadlineTicker, JitterHistogram
+
+
+class TestDeadlineTicker(unittest.TestCase):
+    PERIOD = 0.01
+
+    def test_no_drift(self):
+        ticker = DeadlineTicker(self.PERIOD)
+        ticker.start()
+        for _ in range(30):
+            # simulate some work in each tick
+            time.sleep(self.PERIOD / 3)
+            ticker.wait_next()
+
+        elapsed = time.perf_counter() - ticker.start_time
+        self.assertEqual(ticker.tick, 30)
+        self.assertAlmostEqual(elapsed, 30 * self.PERIOD, delta=self.PERIOD / 2)
+
+    def test_missed_ticks(self):
+        ticker = DeadlineTicker(self.PERIOD)
+        ticker.start()
+        time.sleep(3.5 * self.PERIOD)
+        ticker.wait_next()
+
+        # ticks 1 and 2 are over, tick 3 is released late by half a period
+        self.assertEqual(ticker.missed_ticks, 2)
+        self.assertEqual(ticker.tick, 3)
+        self.assertAlmostEqual(ticker.deadline() - ticker.start_wall_time, 4 * self.PERIOD)
+
+    def test_jitter_histogram(self):
+        histogram = JitterHistogram()
+        for jitter_ms in [0.05, 0.05, 0.15, 100.0]:
+            histogram.add(jitter_ms)
+
+        self.assertEqual(histogram.counts[0], 2)
+        self.assertEqual(histogram.counts[1], 1)
+        self.assertEqual(histogram.counts[-1], 1)
+        self.assertAlmostEqual(histogram.percentile(50), 0.1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,57 @@
+import unittest
+
+import numpy as np
+import matplotlib.pyplot as plt
+
+from slobot.depth_colorizer import DepthColorizer
+
+
+class TestDepthColorizer(unittest.TestCase):
+    def reference_colors(self, depth):
+        log_depth = np.log1p(depth - np.min(depth))
+        normalized_log_depth = (log_depth - np.min(log_depth)) / (np.max(log_depth) - np.min(log_depth))
+        return (plt.cm.plasma(normalized_log_depth) * 255).astype(np.uint8)[..., :3]
+
+    def depth_map(self, shape=(48, 64)):
+        rng = np.random.default_rng(0)
+        return rng.uniform(0.2, 3.0, size=shape).astype(np.float32)
+
+    def test_matches_colormap(self):
+        depth = self.depth_map()
+        colors = DepthColorizer().colorize(depth)
+
+        self.assertEqual(colors.shape, (48, 64, 3))
+        self.assertEqual(colors.dtype, np.uint8)
+        # the quantization into LUT_SIZE bins shifts a few pixels to a neighbouring color
+        difference = np.abs(colors.astype(np.int16) - self.reference_colors(depth).astype(np.int16))
+        self.assertLessEqual(int(np.max(difference)), 4)
+
+    def test_fixed_range_clamps(self):
+        colorizer = DepthColorizer(depth_range=(0.5, 2.0))
+        depth = np.array([[0.1, 0.5], [2.0, 9.0]], dtype=np.float32)
+        colors = colorizer.colorize(depth)
+
+        np.testing.assert_array_equal(colors[0, 0], DepthColorizer.PLASMA[0])
+        np.testing.assert_array_equal(colors[0, 1], DepthColorizer.PLASMA[0])
+        np.testing.assert_array_equal(colors[1, 0], DepthColorizer.PLASMA[-1])
+        np.testing.assert_array_equal(colors[1, 1], DepthColorizer.PLASMA[-1])
+
+    def test_reuses_output_buffer(self):
+        colorizer = DepthColorizer()
+        out = colorizer.colorize(self.depth_map())
+        depth = self.depth_map()[::-1].copy()
+        self.assertIs(colorizer.colorize(depth, out), out)
+        np.testing.assert_array_equal(out, DepthColorizer().colorize(depth))
+
+    def test_multi_env(self):
+        depth = self.depth_map((2, 48, 64))
+        colors = DepthColorizer(depth_range=(0.2, 3.0)).colorize(depth)
+        self.assertEqual(colors.shape, (2, 48, 64, 3))
+
+    def test_constant_depth(self):
+        colors = DepthColorizer().colorize(np.ones((4, 4), dtype=np.float32))
+        self.assertTrue(np.all(colors == DepthColorizer.PLASMA[0]))
+
+
+if __name__ == '__main__':
+    unittest.main()
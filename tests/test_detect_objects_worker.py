@@ -0,0 +1,102 @@
+import unittest
+import uuid
+from types import SimpleNamespace
+
+import numpy as np
+
+from slobot.teleop.asyncprocessing.fifo_queue import FifoQueue
+from slobot.teleop.asyncprocessing.multi_slot_shared_memory_block import MultiSlotSharedMemoryBlock
+
+try:
+    from slobot.teleop.asyncprocessing.workers.detect_objects_workers import DetectObjectsWorker
+except ImportError:
+    DetectObjectsWorker = None
+
+
+class HostArray:
+    """Array exposing the cpu().numpy() accessors of a tensor."""
+
+    def __init__(self, array):
+        self.array = np.asarray(array)
+
+    def cpu(self):
+        return self
+
+    def numpy(self):
+        return self.array
+
+
+class SlowModel:
+    """Model whose inference lasts long enough for the webcam to wrap around every slot."""
+
+    def __init__(self, producer: MultiSlotSharedMemoryBlock, overwrites: int):
+        self.producer = producer
+        self.overwrites = overwrites
+
+    def __call__(self, frame, verbose=False):
+        value = int(frame[0, 0, 0])
+        for _ in range(self.overwrites):
+            slot = self.producer.acquire_write_slot()
+            self.producer.slot_frame(slot).fill(255)
+            self.producer.commit_write(slot)
+
+        # labels the detection with the pixel values seen by the inference, after the overwrites
+        label = "consistent" if frame.min() == frame.max() == value else "torn"
+        boxes = SimpleNamespace(xyxy=HostArray([[0, 0, value, value]]), cls=HostArray([0]))
+        return [SimpleNamespace(boxes=boxes, names={0: label}, keypoints=None)]
+
+
+@unittest.skipIf(DetectObjectsWorker is None, "detection dependencies are not installed")
+class TestDetectObjectsWorker(unittest.TestCase):
+    WIDTH = 64
+    HEIGHT = 48
+
+    def setUp(self):
+        self.name = f"test_shm_{uuid.uuid4().hex[:8]}"
+        self.producer = MultiSlotSharedMemoryBlock.create(self.name, self.WIDTH, self.HEIGHT)
+
+        self.worker = DetectObjectsWorker(f"{DetectObjectsWorker.WORKER_DETECT_OBJECTS}1", None, 1, "DETECT", self.WIDTH, self.HEIGHT)
+        self.worker.shm_block = MultiSlotSharedMemoryBlock(self.name)
+
+    def tearDown(self):
+        self.worker.shm_block.close()
+        self.producer.close()
+        self.producer.unlink()
+
+    def test_detections_on_leased_slot(self):
+        self.producer.write_frame(np.full((self.HEIGHT, self.WIDTH, 3), 7, dtype=np.uint8))
+        # the webcam writes into the other slots of the ring during the inference
+        self.worker.model = SlowModel(self.producer, overwrites=MultiSlotSharedMemoryBlock.SLOTS - 1)
+
+        msg_type, detections = self.worker.process(None)
+
+        self.assertEqual(msg_type, FifoQueue.MSG_EMPTY)
+        self.assertEqual(detections.labels, ["consistent"])
+        np.testing.assert_array_equal(detections.boxes, [[0, 0, 7, 7]])
+
+    def test_detections_dropped_when_leased_slot_overwritten(self):
+        self.producer.write_frame(np.full((self.HEIGHT, self.WIDTH, 3), 7, dtype=np.uint8))
+        self.worker.model = SlowModel(self.producer, overwrites=MultiSlotSharedMemoryBlock.SLOTS + 1)
+
+        self.assertEqual(self.worker.process(None), (FifoQueue.MSG_EMPTY, None))
+
+    def test_detections_kept_on_copy_when_slot_overwritten(self):
+        self.worker.copy_frame = True
+        self.worker.frame = np.empty((self.HEIGHT, self.WIDTH, MultiSlotSharedMemoryBlock.CHANNELS), dtype=np.uint8)
+        self.producer.write_frame(np.full((self.HEIGHT, self.WIDTH, 3), 7, dtype=np.uint8))
+        self.worker.model = SlowModel(self.producer, overwrites=MultiSlotSharedMemoryBlock.SLOTS + 1)
+
+        msg_type, detections = self.worker.process(None)
+
+        self.assertEqual(msg_type, FifoQueue.MSG_EMPTY)
+        self.assertEqual(detections.labels, ["consistent"])
+        np.testing.assert_array_equal(detections.boxes, [[0, 0, 7, 7]])
+
+    def test_no_frame(self):
+        self.worker.model = SlowModel(self.producer, overwrites=0)
+
+        self.assertEqual(self.worker.process(None), (FifoQueue.MSG_EMPTY, None))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,40 @@
+import unittest
+
+import av
+
+from slobot.encoder_benchmark import EncoderBenchmark
+from slobot.encoder_profile import EncoderProfile, ENCODER_PROFILES
+
+
+class TestEncoderProfile(unittest.TestCase):
+    def test_parse(self):
+        self.assertIs(EncoderProfile.parse("realtime"), ENCODER_PROFILES["realtime"])
+
+        encoder_profile = EncoderProfile.parse("preset=superfast,crf=26,threads=2,gop_size=30")
+        self.assertEqual(encoder_profile, EncoderProfile(preset="superfast", crf=26, threads=2, gop_size=30))
+        self.assertEqual(EncoderProfile.parse(str(encoder_profile)), encoder_profile)
+
+        with self.assertRaises(ValueError):
+            EncoderProfile.parse("bitrate=1000")
+
+    def test_apply(self):
+        encoder = av.CodecContext.create("libx264", "w")
+        EncoderProfile(preset="superfast", crf=26, threads=2, gop_size=30).apply(encoder, {"tune": "zerolatency", "preset": "medium"})
+
+        self.assertEqual(encoder.options, {"tune": "zerolatency", "preset": "superfast", "crf": "26"})
+        self.assertEqual(encoder.thread_count, 2)
+        self.assertEqual(encoder.gop_size, 30)
+        self.assertEqual(encoder.pix_fmt, "yuv420p")
+
+    def test_benchmark(self):
+        encoder_benchmark = EncoderBenchmark(frame_count=10)
+        results = encoder_benchmark.run({"realtime": ENCODER_PROFILES["realtime"]}, resolutions=[(64, 48)])
+
+        self.assertEqual(len(results), 1)
+        self.assertEqual(results[0].res, (64, 48))
+        self.assertGreater(results[0].fps, 0)
+        self.assertGreater(results[0].bitrate_kbps, 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
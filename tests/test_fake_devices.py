@@ -0,0 +1,77 @@
+import time
+import unittest
+
+import cv2
+import numpy as np
+
+from slobot.configuration import Configuration
+from slobot.teleop.asyncprocessing.fake_devices import FakeFeetech, FakeVideoCapture
+
+
+class TestFakeFeetech(unittest.TestCase):
+    def test_leader_trajectory_is_deterministic(self):
+        trajectories = []
+        for _ in range(2):
+            leader = FakeFeetech("leader_arm", leader=True, bus_latency_ms=0)
+            trajectories.append([leader.get_pos() for _ in range(FakeFeetech.TRAJECTORY_PERIOD + 1)])
+
+        self.assertEqual(trajectories[0], trajectories[1])
+        # back to the start after one period, and away from it in between
+        self.assertEqual(trajectories[0][0], trajectories[0][-1])
+        self.assertNotEqual(trajectories[0][0], trajectories[0][FakeFeetech.TRAJECTORY_PERIOD // 4])
+
+    def test_follower_tracks_goal(self):
+        follower = FakeFeetech("follower_arm", leader=False, bus_latency_ms=0)
+        goal_pos = [pos + 100 for pos in Configuration.POS_MAP[Configuration.REFERENCE_FRAME]]
+        follower.control_position(goal_pos)
+
+        first_load = follower.get_dofs_control_force()
+        for _ in range(20):
+            pos = follower.get_pos()
+        self.assertEqual(pos, goal_pos)
+        self.assertTrue(all(load > 0 for load in first_load))
+        self.assertEqual(follower.get_dofs_control_force(), [0] * len(goal_pos))
+
+    def test_bus_latency(self):
+        leader = FakeFeetech("leader_arm", leader=True, bus_latency_ms=2.0)
+        start_time = time.perf_counter()
+        for _ in range(10):
+            leader.get_pos()
+        self.assertGreaterEqual(time.perf_counter() - start_time, 0.02)
+
+
+class TestFakeVideoCapture(unittest.TestCase):
+    WIDTH = 160
+    HEIGHT = 120
+    FPS = 100
+
+    def test_geometry(self):
+        cap = FakeVideoCapture(self.WIDTH, self.HEIGHT, self.FPS)
+        self.assertTrue(cap.isOpened())
+        self.assertEqual((cap.get(cv2.CAP_PROP_FRAME_WIDTH), cap.get(cv2.CAP_PROP_FRAME_HEIGHT), cap.get(cv2.CAP_PROP_FPS)), (self.WIDTH, self.HEIGHT, self.FPS))
+
+        frame = np.empty((self.HEIGHT, self.WIDTH, 3), dtype=np.uint8)
+        ret, read_frame = cap.read(frame)
+        self.assertTrue(ret)
+        self.assertIs(read_frame, frame)
+
+        cap.release()
+        self.assertFalse(cap.isOpened())
+
+    def test_frame_rate(self):
+        cap = FakeVideoCapture(self.WIDTH, self.HEIGHT, self.FPS)
+        frames = [cap.read()[1] for _ in range(10)]
+        elapsed = time.perf_counter() - cap.start_time
+        self.assertGreaterEqual(elapsed, 9 / self.FPS)
+        self.assertFalse(np.array_equal(frames[0], frames[1]))
+
+    def test_late_reader_drops_frames(self):
+        cap = FakeVideoCapture(self.WIDTH, self.HEIGHT, self.FPS)
+        cap.read()
+        time.sleep(5 / self.FPS)
+        cap.read()
+        self.assertGreaterEqual(cap.dropped_frames, 3)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,52 @@
+import time
+import unittest
+
+import numpy as np
+
+from slobot.teleop.asyncprocessing.fake_devices import FakeVideoCapture
+from slobot.teleop.asyncprocessing.frame_grabber import FrameGrabber
+
+
+class FailingCapture:
+    def read(self, frame=None):
+        return False, None
+
+
+class TestFrameGrabber(unittest.TestCase):
+    WIDTH = 64
+    HEIGHT = 48
+    FPS = 100
+
+    def test_read_latest_frame(self):
+        cap = FakeVideoCapture(self.WIDTH, self.HEIGHT, self.FPS)
+        grabber = FrameGrabber(cap, "webcam_grab")
+        grabber.start()
+        try:
+            frame, capture_time = grabber.read_latest()
+            self.assertEqual(frame.shape, (self.HEIGHT, self.WIDTH, 3))
+
+            # the latest frame is returned without waiting for the next one, and is at most one period old
+            time.sleep(0.05)
+            buffer = np.empty_like(frame)
+            start_time = time.time()
+            latest_frame, capture_time = grabber.read_latest(buffer)
+            self.assertLess(time.time() - start_time, 1.0 / self.FPS)
+            self.assertIs(latest_frame, buffer)
+            self.assertLess(start_time - capture_time, 2.0 / self.FPS)
+            self.assertGreater(grabber.frame_count, 2)
+        finally:
+            grabber.stop()
+            cap.release()
+
+    def test_read_error(self):
+        grabber = FrameGrabber(FailingCapture(), "webcam_grab")
+        grabber.start()
+        try:
+            with self.assertRaises(RuntimeError):
+                grabber.read_latest()
+        finally:
+            grabber.stop()
+
+
+if __name__ == '__main__':
+    unittest.main()
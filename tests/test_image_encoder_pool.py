@@ -0,0 +1,57 @@
+import io
+import os
+import tempfile
+import unittest
+
+import numpy as np
+from PIL import Image
+
+from slobot.image_encoder_pool import ImageEncoderPool, ImageFormat
+
+
+class TestImageEncoderPool(unittest.TestCase):
+    def images(self, value):
+        return [np.full((48, 64, 3), value, dtype=np.uint8), np.full((48, 64, 3), 255 - value, dtype=np.uint8)]
+
+    def test_saves_files(self):
+        with tempfile.TemporaryDirectory() as work_dir:
+            for image_format in ImageFormat:
+                image_encoder_pool = ImageEncoderPool(image_format=image_format, quality=90)
+                filenames = [os.path.join(work_dir, "rgb_0"), os.path.join(work_dir, "depth_0")]
+                paths = image_encoder_pool.submit(self.images(100), filenames).result()
+                image_encoder_pool.shutdown()
+
+                self.assertEqual(paths, [f"{filename}.{image_format.value}" for filename in filenames])
+                if image_format == ImageFormat.RAW:
+                    np.testing.assert_array_equal(np.load(paths[1]), self.images(100)[1])
+                else:
+                    with Image.open(paths[0]) as image:
+                        self.assertEqual(image.size, (64, 48))
+
+    def test_in_memory(self):
+        image_encoder_pool = ImageEncoderPool(image_format=ImageFormat.JPEG, quality=90, in_memory=True)
+        encoded_images = image_encoder_pool.submit(self.images(100)).result()
+        image_encoder_pool.shutdown()
+
+        with Image.open(io.BytesIO(encoded_images[0])) as image:
+            self.assertEqual(image.format, "JPEG")
+            self.assertLessEqual(abs(int(np.asarray(image)[0, 0, 0]) - 100), 2)
+
+        image_encoder_pool = ImageEncoderPool(image_format=ImageFormat.RAW, in_memory=True)
+        images = self.images(100)
+        self.assertIs(image_encoder_pool.submit(images).result()[0], images[0])
+        image_encoder_pool.shutdown()
+
+    def test_results_in_order(self):
+        image_encoder_pool = ImageEncoderPool(image_format=ImageFormat.WEBP, in_memory=True, max_workers=4, max_pending_frames=2)
+        futures = [image_encoder_pool.submit(self.images(value)) for value in range(0, 250, 10)]
+        self.assertLessEqual(len(image_encoder_pool.pending_futures), 2)
+
+        for value, future in zip(range(0, 250, 10), futures):
+            with Image.open(io.BytesIO(future.result()[0])) as image:
+                self.assertLessEqual(abs(int(np.asarray(image)[0, 0, 0]) - value), 3)
+        image_encoder_pool.shutdown()
+
+
+if __name__ == '__main__':
+    unittest.main()
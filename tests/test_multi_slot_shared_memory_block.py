@@ -0,0 +1,248 @@
+import ctypes.util
+import multiprocessing
+import time
+import unittest
+import uuid
+
+import numpy as np
+
+from slobot.teleop.asyncprocessing.multi_slot_shared_memory_block import MultiSlotSharedMemoryBlock
+
+
+def stress_writer(name, duration, rate):
+    block = MultiSlotSharedMemoryBlock(name)
+    period = 1.0 / rate
+    deadline = time.perf_counter()
+    end_time = deadline + duration
+    value = 0
+    while time.perf_counter() < end_time:
+        slot = block.acquire_write_slot()
+        value = (value + 1) % 256
+        block.slot_frame(slot).fill(value)
+        block.commit_write(slot)
+
+        deadline += period
+        while time.perf_counter() < deadline:
+            pass
+    block.close()
+
+
+def stress_reader(name, duration, results):
+    block = MultiSlotSharedMemoryBlock(name)
+    out = np.empty((block.height, block.width, block.CHANNELS), dtype=np.uint8)
+    reads = 0
+    torn = 0
+    last_frame_id = 0
+    end_time = time.perf_counter() + duration
+    while time.perf_counter() < end_time:
+        frame_id = block.read_latest(out)
+        if frame_id is None or frame_id == last_frame_id:
+            continue
+        last_frame_id = frame_id
+        reads += 1
+        # the writer fills each frame with a single value, a torn frame would mix two values
+        if out.min() != out.max():
+            torn += 1
+    results.put((reads, torn))
+    block.close()
+
+
+class RacingGenerations:
+    """Generations of the consumer, letting the producer rewrite every slot right before the first generation is read."""
+
+    def __init__(self, generations, race):
+        self.generations = generations
+        self.race = race
+
+    def __getitem__(self, slot):
+        if self.race is not None:
+            race, self.race = self.race, None
+            race()
+        return self.generations[slot]
+
+
+class TestMultiSlotSharedMemoryBlock(unittest.TestCase):
+    WIDTH = 640
+    HEIGHT = 480
+
+    def setUp(self):
+        self.name = f"test_shm_{uuid.uuid4().hex[:8]}"
+        self.producer = MultiSlotSharedMemoryBlock.create(self.name, self.WIDTH, self.HEIGHT)
+        self.consumer = MultiSlotSharedMemoryBlock(self.name)
+
+    def tearDown(self):
+        self.consumer.close()
+        self.producer.close()
+        self.producer.unlink()
+
+    def write(self, value):
+        slot = self.producer.acquire_write_slot()
+        self.producer.slot_frame(slot).fill(value)
+        self.producer.commit_write(slot)
+        return slot
+
+    def test_geometry_from_header(self):
+        self.assertEqual((self.consumer.width, self.consumer.height, self.consumer.slots), (self.WIDTH, self.HEIGHT, MultiSlotSharedMemoryBlock.SLOTS))
+
+    def test_slots_for_reader_hold_time(self):
+        self.assertEqual(MultiSlotSharedMemoryBlock.slots_for(30), MultiSlotSharedMemoryBlock.SLOTS)
+        self.assertEqual(MultiSlotSharedMemoryBlock.slots_for(30, 0.030), 3)
+        self.assertEqual(MultiSlotSharedMemoryBlock.slots_for(30, 0.066), 4)
+        self.assertEqual(MultiSlotSharedMemoryBlock.slots_for(30, 0.2), 8)
+
+    def test_lease_held_for_reader_hold_time(self):
+        hold_frames = 5
+        slots = MultiSlotSharedMemoryBlock.slots_for(30, hold_frames / 30)
+        name = f"test_shm_{uuid.uuid4().hex[:8]}"
+        producer = MultiSlotSharedMemoryBlock.create(name, self.WIDTH, self.HEIGHT, slots)
+        consumer = MultiSlotSharedMemoryBlock(name)
+        try:
+            slot = producer.acquire_write_slot()
+            producer.commit_write(slot)
+            lease = consumer.lease_latest()
+
+            # the producer writes the next frame, then starts one frame per frame period while the consumer holds the lease
+            for _ in range(hold_frames):
+                slot = producer.acquire_write_slot()
+                producer.commit_write(slot)
+            producer.acquire_write_slot()
+            self.assertTrue(consumer.release(lease))
+        finally:
+            consumer.close()
+            producer.close()
+            producer.unlink()
+
+    def test_memory_fence_on_weakly_ordered_machine(self):
+        self.assertIsNone(MultiSlotSharedMemoryBlock.load_atomic_thread_fence("x86_64"))
+        if ctypes.util.find_library("atomic") is None:
+            with self.assertRaises(RuntimeError):
+                MultiSlotSharedMemoryBlock.load_atomic_thread_fence("aarch64")
+            return
+
+        # the handoff goes through the fences of an ARM machine
+        atomic_thread_fence = MultiSlotSharedMemoryBlock.load_atomic_thread_fence("aarch64")
+        self.producer.atomic_thread_fence = atomic_thread_fence
+        self.consumer.atomic_thread_fence = atomic_thread_fence
+        self.write(7)
+        lease = self.consumer.lease_latest()
+        self.assertTrue(np.all(lease.frame == 7))
+        self.assertTrue(self.consumer.release(lease))
+
+    def test_empty_block_has_no_lease(self):
+        self.assertIsNone(self.consumer.lease_latest())
+        self.assertEqual(self.consumer.latest_frame_id(), 0)
+
+    def test_zero_copy_handoff(self):
+        slot = self.write(7)
+
+        lease = self.consumer.lease_latest()
+        self.assertEqual(lease.slot, slot)
+        self.assertEqual(lease.frame_id, 1)
+        self.assertEqual(lease.frame.shape, (self.HEIGHT, self.WIDTH, MultiSlotSharedMemoryBlock.CHANNELS))
+        self.assertFalse(lease.frame.flags.writeable)
+        self.assertFalse(lease.frame.flags.owndata)
+        self.assertTrue(np.all(lease.frame == 7))
+        self.assertTrue(self.consumer.release(lease))
+
+    def test_writer_never_blocked_by_leased_frame(self):
+        self.write(1)
+        lease = self.consumer.lease_latest()
+
+        # the producer keeps publishing while the consumer holds its lease
+        self.write(2)
+        self.write(3)
+        self.assertTrue(np.all(lease.frame == 1))
+        self.assertTrue(self.consumer.release(lease))
+
+        lease = self.consumer.lease_latest()
+        self.write(4)
+        self.write(5)
+        self.write(6)
+        # the producer wrapped around to the leased slot, the consumer detects it
+        self.assertFalse(self.consumer.release(lease))
+
+        lease = self.consumer.lease_latest()
+        self.assertEqual(lease.frame_id, 6)
+        self.assertTrue(np.all(lease.frame == 6))
+        self.assertTrue(self.consumer.release(lease))
+
+    def test_lease_retries_when_slot_rewritten_during_lookup(self):
+        self.write(1)
+
+        def wrap_around():
+            # between the read of the latest frame and the read of its slot generation, the producer fully rewrites the slot
+            for value in range(2, 2 + self.producer.slots):
+                self.write(value)
+
+        generations = self.consumer.generations
+        self.consumer.generations = RacingGenerations(generations, wrap_around)
+        lease = self.consumer.lease_latest()
+        self.consumer.generations = generations
+
+        # the lease pairs the newest frame id with its pixels, instead of frame 1 with the pixels of the frame rewritten into its slot
+        self.assertEqual(lease.frame_id, 1 + self.producer.slots)
+        self.assertTrue(np.all(lease.frame == 1 + self.producer.slots))
+        self.assertTrue(self.consumer.release(lease))
+
+    def test_copy_outlives_slot_reuse(self):
+        self.write(1)
+        out = np.empty((self.HEIGHT, self.WIDTH, MultiSlotSharedMemoryBlock.CHANNELS), dtype=np.uint8)
+        self.assertEqual(self.consumer.read_latest(out), 1)
+
+        # a long inference on the copy, while the producer wraps around every slot
+        for value in range(2, 2 + self.producer.slots + 1):
+            self.write(value)
+        self.assertTrue(np.all(out == 1))
+
+    def test_aborted_write_is_not_published(self):
+        self.write(1)
+        lease = self.consumer.lease_latest()
+
+        slot = self.producer.acquire_write_slot()
+        self.producer.abort_write(slot)
+
+        self.assertEqual(self.consumer.latest_frame_id(), 1)
+        self.assertTrue(self.consumer.release(lease))
+        self.write(2)
+        out = np.empty_like(lease.frame)
+        self.assertEqual(self.consumer.read_latest(out), 2)
+        self.assertTrue(np.all(out == 2))
+
+    def test_write_frame_copy(self):
+        frame = np.full((self.HEIGHT, self.WIDTH, 3), 5, dtype=np.uint8)
+        self.assertTrue(self.producer.write_frame(frame))
+        self.assertFalse(self.producer.write_frame(frame[:10]))
+
+        out = np.empty_like(frame)
+        self.assertEqual(self.consumer.read_latest(out), 1)
+        np.testing.assert_array_equal(out, frame)
+
+    def test_stress_one_writer_several_readers(self):
+        duration = 2.0
+        rate = 1000
+        reader_count = 3
+
+        context = multiprocessing.get_context("spawn")
+        results = context.Queue()
+        readers = [
+            context.Process(target=stress_reader, args=(self.name, duration, results))
+            for _ in range(reader_count)
+        ]
+        for reader in readers:
+            reader.start()
+        writer = context.Process(target=stress_writer, args=(self.name, duration, rate))
+        writer.start()
+
+        reader_results = [results.get(timeout=60) for _ in readers]
+        writer.join(timeout=60)
+        for reader in readers:
+            reader.join(timeout=60)
+
+        self.assertEqual(writer.exitcode, 0)
+        for reads, torn in reader_results:
+            self.assertGreater(reads, 0)
+            self.assertEqual(torn, 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,81 @@
+import unittest
+
+import numpy as np
+
+from slobot.teleop.asyncprocessing.object_tracker import Detections, ObjectTracker
+
+
+class TestObjectTracker(unittest.TestCase):
+    WIDTH = 160
+    HEIGHT = 120
+    SIZE = 40
+
+    def setUp(self):
+        # textured patch, so that the optical flow has corners to lock on
+        rng = np.random.default_rng(0)
+        self.patch = rng.integers(0, 255, (self.SIZE, self.SIZE), dtype=np.uint8)
+
+    def frame(self, x, y):
+        gray = np.full((self.HEIGHT, self.WIDTH), 64, dtype=np.uint8)
+        gray[y:y + self.SIZE, x:x + self.SIZE] = self.patch
+        return gray
+
+    def detections(self, x, y, keypoints=None):
+        return Detections(np.array([[x, y, x + self.SIZE, y + self.SIZE]], dtype=np.float32), ["cup"], keypoints)
+
+    def test_track_moving_box(self):
+        tracker = ObjectTracker(detect_every=5)
+        tracker.update(self.frame(40, 30), self.detections(40, 30))
+
+        tracked = tracker.track(self.frame(45, 33))
+        np.testing.assert_allclose(tracked.boxes, self.detections(45, 33).boxes, atol=0.5)
+        self.assertEqual(tracked.labels, ["cup"])
+
+        tracked = tracker.track(self.frame(49, 37))
+        np.testing.assert_allclose(tracked.boxes, self.detections(49, 37).boxes, atol=0.5)
+        self.assertLess(ObjectTracker.drift(tracked, self.detections(49, 37)), 0.05)
+
+    def test_track_keypoints(self):
+        keypoints = np.array([[[50, 40], [0, 0]]], dtype=np.float32)
+        tracker = ObjectTracker(detect_every=5)
+        tracker.update(self.frame(40, 30), self.detections(40, 30, keypoints))
+
+        tracked = tracker.track(self.frame(44, 32))
+        np.testing.assert_allclose(tracked.keypoints[0, 0], [54, 42], atol=0.5)
+        # invisible keypoints stay invisible
+        np.testing.assert_array_equal(tracked.keypoints[0, 1], [0, 0])
+
+    def test_detect_every(self):
+        tracker = ObjectTracker(detect_every=3)
+        gray = self.frame(40, 30)
+        self.assertTrue(tracker.should_detect(gray))
+
+        tracker.update(gray, self.detections(40, 30))
+        schedule = []
+        for _ in range(6):
+            detect = tracker.should_detect(gray)
+            schedule.append(detect)
+            if detect:
+                tracker.update(gray, self.detections(40, 30))
+            else:
+                tracker.track(gray)
+        self.assertEqual(schedule, [False, False, True, False, False, True])
+
+    def test_motion_trigger(self):
+        tracker = ObjectTracker(detect_every=100, motion_threshold=0.02)
+        tracker.update(self.frame(40, 30), self.detections(40, 30))
+
+        self.assertFalse(tracker.should_detect(self.frame(41, 30)))
+        self.assertTrue(tracker.should_detect(self.frame(100, 70)))
+
+    def test_drift(self):
+        detected = self.detections(40, 30)
+        self.assertAlmostEqual(ObjectTracker.drift(detected, detected), 0.0)
+        # half overlap: IoU of 1/3
+        self.assertAlmostEqual(ObjectTracker.drift(self.detections(60, 30), detected), 2 / 3)
+        self.assertEqual(ObjectTracker.drift(Detections(np.empty((0, 4)), []), detected), 1.0)
+        self.assertEqual(ObjectTracker.drift(Detections(np.empty((0, 4)), []), Detections(np.empty((0, 4)), [])), 0.0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,58 @@
+import time
+import unittest
+from types import SimpleNamespace
+
+from slobot.teleop.asyncprocessing.pipeline_supervisor import PipelineSupervisor, WorkerSpec
+
+
+class RecordingSupervisor(PipelineSupervisor):
+    """Supervisor starting fake processes, which crash when told to."""
+
+    def start_worker(self, spec: WorkerSpec):
+        name = self.worker_name(spec)
+        self.processes[name] = SimpleNamespace(is_alive=lambda: True, exitcode=None)
+        self.start_times[name] = time.monotonic()
+
+    def crash(self, name: str, uptime: float):
+        self.processes[name] = SimpleNamespace(is_alive=lambda: False, exitcode=1)
+        self.start_times[name] = time.monotonic() - uptime
+        self.check_workers()
+
+
+class TestPipelineSupervisor(unittest.TestCase):
+    def test_restarts_reset_after_healthy_uptime(self):
+        supervisor = RecordingSupervisor([WorkerSpec(type="sim_step")])
+        supervisor.start()
+
+        for _ in range(PipelineSupervisor.MAX_RESTARTS):
+            supervisor.crash("sim_step", uptime=1.0)
+        self.assertEqual(supervisor.restarts["sim_step"], PipelineSupervisor.MAX_RESTARTS)
+
+        # a crash after a long healthy run is restarted, and starts counting again
+        supervisor.crash("sim_step", uptime=PipelineSupervisor.RESTART_RESET_UPTIME)
+        self.assertIn("sim_step", supervisor.processes)
+        self.assertEqual(supervisor.restarts["sim_step"], 1)
+
+    def test_gives_up_after_crash_loop(self):
+        supervisor = RecordingSupervisor([WorkerSpec(type="sim_step")])
+        supervisor.start()
+
+        for _ in range(PipelineSupervisor.MAX_RESTARTS + 1):
+            supervisor.crash("sim_step", uptime=1.0)
+        self.assertNotIn("sim_step", supervisor.processes)
+
+    def test_realtime_cron_requires_dedicated_cores(self):
+        leader = WorkerSpec(type="leader_read", cores=[1], realtime_priority=50)
+        PipelineSupervisor.validate_specs([leader, WorkerSpec(type="cron", cores=[0], realtime_priority=60)])
+
+        with self.assertRaises(ValueError):
+            PipelineSupervisor.validate_specs([leader, WorkerSpec(type="cron", realtime_priority=60)])
+        with self.assertRaises(ValueError):
+            PipelineSupervisor.validate_specs([leader, WorkerSpec(type="cron", cores=[1], realtime_priority=60)])
+
+        # without a real-time priority, the spin is preempted like any other process
+        PipelineSupervisor.validate_specs([leader, WorkerSpec(type="cron", cores=[1])])
+
+
+if __name__ == "__main__":
+    unittest.main()
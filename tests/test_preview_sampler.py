@@ -0,0 +1,45 @@
+import unittest
+
+import numpy as np
+
+from slobot.teleop.asyncprocessing.preview_sampler import PreviewSampler
+
+
+class TestPreviewSampler(unittest.TestCase):
+    def frame(self, value=0):
+        return np.full((480, 640, 3), value, dtype=np.uint8)
+
+    def test_rate_limit(self):
+        preview_sampler = PreviewSampler(max_rate=5)
+        # 30 fps frames for one second
+        previews = [preview_sampler.sample(self.frame(), now=i / 30) for i in range(30)]
+        self.assertEqual([i for i, preview in enumerate(previews) if preview is not None], [0, 6, 12, 18, 24])
+
+    def test_every_frame(self):
+        preview_sampler = PreviewSampler()
+        frame = self.frame()
+        self.assertIs(preview_sampler.sample(frame, now=0.0), frame)
+        self.assertIs(preview_sampler.sample(frame, now=0.0), frame)
+
+    def test_downscale(self):
+        preview_sampler = PreviewSampler(downscale=4)
+        frame = self.frame()
+        frame[:, 320:] = 200
+
+        preview = preview_sampler.sample(frame, now=0.0)
+        self.assertEqual(preview.shape, (120, 160, 3))
+        self.assertEqual(preview.dtype, np.uint8)
+        self.assertEqual(preview[0, 0, 0], 0)
+        self.assertEqual(preview[0, -1, 0], 200)
+
+        # the buffer is reused by the next preview
+        self.assertIs(preview_sampler.sample(self.frame(50), now=1.0), preview)
+        self.assertTrue(np.all(preview == 50))
+
+    def test_invalid_downscale(self):
+        with self.assertRaises(ValueError):
+            PreviewSampler(downscale=0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,44 @@
+import unittest
+
+from slobot.teleop.asyncprocessing.rate_controller import RateController
+
+
+class TestRateController(unittest.TestCase):
+    TARGET_FPS = 60
+    MIN_FPS = 30
+
+    def setUp(self):
+        self.controller = RateController(self.TARGET_FPS, self.MIN_FPS)
+
+    def test_decimate_sheddable_worker(self):
+        new_fps, decimations = self.controller.handle_reports([("sim", 30, 10, 40.0, 20.0), ("leader", 30, 0, 2.0, -10.0)])
+        self.assertIsNone(new_fps)
+        self.assertEqual(decimations, {"sim": 2})
+
+    def test_slow_down_on_control_loop_overrun(self):
+        new_fps, decimations = self.controller.handle_reports([("follower", 30, 10, 20.0, 5.0)])
+        self.assertEqual(new_fps, 48)
+        self.assertEqual(decimations, {})
+
+        for _ in range(10):
+            self.controller.handle_reports([("follower", 30, 10, 20.0, 5.0)])
+        self.assertEqual(self.controller.fps, self.MIN_FPS)
+
+    def test_recover_fps_before_decimation(self):
+        self.controller.handle_reports([("detect_objects1", 30, 30, 80.0, 50.0), ("follower", 30, 10, 20.0, 5.0)])
+        self.assertEqual(self.controller.decimations, {"detect_objects1": 2})
+        self.assertEqual(self.controller.fps, 48)
+
+        quiet_report = [("follower", 30, 0, 5.0, -10.0)]
+        results = [
+            self.controller.handle_reports(quiet_report)
+            for _ in range(RateController.RECOVERY_WINDOWS * 8)
+        ]
+        changes = [result for result in results if result != (None, {})]
+        self.assertEqual(changes[0], (50, {}))
+        self.assertEqual(changes[-1], (None, {"detect_objects1": 1}))
+        self.assertEqual(self.controller.fps, self.TARGET_FPS)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,38 @@
+import unittest
+
+from slobot.teleop.asyncprocessing.render_schedule import RenderMode, RenderSchedule
+
+
+class TestRenderSchedule(unittest.TestCase):
+    def test_parse(self):
+        render_schedule = RenderSchedule.parse(["rgb", "depth:5"])
+        self.assertEqual(render_schedule.pass_decimations, {RenderMode.RGB: 1, RenderMode.DEPTH: 5})
+        self.assertEqual(render_schedule.enabled_passes(), [RenderMode.RGB, RenderMode.DEPTH])
+
+        with self.assertRaises(ValueError):
+            RenderSchedule.parse(["infrared"])
+        with self.assertRaises(ValueError):
+            RenderSchedule.parse(["depth:0"])
+
+    def test_due_passes(self):
+        render_schedule = RenderSchedule.parse(["rgb", "depth:5"])
+        due_steps = {
+            render_mode: [step for step in range(12) if render_mode in render_schedule.due_passes(step)]
+            for render_mode in RenderMode
+        }
+        self.assertEqual(due_steps[RenderMode.RGB], list(range(12)))
+        self.assertEqual(due_steps[RenderMode.DEPTH], [0, 5, 10])
+        self.assertEqual(due_steps[RenderMode.SEGMENTATION], [])
+
+    def test_cron_decimation(self):
+        render_schedule = RenderSchedule.parse(["rgb", "depth:5"])
+        self.assertEqual(render_schedule.due_passes(3, decimation=2), [])
+        self.assertEqual(render_schedule.due_passes(4, decimation=2), [RenderMode.RGB])
+        self.assertEqual(render_schedule.due_passes(10, decimation=2), [RenderMode.RGB, RenderMode.DEPTH])
+
+    def test_all_passes(self):
+        self.assertEqual(RenderSchedule.all_passes().due_passes(7), list(RenderMode))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,52 @@
+import unittest
+from unittest import mock
+
+import numpy as np
+
+from slobot.configuration import Configuration
+from slobot.feetech_frame import FeetechFrame
+from slobot.simulation_frame import SimulationFrame
+
+try:
+    from slobot.metrics.rerun_metrics import RerunMetrics, OperationMode
+except ImportError:
+    # rerun is not installed, or its version is not supported
+    RerunMetrics = None
+
+
+@unittest.skipIf(RerunMetrics is None, "rerun is not available")
+class TestRerunMetrics(unittest.TestCase):
+    def test_joint_arrays_batched(self):
+        steps = 10
+        n_joints = len(Configuration.JOINT_NAMES)
+
+        with mock.patch("slobot.metrics.rerun_metrics.rr") as rr:
+            metrics = RerunMetrics(operation_mode=OperationMode.SAVE, scalar_batch_steps=1000)
+            metrics.step = 0
+            for step in range(steps):
+                joint_values = np.arange(n_joints, dtype=np.float64) + step
+                feetech_frame = FeetechFrame(control_pos=joint_values, qpos=joint_values, velocity=joint_values, control_force=joint_values)
+                simulation_frame = SimulationFrame(
+                    timestamp=step,
+                    qpos=joint_values,
+                    velocity=joint_values,
+                    control_force=joint_values,
+                    feetech_frame=feetech_frame,
+                )
+                metrics.handle_step(simulation_frame)
+
+            # no rr.log per joint per step, the joint columns are sent once batched
+            rr.log.assert_not_called()
+            rr.send_columns.assert_not_called()
+
+            metrics.flush_scalars()
+
+            # one column per joint of /sim/qpos, /sim/velocity, /sim/control_force, /leader/qpos, /follower/qpos, /follower/velocity and /follower/control_force
+            self.assertEqual(rr.send_columns.call_count, 7 * n_joints)
+            entity_paths = [call.args[0] for call in rr.send_columns.call_args_list]
+            self.assertIn("/sim/qpos/shoulder_pan", entity_paths)
+            self.assertIn(f"{RerunMetrics.REAL_QPOS_METRIC}/gripper", entity_paths)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,75 @@
+import threading
+import time
+import unittest
+
+from slobot.metrics.scalar_buffer import ScalarBuffer
+
+
+class TestScalarBuffer(unittest.TestCase):
+    def setUp(self):
+        self.sent = []
+
+    def send(self, entity_path, steps, values):
+        self.sent.append((entity_path, steps, values))
+
+    def test_flush_on_size(self):
+        scalars = ScalarBuffer(self.send, batch_steps=3, flush_interval=60.0)
+        for step in range(2):
+            scalars.add(step, "/follower/qpos/shoulder_pan", float(step))
+            scalars.add(step, "/latency/follower", 10.0 + step)
+        self.assertEqual(self.sent, [])
+
+        scalars.add(2, "/follower/qpos/shoulder_pan", 2.0)
+        self.assertEqual(self.sent, [
+            ("/follower/qpos/shoulder_pan", [0, 1, 2], [0.0, 1.0, 2.0]),
+            ("/latency/follower", [0, 1], [10.0, 11.0]),
+        ])
+        self.assertEqual(scalars.columns, {})
+
+    def test_add_array(self):
+        scalars = ScalarBuffer(self.send, batch_steps=2, flush_interval=60.0)
+        entity_paths = ["/sim/qpos/shoulder_pan", "/sim/qpos/shoulder_lift"]
+        scalars.add_array(0, entity_paths, [0.5, 1.5])
+        self.assertEqual(self.sent, [])
+
+        scalars.add_array(1, entity_paths, [0.6, 1.6])
+        self.assertEqual(self.sent, [
+            ("/sim/qpos/shoulder_pan", [0, 1], [0.5, 0.6]),
+            ("/sim/qpos/shoulder_lift", [0, 1], [1.5, 1.6]),
+        ])
+
+    def test_flush_on_time(self):
+        scalars = ScalarBuffer(self.send, batch_steps=1000, flush_interval=0.05)
+        scalars.add(0, "/latency/sim", 5.0)
+        time.sleep(0.06)
+        scalars.add(1, "/latency/sim", 6.0)
+        self.assertEqual(self.sent, [("/latency/sim", [0, 1], [5.0, 6.0])])
+
+    def test_explicit_flush(self):
+        scalars = ScalarBuffer(self.send, batch_steps=1000, flush_interval=60.0)
+        scalars.add(7, "/webcam1/frame_age", 12.5)
+        scalars.flush()
+        scalars.flush()
+        self.assertEqual(self.sent, [("/webcam1/frame_age", [7], [12.5])])
+
+    def test_concurrent_adds(self):
+        scalars = ScalarBuffer(self.send, batch_steps=50, flush_interval=60.0)
+
+        def add_steps(entity_path):
+            for step in range(1000):
+                scalars.add(step, entity_path, float(step))
+
+        threads = [threading.Thread(target=add_steps, args=(f"/encode_latency/stream{index}",)) for index in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        scalars.flush()
+
+        for index in range(4):
+            steps = [step for entity_path, steps, _ in self.sent if entity_path == f"/encode_latency/stream{index}" for step in steps]
+            self.assertEqual(sorted(steps), list(range(1000)))
+
+
+if __name__ == '__main__':
+    unittest.main()
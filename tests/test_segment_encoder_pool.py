@@ -0,0 +1,96 @@
+import os
+import tempfile
+import threading
+import time
+import unittest
+
+import av
+import numpy as np
+
+from slobot.segment_encoder_pool import SegmentEncoderPool
+from slobot.video_writer import VideoWriter
+
+
+class SlowWriter:
+    """Video writer taking a while to finalize its first segment."""
+
+    def __init__(self, delay):
+        self.delay = delay
+        self.segment_count = 0
+        self.thread_names = set()
+
+    def open_segment(self, filename):
+        self.thread_names.add(threading.current_thread().name)
+
+    def write_frame(self, rgb, timestamp=None):
+        self.thread_names.add(threading.current_thread().name)
+
+    def close_segment(self):
+        if self.segment_count == 0:
+            time.sleep(self.delay)
+        self.segment_count += 1
+
+    def close(self):
+        self.close_segment()
+
+
+class TestSegmentEncoderPool(unittest.TestCase):
+    def test_encodes_streams(self):
+        with tempfile.TemporaryDirectory() as work_dir:
+            stream_ids = ["rgb", "depth", "normal"]
+            video_writers = {stream_id: VideoWriter((64, 48), 30, codec="libx264") for stream_id in stream_ids}
+            published = []
+            encoder_pool = SegmentEncoderPool(video_writers, published.append)
+
+            for segment_id in range(2):
+                filenames = {stream_id: os.path.join(work_dir, f"{stream_id}_{segment_id}.ts") for stream_id in stream_ids}
+                encoder_pool.open_segment(filenames)
+                for step in range(5):
+                    frames = {stream_id: np.full((48, 64, 3), step * 40, dtype=np.uint8) for stream_id in stream_ids}
+                    encoder_pool.write_frames(frames, segment_id + step / 30)
+                encoder_pool.close_segment(filenames, last=segment_id == 1)
+            encoder_pool.shutdown(end_marker=None)
+
+            self.assertEqual(len(published), 3)
+            self.assertIsNone(published[-1])
+            for filenames in published[:-1]:
+                for filename in filenames.values():
+                    with av.open(filename, format="mpegts") as container:
+                        self.assertEqual(len(list(container.decode(video=0))), 5)
+
+    def test_publishes_in_order(self):
+        slow_writer = SlowWriter(delay=0.2)
+        fast_writer = SlowWriter(delay=0)
+        published = []
+        encoder_pool = SegmentEncoderPool({"slow": slow_writer, "fast": fast_writer}, published.append)
+
+        for segment_id in range(3):
+            encoder_pool.open_segment({"slow": None, "fast": None})
+            encoder_pool.write_frames({"slow": None, "fast": None}, segment_id)
+            encoder_pool.close_segment(segment_id, last=segment_id == 2)
+        encoder_pool.shutdown(end_marker="end")
+
+        self.assertEqual(published, [0, 1, 2, "end"])
+        # each stream runs on its own thread
+        self.assertEqual(len(slow_writer.thread_names), 1)
+        self.assertNotEqual(slow_writer.thread_names, fast_writer.thread_names)
+
+    def test_raises_encoding_error(self):
+        class FailingWriter(SlowWriter):
+            def write_frame(self, rgb, timestamp=None):
+                raise RuntimeError("encoder failure")
+
+        published = []
+        encoder_pool = SegmentEncoderPool({"rgb": FailingWriter(delay=0)}, published.append)
+
+        # the error surfaces on a later submit, or on shutdown
+        with self.assertRaises(RuntimeError):
+            encoder_pool.open_segment({"rgb": None})
+            encoder_pool.write_frames({"rgb": None}, 0.0)
+            encoder_pool.close_segment(0, last=True)
+            encoder_pool.shutdown(end_marker=None)
+        self.assertNotIn(0, published)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,56 @@
+import unittest
+
+import numpy as np
+
+from slobot.feetech_frame import FeetechFrame
+from slobot.simulation_frame import CameraFrame, SimulationFrame, SimulationFrameBatch
+
+
+class TestSimulationFrame(unittest.TestCase):
+    def test_slots(self):
+        simulation_frame = SimulationFrame(timestamp=1.0, qpos=np.zeros(6, dtype=np.float32), side_camera_frame=CameraFrame())
+        self.assertFalse(hasattr(simulation_frame, "__dict__"))
+        with self.assertRaises(AttributeError):
+            simulation_frame.depth = None
+
+        feetech_frame = FeetechFrame(1.0, np.zeros(6), np.ones(6), None, None)
+        self.assertFalse(hasattr(feetech_frame, "__dict__"))
+        np.testing.assert_array_equal(feetech_frame.qpos, np.ones(6))
+
+    def test_frame(self):
+        rgb = np.zeros((48, 64, 3), dtype=np.uint8)
+        normal = np.ones((48, 64, 3), dtype=np.uint8)
+        simulation_frame = SimulationFrame(side_camera_frame=CameraFrame(rgb=rgb, normal=normal))
+        self.assertIs(simulation_frame.frame(0), rgb)
+        self.assertIs(simulation_frame.frame(3), normal)
+
+
+class TestSimulationFrameBatch(unittest.TestCase):
+    def test_env_frame(self):
+        n_envs, n_dofs = 3, 6
+        simulation_frame_batch = SimulationFrameBatch(
+            timestamp=1.5,
+            qpos=np.arange(n_envs * n_dofs, dtype=np.float32).reshape(n_envs, n_dofs),
+            velocity=np.zeros((n_envs, n_dofs), dtype=np.float32),
+            force=np.zeros((n_envs, n_dofs), dtype=np.float32),
+            control_force=np.ones((n_envs, n_dofs), dtype=np.float32),
+            side_camera_frame=CameraFrame(
+                rgb=np.stack([np.full((48, 64, 3), env_idx, dtype=np.uint8) for env_idx in range(n_envs)]),
+                depth=np.zeros((n_envs, 48, 64), dtype=np.float32),
+            ),
+        )
+        self.assertEqual(simulation_frame_batch.n_envs, 3)
+
+        simulation_frame = simulation_frame_batch.env_frame(2)
+        self.assertEqual(simulation_frame.timestamp, 1.5)
+        np.testing.assert_array_equal(simulation_frame.qpos, np.arange(12, 18))
+        self.assertEqual(simulation_frame.side_camera_frame.rgb.shape, (48, 64, 3))
+        self.assertTrue(np.all(simulation_frame.frame(0) == 2))
+        self.assertIsNone(simulation_frame.side_camera_frame.segmentation)
+
+        # views of the batch, no copy
+        self.assertTrue(np.shares_memory(simulation_frame.side_camera_frame.rgb, simulation_frame_batch.side_camera_frame.rgb))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,63 @@
+import unittest
+
+from slobot.teleop.asyncprocessing.step_aligner import StepAligner
+
+
+class TestStepAligner(unittest.TestCase):
+    def test_align_latest_step(self):
+        aligner = StepAligner(input_count=2)
+        for step in [1, 2, 3]:
+            aligner.add(0, step, f"qpos{step}")
+        for step in [1, 2]:
+            aligner.add(1, step, f"frame{step}")
+
+        self.assertEqual(aligner.pop_aligned(), (2, ["qpos2", "frame2"]))
+
+        # step 1 was dropped as stale, step 3 waits for its frame
+        self.assertEqual(list(aligner.pending[0]), [3])
+        self.assertEqual(aligner.unaligned_steps, 1)
+        self.assertIsNone(aligner.pop_aligned())
+
+        aligner.add(1, 3, "frame3")
+        self.assertEqual(aligner.pop_aligned(), (3, ["qpos3", "frame3"]))
+
+    def test_step_tolerance(self):
+        aligner = StepAligner(input_count=2, step_tolerance=1)
+        aligner.add(1, 4, "frame4")
+        aligner.add(0, 5, "qpos5")
+        aligner.add(0, 7, "qpos7")
+
+        # step 7 is out of tolerance of the frame of step 4
+        self.assertEqual(aligner.pop_aligned(), (5, ["qpos5", "frame4"]))
+        self.assertIsNone(aligner.pop_aligned())
+
+        # the closest frame wins
+        aligner.add(1, 6, "frame6")
+        aligner.add(1, 7, "frame7")
+        self.assertEqual(aligner.pop_aligned(), (7, ["qpos7", "frame7"]))
+
+    def test_reuse_slower_input(self):
+        aligner = StepAligner(input_count=3, step_tolerance=1)
+        aligner.add(1, 10, "frame10")
+        aligner.add(2, 10, "detections10")
+        aligner.add(0, 10, "qpos10")
+        self.assertEqual(aligner.pop_aligned(), (10, ["qpos10", "frame10", "detections10"]))
+
+        # the camera inputs publish every other step
+        aligner.add(0, 11, "qpos11")
+        self.assertEqual(aligner.pop_aligned(), (11, ["qpos11", "frame10", "detections10"]))
+
+    def test_bounded_pending_steps(self):
+        aligner = StepAligner(input_count=2)
+        for step in range(StepAligner.MAX_PENDING_STEPS + 5):
+            aligner.add(0, step, step)
+
+        self.assertEqual(len(aligner.pending[0]), StepAligner.MAX_PENDING_STEPS)
+        self.assertEqual(min(aligner.pending[0]), 5)
+
+        aligner.clear()
+        self.assertEqual(aligner.pending, [{}, {}])
+
+
+if __name__ == '__main__':
+    unittest.main()
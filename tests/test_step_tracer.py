@@ -0,0 +1,82 @@
+import tempfile
+import unittest
+
+from slobot.teleop.asyncprocessing.step_tracer import StepTracer, StepTraceReport
+
+
+class TestStepTracer(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.trace_dir = StepTracer.TRACE_DIR
+        StepTracer.TRACE_DIR = self.temp_dir.name
+
+        # cron -> leader -> follower -> {sim, webcam2 -> detect_objects2}, 10 ms per hop, sim is the slowest branch
+        hops = {
+            "cron": (None, 0.000, 0.001),
+            "leader": ("cron", 0.002, 0.010),
+            "follower": ("leader", 0.011, 0.020),
+            "sim": ("follower", 0.022, 0.060),
+            "webcam2": ("follower", 0.021, 0.030),
+            "detect_objects2": ("webcam2", 0.031, 0.050),
+        }
+        self.t0 = 1000.0
+        self.report = self.trace("episode", hops)
+
+    def trace(self, recording_id, hops):
+        for worker_name, (upstream, start, end) in hops.items():
+            tracer = StepTracer(worker_name, recording_id)
+            for step in range(10):
+                tick = self.t0 + step / 30
+                sent = None if upstream is None else tick + hops[upstream][2]
+                tracer.record(step, sent, tick + start, tick + start, tick + end, tick + end)
+            tracer.flush()
+
+        return StepTraceReport(StepTracer.trace_dir(recording_id))
+
+    def tearDown(self):
+        StepTracer.TRACE_DIR = self.trace_dir
+        self.temp_dir.cleanup()
+
+    def test_critical_path(self):
+        self.assertEqual(self.report.critical_path(3), ["cron", "leader", "follower", "sim"])
+        self.assertEqual(self.report.upstream("detect_objects2"), "webcam2")
+
+    def test_detection_server_fan_in(self):
+        # the detection server waits for the slower of the two webcams
+        hops = {
+            "cron": (None, 0.000, 0.001),
+            "leader": ("cron", 0.002, 0.010),
+            "follower": ("leader", 0.011, 0.020),
+            "webcam1": ("follower", 0.021, 0.030),
+            "webcam2": ("follower", 0.021, 0.035),
+            "detection_server": ("webcam2", 0.036, 0.080),
+        }
+        report = self.trace("detection", hops)
+
+        self.assertEqual(report.critical_path(3), ["cron", "leader", "follower", "webcam2", "detection_server"])
+        self.assertIn("10 steps: cron -> leader -> follower -> webcam2 -> detection_server", report.report())
+        for end_to_end in report.end_to_end_latencies():
+            self.assertAlmostEqual(end_to_end, 80.0, places=3)
+
+        events = report.chrome_trace()["traceEvents"]
+        track_names = [event["args"]["name"] for event in events if event["ph"] == "M"]
+        self.assertIn("detection_server", track_names)
+
+    def test_latencies(self):
+        latencies = self.report.hop_latencies()
+        self.assertAlmostEqual(latencies["sim"]["queue"][0], 2.0, places=3)
+        self.assertAlmostEqual(latencies["sim"]["process"][0], 38.0, places=3)
+        for end_to_end in self.report.end_to_end_latencies():
+            self.assertAlmostEqual(end_to_end, 60.0, places=3)
+        self.assertIn("10 steps: cron -> leader -> follower -> sim", self.report.report())
+
+    def test_chrome_trace(self):
+        events = self.report.chrome_trace()["traceEvents"]
+        spans = [event for event in events if event["ph"] == "X"]
+        self.assertEqual(len(spans), 6 * 10 * 3)
+        self.assertTrue(all(span["dur"] >= 0 for span in spans))
+
+
+if __name__ == "__main__":
+    unittest.main()
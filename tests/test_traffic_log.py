@@ -0,0 +1,98 @@
+import os
+import shutil
+import struct
+import tempfile
+import time
+import unittest
+import uuid
+
+import numpy as np
+
+from slobot.teleop.asyncprocessing.fifo_queue import FifoQueue
+from slobot.teleop.asyncprocessing.multi_slot_shared_memory_block import MultiSlotSharedMemoryBlock
+from slobot.teleop.asyncprocessing.traffic_log import ReplayQueue, TrafficRecorder
+
+
+class TestTrafficLog(unittest.TestCase):
+    WIDTH = 32
+    HEIGHT = 24
+    QUEUE_NAME = "detect_objects1"
+
+    def setUp(self):
+        self.traffic_dir = tempfile.mkdtemp()
+        self.previous_traffic_dir = TrafficRecorder.TRAFFIC_DIR
+        TrafficRecorder.TRAFFIC_DIR = self.traffic_dir
+        self.shm_name = f"test_traffic_{uuid.uuid4().hex[:8]}"
+
+    def tearDown(self):
+        TrafficRecorder.TRAFFIC_DIR = self.previous_traffic_dir
+        shutil.rmtree(self.traffic_dir)
+
+    def message(self, msg_type, payload, deadline, step):
+        payload = FifoQueue.to_bytes(msg_type, payload)
+        header = struct.pack(FifoQueue.HEADER_FORMAT, FifoQueue.HEADER_SIZE + len(payload), msg_type, deadline, step, time.time())
+        return header + payload
+
+    def capture(self, steps, period=0.0):
+        """Capture a webcam worker committing a frame then signaling the detection worker at every step."""
+        recorder = TrafficRecorder("webcam1", "episode")
+        block = MultiSlotSharedMemoryBlock.create(self.shm_name, self.WIDTH, self.HEIGHT)
+        block.recorder = recorder
+
+        recorder.record_message(self.QUEUE_NAME, self.message(FifoQueue.MSG_RECORDING_ID, "episode", 0.0, 0))
+        for step in range(steps):
+            slot = block.acquire_write_slot()
+            block.slot_frame(slot).fill(step)
+            block.commit_write(slot)
+            recorder.record_message(self.QUEUE_NAME, self.message(FifoQueue.MSG_OBJECT_DETECTION, None, time.time() + 0.05, step))
+            recorder.record_message("other_queue", self.message(FifoQueue.MSG_EMPTY, None, 0.0, step))
+            time.sleep(period)
+
+        recorder.close()
+        block.close()
+        block.unlink()
+
+    def replay(self, realtime):
+        queue = ReplayQueue(TrafficRecorder.traffic_dir("episode"), self.QUEUE_NAME, shm_names=[self.shm_name], realtime=realtime)
+        queue.open_read()
+        messages = []
+        frames = []
+        while True:
+            msg_type, deadline, step, payload = queue.poll_latest()
+            messages.append((msg_type, step, payload))
+            if msg_type == FifoQueue.MSG_POISON_PILL:
+                break
+            if msg_type == FifoQueue.MSG_OBJECT_DETECTION:
+                # the frame is committed before the message that signals it
+                self.assertGreater(deadline, time.time())
+                block = MultiSlotSharedMemoryBlock(self.shm_name)
+                lease = block.lease_latest()
+                frames.append(int(lease.frame[0, 0, 0]))
+                lease = None
+                block.close()
+        queue.close()
+        return messages, frames
+
+    def test_replay_as_fast_as_possible(self):
+        self.capture(5)
+        self.assertTrue(os.path.exists(f"{self.traffic_dir}/episode/webcam1.traffic"))
+
+        for _ in range(2):
+            messages, frames = self.replay(realtime=False)
+            self.assertEqual(messages[0], (FifoQueue.MSG_RECORDING_ID, 0, "episode"))
+            self.assertEqual([step for msg_type, step, _ in messages if msg_type == FifoQueue.MSG_OBJECT_DETECTION], list(range(5)))
+            self.assertEqual(frames, list(range(5)))
+            self.assertEqual(messages[-1][0], FifoQueue.MSG_POISON_PILL)
+
+    def test_replay_in_real_time(self):
+        period = 0.02
+        self.capture(5, period)
+
+        start_time = time.perf_counter()
+        self.replay(realtime=True)
+        elapsed = time.perf_counter() - start_time
+        self.assertGreater(elapsed, 3.5 * period)
+
+
+if __name__ == "__main__":
+    unittest.main()
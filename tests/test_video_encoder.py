@@ -0,0 +1,117 @@
+import threading
+import unittest
+from types import SimpleNamespace
+
+import av
+import numpy as np
+
+from slobot.metrics.video_encoder import DropPolicy, VideoEncoder
+
+
+class PacketLog:
+    """Collects what the encoder would log to Rerun.io."""
+
+    def __init__(self):
+        self.packets = []
+        self.latencies = []
+
+    def log_packet(self, step, video_metric, packet):
+        self.packets.append((step, packet.pts))
+
+    def log_encode_latency(self, step, video_metric, latency_ms, dropped_frames):
+        self.latencies.append((step, dropped_frames))
+
+
+class GatedStream:
+    """Encoder stream that only encodes once the gate is open, emitting one packet per frame."""
+
+    def __init__(self):
+        self.gate = threading.Event()
+        self.frame_count = 0
+
+    def encode(self, frame):
+        if frame is None:
+            return []
+        self.gate.wait()
+        packet = SimpleNamespace(pts=self.frame_count)
+        self.frame_count += 1
+        return [packet]
+
+
+class TestVideoEncoder(unittest.TestCase):
+    def libx264_stream(self):
+        container = av.open("/dev/null", "w", format="h264")
+        stream = container.add_stream("libx264", rate=30)
+        stream.max_b_frames = 0
+        return stream
+
+    def frame(self, value):
+        return av.VideoFrame.from_ndarray(np.full((48, 64, 3), value, dtype=np.uint8), format="rgb24")
+
+    def encode(self, queue_size):
+        packet_log = PacketLog()
+        encoder = VideoEncoder("/webcam1/video", self.libx264_stream(), packet_log, queue_size, DropPolicy.BLOCK)
+        for step in range(10, 40, 2):
+            encoder.submit(step, self.frame(step))
+        encoder.finish()
+        return packet_log
+
+    def test_threaded_matches_synchronous(self):
+        synchronous_log = self.encode(queue_size=0)
+        threaded_log = self.encode(queue_size=4)
+
+        self.assertEqual(sorted(step for step, _ in synchronous_log.packets), list(range(10, 40, 2)))
+        self.assertEqual(sorted(threaded_log.packets), sorted(synchronous_log.packets))
+        self.assertEqual(len(threaded_log.latencies), 15)
+
+    def submit_first_frame(self, encoder):
+        encoder.submit(0, 0)
+        # wait for the encoder thread to hold the first frame
+        while not encoder.queue.empty():
+            pass
+
+    def test_drop_newest(self):
+        packet_log = PacketLog()
+        stream = GatedStream()
+        encoder = VideoEncoder("/sim/rgb/video", stream, packet_log, 2, DropPolicy.DROP_NEWEST)
+        self.submit_first_frame(encoder)
+        for step in range(1, 6):
+            encoder.submit(step, step)
+        stream.gate.set()
+        encoder.finish()
+
+        # the encoder thread holds the first frame, the queue the next two, the others are dropped
+        self.assertEqual(encoder.dropped_frames, 3)
+        self.assertEqual([step for step, _ in packet_log.packets], [0, 1, 2])
+
+    def test_drop_oldest(self):
+        packet_log = PacketLog()
+        stream = GatedStream()
+        encoder = VideoEncoder("/sim/rgb/video", stream, packet_log, 2, DropPolicy.DROP_OLDEST)
+        self.submit_first_frame(encoder)
+        for step in range(1, 6):
+            encoder.submit(step, step)
+        stream.gate.set()
+        encoder.finish()
+
+        self.assertEqual(encoder.dropped_frames, 3)
+        self.assertEqual([step for step, _ in packet_log.packets], [0, 4, 5])
+
+    def test_submit_after_finish(self):
+        for queue_size in (0, 2):
+            packet_log = PacketLog()
+            encoder = VideoEncoder("/webcam1/video", self.libx264_stream(), packet_log, queue_size, DropPolicy.BLOCK)
+            encoder.submit(0, self.frame(0))
+            encoder.finish()
+
+            with self.assertLogs(VideoEncoder.LOGGER, level="WARNING"):
+                encoder.submit(1, self.frame(1))
+            encoder.submit(2, self.frame(2))
+
+            # the late frames are dropped instead of being encoded into the flushed stream
+            self.assertEqual(encoder.late_frames, 2)
+            self.assertEqual([step for step, _ in packet_log.packets], [0])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,60 @@
+import tempfile
+import unittest
+from unittest import mock
+
+import av
+import numpy as np
+
+from slobot.configuration import Configuration
+from slobot.simulation_frame import SimulationFrameBatch, CameraFrame
+from slobot.video_streams import VideoStreams
+
+
+class TestVideoStreams(unittest.TestCase):
+    def test_simulation_frame_batch(self):
+        n_envs, n_dofs = 2, 6
+        width, height = 64, 48
+        fps = 30
+        steps = 12
+
+        with tempfile.TemporaryDirectory() as work_dir, mock.patch.object(Configuration, "WORK_DIR", work_dir):
+            video_streams = VideoStreams()
+            video_streams.codec = "libx264"
+            video_streams.start(0, list(range(n_envs)), (width, height), fps, segment_duration=0.2, rgb=True, depth=True)
+
+            for step in range(steps):
+                rgb = np.empty((n_envs, height, width, 3), dtype=np.uint8)
+                for env_idx in range(n_envs):
+                    # each environment has its own brightness
+                    rgb[env_idx] = 40 + 160 * env_idx
+                simulation_frame_batch = SimulationFrameBatch(
+                    timestamp=step / fps,
+                    qpos=np.zeros((n_envs, n_dofs)),
+                    velocity=np.zeros((n_envs, n_dofs)),
+                    force=np.zeros((n_envs, n_dofs)),
+                    control_force=np.zeros((n_envs, n_dofs)),
+                    side_camera_frame=CameraFrame(rgb=rgb, depth=np.random.rand(n_envs, height, width).astype(np.float32)),
+                )
+                video_streams.handle_step(simulation_frame_batch)
+            video_streams.stop()
+
+            published = []
+            while (simulation_frame_paths := video_streams.video_segment_queue.get()) is not None:
+                published.append(simulation_frame_paths)
+
+            self.assertEqual(len(published), 2)
+            decoded_frames = 0
+            for simulation_frame_paths in published:
+                self.assertIsInstance(simulation_frame_paths.simulation_frame, SimulationFrameBatch)
+                self.assertEqual(len(simulation_frame_paths.paths), n_envs)
+                for env_idx, env_paths in enumerate(simulation_frame_paths.paths):
+                    rgb_path, depth_path = env_paths
+                    self.assertIn(f"_env_{env_idx}_rgb_", rgb_path)
+                    self.assertIn(f"_env_{env_idx}_depth_", depth_path)
+                    with av.open(rgb_path, format="mpegts") as container:
+                        frames = [frame.to_ndarray(format="rgb24") for frame in container.decode(video=0)]
+                    self.assertAlmostEqual(float(frames[0].mean()), 40 + 160 * env_idx, delta=4)
+                    if env_idx == 0:
+                        decoded_frames += len(frames)
+
+            self.assertEqual(decoded_frames, steps)
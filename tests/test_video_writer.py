@@ -0,0 +1,83 @@
+import os
+import tempfile
+import unittest
+
+import av
+import numpy as np
+
+from slobot.encoder_profile import EncoderProfile
+from slobot.video_writer import VideoWriter
+
+
+class TestVideoWriter(unittest.TestCase):
+    def setUp(self):
+        self.work_dir = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.work_dir.cleanup()
+
+    def decode(self, filename):
+        # the segments are too small for the format to be probed
+        with av.open(filename, format="mpegts") as container:
+            return [(frame.pts, frame.key_frame) for frame in container.decode(video=0)]
+
+    def test_segments_share_encoder(self):
+        video_writer = VideoWriter((64, 48), 30, codec="libx264")
+        filenames = [os.path.join(self.work_dir.name, f"segment_{segment_id}.ts") for segment_id in range(3)]
+
+        encoder = None
+        for segment_id, filename in enumerate(filenames):
+            video_writer.open_segment(filename)
+            if encoder is None:
+                encoder = video_writer.encoder
+            self.assertIs(video_writer.encoder, encoder)
+
+            for value in range(segment_id + 4):
+                video_writer.write_frame(np.full((48, 64, 3), value * 20, dtype=np.uint8))
+
+            if segment_id < len(filenames) - 1:
+                video_writer.close_segment()
+        video_writer.close()
+
+        for segment_id, filename in enumerate(filenames):
+            frames = self.decode(filename)
+            # every segment is decodable on its own, starting with a keyframe at timestamp 0
+            self.assertEqual(len(frames), segment_id + 4)
+            self.assertEqual(frames[0], (self.decode(filenames[0])[0][0], True))
+
+    def test_lookahead_profile_keeps_frames_in_their_segment(self):
+        # a profile tuned for a frame lookahead, which would buffer the frames of a segment into the next one
+        video_writer = VideoWriter((64, 48), 30, codec="libx264", encoder_profile=EncoderProfile(preset="medium", tune="film", crf=20))
+        filenames = [os.path.join(self.work_dir.name, f"segment_{segment_id}.ts") for segment_id in range(2)]
+
+        for segment_id, filename in enumerate(filenames):
+            video_writer.open_segment(filename)
+            for value in range(8):
+                video_writer.write_frame(np.full((48, 64, 3), value * 20, dtype=np.uint8))
+            if segment_id == 0:
+                video_writer.close_segment()
+        video_writer.close()
+
+        self.assertEqual(video_writer.segment_encoder_options()["tune"], "film,zerolatency")
+        for filename in filenames:
+            frames = self.decode(filename)
+            self.assertEqual(len(frames), 8)
+            self.assertTrue(frames[0][1])
+
+    def test_variable_frame_rate(self):
+        video_writer = VideoWriter((64, 48), 30, codec="libx264")
+        filename = os.path.join(self.work_dir.name, "segment.ts")
+        timestamps = [100.0, 100.1, 100.5, 101.2, 101.2]
+
+        video_writer.open_segment(filename)
+        for value, timestamp in enumerate(timestamps):
+            video_writer.write_frame(np.full((48, 64, 3), value * 40, dtype=np.uint8), timestamp)
+        video_writer.close()
+
+        # frames are presented at their timestamps, a duplicate timestamp being shifted by one tick
+        pts = [frame_pts for frame_pts, _ in self.decode(filename)]
+        self.assertEqual([frame_pts - pts[0] for frame_pts in pts], [0, 9000, 45000, 108000, 108001])
+
+
+if __name__ == '__main__':
+    unittest.main()